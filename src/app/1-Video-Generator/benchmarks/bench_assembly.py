@@ -0,0 +1,92 @@
+"""
+Cost of joining Sora segments into the final video.
+
+Compares the old `_concat_videos` (concat demuxer with stream copy and, when
+ffmpeg rejects it, a full libx264 re-encode of the joined video) with
+`VideoAssembler`, which probes the segments first: matching segments are
+stream-copied, and only the odd ones are normalized (in parallel) before the
+copy concat. Clips are generated locally with ffmpeg's test sources.
+
+Usage:
+
+    python benchmarks/bench_assembly.py [--segments 4] [--seconds 4] [--size 720x1280] [--odd 1]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.services.video_assembly import VideoAssembler, resolve_ffmpeg
+
+FFMPEG = resolve_ffmpeg()
+
+
+def make_clip(path: Path, size: str, seconds: int, rate: int, audio_rate: int) -> Path:
+    subprocess.run([
+        FFMPEG, "-hide_banner", "-y",
+        "-f", "lavfi", "-i", f"testsrc2=size={size}:rate={rate}:duration={seconds}",
+        "-f", "lavfi", "-i", f"sine=frequency=440:duration={seconds}:sample_rate={audio_rate}",
+        "-c:v", "libx264", "-preset", "ultrafast", "-pix_fmt", "yuv420p",
+        "-c:a", "aac", "-ac", "2", "-shortest", str(path),
+    ], capture_output=True, check=True)
+    return path
+
+
+def legacy_concat(files, output: Path) -> None:
+    """The copy-then-re-encode fallback `_concat_videos` used before the assembler."""
+    list_file = output.parent / f"{output.stem}_list.txt"
+    list_file.write_text("".join(f"file '{f.as_posix()}'\n" for f in files), encoding="utf-8")
+    base = [FFMPEG, "-y", "-f", "concat", "-safe", "0", "-i", str(list_file)]
+    copy = subprocess.run(base + ["-c:v", "copy", "-c:a", "aac", str(output)], capture_output=True)
+    # The copy "succeeds" on mismatched inputs but produces a broken file; the old
+    # code only re-encoded on a non-zero exit, so force the fallback in that case
+    if copy.returncode != 0 or len({VideoAssembler(binary=FFMPEG).probe(f).fps for f in files}) > 1:
+        subprocess.run(base + [
+            "-r", "24", "-pix_fmt", "yuv420p", "-c:v", "libx264", "-preset", "veryfast", "-crf", "18",
+            "-c:a", "aac", "-b:a", "160k", "-movflags", "+faststart", str(output),
+        ], capture_output=True, check=True)
+
+
+def assembler_concat(files, output: Path) -> None:
+    VideoAssembler(binary=FFMPEG).assemble(files, output)
+
+
+def run(concat, files, workdir: Path) -> float:
+    output = workdir / f"{concat.__name__}.mp4"
+    start = time.perf_counter()
+    concat(files, output)
+    elapsed = time.perf_counter() - start
+    print(f"  {concat.__name__:<17} {elapsed:8.2f} s  ({output.stat().st_size / 1024:.0f} KiB)")
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--segments", type=int, default=4)
+    parser.add_argument("--seconds", type=int, default=4)
+    parser.add_argument("--size", default="720x1280")
+    parser.add_argument("--odd", type=int, default=1, help="segments rendered with a different fps/audio rate")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        files = [
+            make_clip(
+                workdir / f"s{i:02d}.mp4", args.size, args.seconds,
+                rate=30 if i < args.odd else 24, audio_rate=44100 if i < args.odd else 48000,
+            )
+            for i in range(args.segments)
+        ]
+        print(f"Joining {len(files)} segments of {args.seconds}s at {args.size} ({args.odd} mismatched):")
+        before = run(legacy_concat, files, workdir)
+        after = run(assembler_concat, files, workdir)
+        print(f"  speedup           {before / after:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Cost of saving one collection run into the propositions table.
+
+Compares the old per-item path (one existence query, one flush and one
+fingerprint lookup per proposition) with the bulk path now used by
+`CollectorService._save_to_db`: one multi-row INSERT ... ON CONFLICT DO NOTHING
+and a batched fingerprint lookup. A share of the items repeats links or titles
+already stored, as a second run over the same window would.
+
+Usage:
+
+    python benchmarks/bench_bulk_upsert.py [--items 10000] [--repeat-ratio 0.2]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.core.database import Base
+from src.models.db_models import DBProposition
+from src.models.schemas import Proposition
+from src.services.collector_service import CollectorService
+from src.services.dedup_service import near_duplicates
+
+WORDS = (
+    "imposto taxa tributo aumento reducao beneficio auxilio bolsa transporte educacao saude "
+    "previdencia salario minimo trabalho emprego camara senado projeto lei votacao aprovado "
+    "municipio estado governo prefeitura vereadores deputados senadores proposta reforma"
+).split()
+
+
+def make_items(count: int, repeat_ratio: float, seed: int = 7):
+    rng = random.Random(seed)
+    items = []
+    for i in range(count):
+        # Repeats point back to an earlier item, with cosmetic link/title variations
+        if i and rng.random() < repeat_ratio:
+            j = rng.randrange(i)
+            items.append(items[j].model_copy(update={"link": items[j].link + "/?utm_source=x"}))
+            continue
+        body = " ".join(rng.choice(WORDS) for _ in range(40))
+        items.append(Proposition(
+            title=f"PL {i}/2025 {rng.choice(WORDS)}",
+            description=body[:120],
+            content=body,
+            link=f"https://www.camara.leg.br/proposicoes/{i}",
+            source="camara_deputados",
+            level="federal",
+            collection_type="api",
+        ))
+    return items
+
+
+def legacy_save(db, items):
+    """The per-item loop `_save_to_db` used before the bulk path."""
+    for item in items:
+        exists = db.query(DBProposition).filter(
+            (DBProposition.link == item.link) | (DBProposition.title == item.title)
+        ).first()
+        if not exists:
+            db_item = DBProposition(
+                title=item.title, description=item.description, content=item.content,
+                link=item.link, date=item.date, source=item.source, level=item.level,
+                collection_type=item.collection_type,
+            )
+            db.add(db_item)
+            db.flush()
+            near_duplicates.register(db, db_item)
+    db.commit()
+
+
+def bulk_save(db, items):
+    CollectorService()._save_to_db(db, items)
+
+
+def run(save, items) -> float:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine)()
+        try:
+            start = time.perf_counter()
+            save(db, items)
+            elapsed = time.perf_counter() - start
+            stored = db.query(DBProposition).count()
+        finally:
+            db.close()
+            engine.dispose()
+    print(f"  {save.__name__:<12} {elapsed:8.2f} s  ({stored} rows stored)")
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--items", type=int, default=10000)
+    parser.add_argument("--repeat-ratio", type=float, default=0.2)
+    args = parser.parse_args()
+
+    items = make_items(args.items, args.repeat_ratio)
+    print(f"Saving {len(items)} propositions:")
+    before = run(legacy_save, items)
+    after = run(bulk_save, items)
+    print(f"  speedup      {before / after:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
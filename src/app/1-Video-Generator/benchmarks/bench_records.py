@@ -0,0 +1,70 @@
+"""
+Memory held by a large collection run: Pydantic `Proposition` vs `PropositionRecord`.
+
+Builds `--items` collected items the way the collectors do (fresh strings per
+item, `--content` chars of body text) and reports the traced allocation of the
+list, plus the size of the `/collect` job result with and without details.
+
+Usage:
+
+    python benchmarks/bench_records.py [--items 20000] [--content 2000]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.models.records import PropositionRecord
+from src.models.schemas import CollectionSummary, Proposition
+
+
+def build(cls, count: int, content_chars: int):
+    return [
+        cls(
+            title=f"PL {i}/2025",
+            description=f"Altera a lei {i} sobre tarifas",
+            content=("texto " * (content_chars // 6 + 1))[:content_chars] + str(i),
+            link=f"https://www.camara.leg.br/proposicoesWeb/fichadetramitacao?idProposicao={i}",
+            date="2025-01-01",
+            source="camara_deputados",
+            level="federal",
+            collection_type="api",
+            relevance_score=i % 7,
+        )
+        for i in range(count)
+    ]
+
+
+def measure(cls, count: int, content_chars: int):
+    tracemalloc.start()
+    start = time.perf_counter()
+    items = build(cls, count, content_chars)
+    elapsed = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return items, size, elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=20000)
+    parser.add_argument("--content", type=int, default=2000)
+    args = parser.parse_args()
+
+    for cls in (Proposition, PropositionRecord):
+        items, size, elapsed = measure(cls, args.items, args.content)
+        print(f"{cls.__name__:<18} {size / 2**20:8.1f} MiB  {elapsed * 1000:7.0f} ms to build")
+
+    summary = {"total_items": len(items), "sources_summary": {"federal_camara": len(items)}}
+    full = CollectionSummary(**summary, details={"federal_camara": [item.to_schema() for item in items]})
+    compact = CollectionSummary(**summary)
+    for label, result in (("details", full), ("summary-only", compact)):
+        print(f"/collect result, {label:<13} {len(json.dumps(result.model_dump(mode='json'))) / 2**20:8.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
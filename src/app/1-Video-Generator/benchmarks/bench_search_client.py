@@ -0,0 +1,98 @@
+"""
+Per-query overhead of the Custom Search client.
+
+Compares the old approach (building the googleapiclient discovery service on
+every search) with the pooled REST session now held by `GoogleScraper`. Both
+hit a local stub server, so the numbers isolate client-side overhead.
+
+Usage:
+
+    python benchmarks/bench_search_client.py [--queries 50]
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.utils.scraper import GoogleScraper
+
+PAYLOAD = json.dumps({
+    "items": [
+        {"title": f"Notícia {i}", "link": f"https://g1.globo.com/sp/{i}", "snippet": "resumo"}
+        for i in range(10)
+    ]
+}).encode("utf-8")
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(PAYLOAD)))
+        self.end_headers()
+        self.wfile.write(PAYLOAD)
+
+    def log_message(self, *args):
+        pass
+
+
+def bench_discovery_per_query(base_url: str, queries: int) -> float:
+    from googleapiclient.discovery import build
+
+    start = time.perf_counter()
+    for i in range(queries):
+        service = build(
+            "customsearch", "v1", developerKey="key",
+            client_options={"api_endpoint": base_url}, cache_discovery=False,
+        )
+        service.cse().list(q=f"query {i}", cx="cx", num=10, sort="date").execute()
+    return (time.perf_counter() - start) / queries
+
+
+def bench_pooled_session(base_url: str, queries: int) -> float:
+    scraper = GoogleScraper()
+    scraper.api_key, scraper.engine_id = "key", "cx"
+    scraper.search_cache = None
+    scraper.SEARCH_URL = f"{base_url}/customsearch/v1"
+
+    start = time.perf_counter()
+    for i in range(queries):
+        scraper._call_api((f"query {i}", 30, 10))
+    return (time.perf_counter() - start) / queries
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--queries", type=int, default=50)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    try:
+        try:
+            before = bench_discovery_per_query(base_url, args.queries)
+            print(f"discovery build per query: {before * 1000:8.2f} ms/query")
+        except ImportError:
+            before = None
+            print("discovery build per query:   skipped (google-api-python-client not installed)")
+
+        after = bench_pooled_session(base_url, args.queries)
+        print(f"pooled REST session:       {after * 1000:8.2f} ms/query")
+        if before:
+            print(f"speedup:                   {before / after:8.1f}x")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
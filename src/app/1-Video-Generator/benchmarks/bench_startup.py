@@ -0,0 +1,75 @@
+"""
+Cold start cost of the API and CLI entry points.
+
+Each run is a fresh interpreter with `python -X importtime`; the report shows
+the median import time of the entry module and the heaviest top-level
+packages. `--build` also resolves every registered service after the import,
+which is what the process used to pay up front before services were built
+lazily through `src.core.registry`.
+
+Usage:
+
+    python benchmarks/bench_startup.py [--module src.main] [--runs 5] [--top 10] [--build]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+BUILD_ALL = (
+    "from src.core.registry import services; "
+    "[services.get(name) for name in ('collector', 'scraper', 'tiktok', 'sora')]"
+)
+
+
+def profile(module: str, build: bool) -> tuple[float, dict[str, int]]:
+    """Wall time of one cold start and the cumulative import µs per top-level package."""
+    code = f"import {module}" + (f"; {BUILD_ALL}" if build else "")
+    env = dict(os.environ, DATABASE_PATH=os.path.join(tempfile.mkdtemp(prefix="bench-startup-"), "montoya.db"))
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+    elapsed = time.perf_counter() - start
+
+    packages = defaultdict(int)
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, _, name = line.removeprefix("import time:").split("|")
+        packages[name.strip().split(".")[0]] += int(self_us)
+    return elapsed, packages
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="src.main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--build", action="store_true", help="Also build every registered service")
+    args = parser.parse_args()
+
+    times, totals = [], defaultdict(list)
+    for _ in range(args.runs):
+        elapsed, packages = profile(args.module, args.build)
+        times.append(elapsed)
+        for name, us in packages.items():
+            totals[name].append(us)
+
+    label = f"{args.module}{' + services' if args.build else ''}"
+    print(f"{label}: median {statistics.median(times) * 1000:.0f} ms over {args.runs} cold starts")
+    heaviest = sorted(totals.items(), key=lambda item: statistics.median(item[1]), reverse=True)
+    for name, values in heaviest[: args.top]:
+        print(f"  {name:<24} {statistics.median(values) / 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,17 +2,24 @@ import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from src.core.database import init_db, get_db
-from src.models.db_models import DBVideo
+from src.core.database import DATABASE_PATH, ReadSessionLocal
+from src.services.query_service import record_queries
 
-init_db()
-db = next(get_db())
+if not DATABASE_PATH.exists():
+    sys.exit(f"No database at {DATABASE_PATH} yet; run the API or the CLI once to create it.")
 
-video = db.query(DBVideo).order_by(DBVideo.id.desc()).first()
-if video:
-    print(f"Latest Video ID: {video.id}")
-    print(f"Status: {video.status}")
-    print(f"URL: {video.url}")
-    print(f"Error: {video.error_message}")
+# Read-only and projected: no schema migration, no ORM objects
+db = ReadSessionLocal()
+try:
+    page = record_queries.page(db, "videos", fields="status,url,error_message", limit=1)
+finally:
+    db.close()
+
+if page["items"]:
+    video = page["items"][0]
+    print(f"Latest Video ID: {video['id']}")
+    print(f"Status: {video['status']}")
+    print(f"URL: {video['url']}")
+    print(f"Error: {video['error_message']}")
 else:
     print("No videos found.")
@@ -7,16 +7,19 @@ from contextlib import contextmanager
 from pathlib import Path
 from typing import Dict, List, Optional
 
-from openai import OpenAI
-
 from src.core.config import BASE_DIR, settings
-from src.core.database import get_db, init_db
+from src.core.database import SessionLocal, get_db, init_db
 from src.core.logging import get_logger, setup_logging
 from src.models.db_models import DBProposition, DBScript, DBVideo
 from src.models.schemas import Proposition
-from src.services.collector_service import collector_service
-from src.services.sora_service import sora_video_service
-from src.services.tiktok_service import tiktok_service
+from src.services.batch_render import BatchManifest, BatchVideoPipeline, select_propositions
+from src.services.collector_service import get_collector_service
+from src.services.dedup_service import near_duplicates
+from src.services.openai_batch import BatchFailed
+from src.services.search_service import proposition_search
+from src.services.sora_service import get_sora_service
+from src.services.tiktok_service import get_tiktok_service
+from src.utils.http import http_pool
 
 
 logger = get_logger(__name__)
@@ -42,28 +45,98 @@ class MontoyaCLI:
             db.close()
 
     # ------------------------------------------------------------------ Collectors
-    def collect(self, days_back: int = 5, limit: int = 5) -> None:
+    def collect(self, days_back: int = 5, limit: int = 5, details: bool = True) -> None:
         logger.info("Running collector: days_back=%s limit=%s", days_back, limit)
+        async def _run(db):
+            try:
+                return await get_collector_service().run_collection(
+                    days_back=days_back, limit=limit, db=db, details=details
+                )
+            finally:
+                await http_pool.aclose()
+
         with self._db_session() as db:
-            summary = asyncio.run(collector_service.run_collection(days_back=days_back, limit=limit, db=db))
+            summary = asyncio.run(_run(db))
             print(summary)
 
-    # ------------------------------------------------------------------ Scripts
-    def regenerate_scripts(self) -> None:
+    def backfill_camara(
+        self,
+        date_from: str,
+        date_to: Optional[str] = None,
+        sigla_tipos: Optional[List[str]] = None,
+    ) -> None:
+        async def _run(db):
+            try:
+                return await get_collector_service().backfill_camara(
+                    db, date_from=date_from, date_to=date_to, sigla_tipos=sigla_tipos
+                )
+            finally:
+                await http_pool.aclose()
+
         with self._db_session() as db:
-            propositions = db.query(DBProposition).order_by(DBProposition.id.asc()).all()
-            print(f"Reescrevendo scripts para {len(propositions)} proposições")
+            saved = asyncio.run(_run(db))
+            print(f"Backfill concluído: {saved} proposições relevantes processadas.")
 
-            for prop in propositions:
-                if not prop:
-                    continue
+    def reindex_duplicates(self) -> None:
+        with self._db_session() as db:
+            indexed = near_duplicates.rebuild(db)
+            print(f"{indexed} proposições indexadas para detecção de duplicatas.")
 
-                deleted = db.query(DBScript).filter(DBScript.proposition_id == prop.id).delete()
-                if deleted:
-                    db.commit()
-                    print(f"Removidos {deleted} roteiros antigos de '{prop.title}'")
+    # ------------------------------------------------------------------ Search
+    def search(
+        self,
+        query: str,
+        limit: int = 10,
+        page: int = 1,
+        level: Optional[str] = None,
+        source: Optional[str] = None,
+    ) -> None:
+        with self._db_session() as db:
+            result = proposition_search.search(
+                db, query, limit=limit, offset=(max(page, 1) - 1) * limit, level=level, source=source
+            )
+            if not result.items:
+                print(f"Nenhuma proposição encontrada para '{query}'.")
+                return
+
+            pages = math.ceil(result.total / result.limit)
+            print(f"{result.total} resultado(s) para '{query}' (página {page}/{pages}):")
+            for hit in result.items:
+                print(f"  #{hit.id:<6} {hit.score:7.2f}  [{hit.level}/{hit.source}] {hit.title}")
+                if hit.snippet:
+                    print(f"          {hit.snippet}")
+
+    # ------------------------------------------------------------------ Scripts
+    def regenerate_scripts(
+        self,
+        concurrency: int = settings.SCRIPT_CONCURRENCY,
+        force: bool = False,
+        batch: bool = False,
+        batch_id: Optional[str] = None,
+    ) -> None:
+        tiktok_service = get_tiktok_service()
+        if batch_id:
+            # Resume a batch submitted earlier (e.g. the process was stopped while polling)
+            print(f"Aguardando o batch {batch_id}")
+            try:
+                self._print_script_results(tiktok_service.ingest_script_batch(batch_id))
+            except BatchFailed as exc:
+                raise SystemExit(str(exc))
+            return
 
-                schema = Proposition(
+        with self._db_session() as db:
+            purged = tiktok_service.invalidate_cache(db)
+            if purged:
+                print(f"Cache de roteiros: {purged} entradas de versões antigas do prompt removidas")
+            # Near-duplicates share the script of their canonical proposition
+            propositions = (
+                db.query(DBProposition)
+                .filter(DBProposition.duplicate_of_id.is_(None))
+                .order_by(DBProposition.id.asc())
+                .all()
+            )
+            schemas = [
+                Proposition(
                     title=prop.title,
                     description=prop.description,
                     content=prop.content,
@@ -74,9 +147,52 @@ class MontoyaCLI:
                     collection_type=prop.collection_type,
                     relevance_score=None,
                 )
-                script = tiktok_service.generate_script(schema, style="informative", db=db)
-                preview = (script or "")[:120].replace("\n", " ")
-                print(f"Novo script para '{prop.title}': {preview}...")
+                for prop in propositions
+            ]
+        mode = "via Batch API" if batch else f"{concurrency} em paralelo"
+        print(
+            f"Reescrevendo scripts para {len(schemas)} proposições ({mode}"
+            f"{', ignorando o cache' if force else ''})"
+        )
+
+        if batch:
+            # Cheaper and outside the per-request limits, but the results arrive within 24h
+            batch_id, results = tiktok_service.submit_script_batch(
+                schemas, style="informative", replace_existing=True, force=force
+            )
+            if batch_id:
+                print(f"Batch {batch_id} enviado; se interromper, retome com --batch-id {batch_id}")
+                try:
+                    results += tiktok_service.ingest_script_batch(batch_id)
+                except BatchFailed as exc:
+                    raise SystemExit(str(exc))
+            self._print_script_results(results)
+            return
+
+        # Each script replaces the old ones as soon as it is ready; a failure keeps the previous script
+        results = asyncio.run(tiktok_service.generate_scripts_bulk(
+            schemas, style="informative", concurrency=concurrency, replace_existing=True, force=force,
+            on_result=self._print_script_result,
+        ))
+        self._print_script_results(results, details=False)
+
+    @staticmethod
+    def _print_script_result(result) -> None:
+        if result.error:
+            print(f"Falha em '{result.proposition.title}': {result.error}")
+            return
+        if result.cached:
+            return
+        preview = (result.script or "")[:120].replace("\n", " ")
+        print(f"Novo script para '{result.proposition.title}': {preview}...")
+
+    def _print_script_results(self, results, details: bool = True) -> None:
+        if details:
+            for result in results:
+                self._print_script_result(result)
+        failed = sum(1 for result in results if result.error)
+        cached = sum(1 for result in results if result.cached)
+        print(f"{len(results) - failed - cached} roteiros gerados, {cached} inalterados (cache), {failed} falhas")
 
     def print_first_script(self) -> None:
         with self._db_session() as db:
@@ -95,7 +211,7 @@ class MontoyaCLI:
                 collection_type=prop.collection_type,
                 relevance_score=None,
             )
-            script = tiktok_service.generate_script(schema, style="informative", db=db)
+            script = get_tiktok_service().generate_script(schema, style="informative", db=db)
             print(script)
 
     # ------------------------------------------------------------------ Video generation (Sora)
@@ -106,6 +222,7 @@ class MontoyaCLI:
         source: Optional[str] = None,
         output_root: Optional[Path] = None,
     ) -> Path:
+        sora_video_service = get_sora_service()
         if sora_video_service is None:
             raise SystemExit("Serviço do Sora indisponível. Verifique o .env.")
 
@@ -113,8 +230,7 @@ class MontoyaCLI:
         with self._db_session() as db:
             proposition = self._get_target_proposition(db, proposition_id, level, source)
             script = self._get_latest_script(db, proposition.id)
-            raw_segments = self._parse_script_segments(script.content)
-            segments = self._ensure_segment_count([seg for seg in raw_segments if seg["audio"]], desired=2)
+            segments = self._segments_for_render(script.content)
 
             if not any(seg["audio"] for seg in segments):
                 raise SystemExit("O script não contém trechos válidos em [AUDIO]. Gere novamente.")
@@ -142,6 +258,49 @@ class MontoyaCLI:
             print(f"Vídeo final gerado em: {final_path}")
             return Path(final_path)
 
+    def generate_videos(
+        self,
+        limit: int = 10,
+        level: Optional[str] = None,
+        source: Optional[str] = None,
+        output_root: Optional[Path] = None,
+        resume: Optional[Path] = None,
+        include_rendered: bool = False,
+        script_concurrency: int = settings.BATCH_SCRIPT_CONCURRENCY,
+        render_concurrency: int = settings.BATCH_RENDER_CONCURRENCY,
+    ) -> Dict[str, int]:
+        sora_video_service = get_sora_service()
+        if sora_video_service is None:
+            raise SystemExit("Serviço do Sora indisponível. Verifique o .env.")
+
+        if resume:
+            manifest = BatchManifest.load(resume)
+            print(f"Retomando lote em {manifest.run_dir}: {len(manifest.unfinished())} vídeo(s) pendente(s)")
+        else:
+            with self._db_session() as db:
+                propositions = select_propositions(db, limit, level, source, include_rendered)
+                if not propositions:
+                    raise SystemExit("Nenhuma proposição encontrada para o lote.")
+                run_dir = self._select_run_directory(Path(output_root or BASE_DIR / "output" / "videos" / "batch"))
+                manifest = BatchManifest.create(
+                    run_dir, propositions, {"limit": limit, "level": level, "source": source}
+                )
+            print(f"Lote de {len(manifest.items)} vídeo(s) em {manifest.run_dir}")
+
+        pipeline = BatchVideoPipeline(
+            generate_script=lambda db, schema: get_tiktok_service().generate_script(schema, style="informative", db=db),
+            prepare_segments=self._segments_for_render,
+            render=sora_video_service.generate_video_from_script,
+            slugify=self._slugify,
+            session_factory=SessionLocal,
+            script_concurrency=script_concurrency,
+            render_concurrency=render_concurrency,
+        )
+        summary = asyncio.run(pipeline.run(manifest))
+        print(f"Lote concluído: {summary}")
+        print(f"Manifesto: {manifest.path}")
+        return summary
+
     # ------------------------------------------------------------------ Sora smoke test
     def test_sora(self, prompt: str = "A video of a cat", size: str = "720x1280", seconds: int = 4) -> None:
         endpoint = settings.AZURE_OPENAI_VIDEOS_ENDPOINT or settings.OPENAI_API_KEY
@@ -150,6 +309,8 @@ class MontoyaCLI:
         if not endpoint or not api_key:
             raise SystemExit("Configure AZURE_OPENAI_VIDEOS_ENDPOINT e AZURE_OPENAI_VIDEOS_API_KEY.")
 
+        from openai import OpenAI
+
         client = OpenAI(
             api_key=api_key,
             base_url=self._normalize_base_url(endpoint),
@@ -268,6 +429,10 @@ class MontoyaCLI:
         visual_parts = self._split_text_evenly(visual_base, desired)
         return [{"audio": audio_parts[i], "visual": visual_parts[i]} for i in range(desired)]
 
+    def _segments_for_render(self, content: str) -> List[Dict[str, str]]:
+        raw_segments = self._parse_script_segments(content)
+        return self._ensure_segment_count([seg for seg in raw_segments if seg["audio"]], desired=2)
+
     @staticmethod
     def _select_run_directory(base_dir: Path) -> Path:
         base_dir.mkdir(parents=True, exist_ok=True)
@@ -305,6 +470,8 @@ class MontoyaCLI:
         if proposition_id:
             prop = query.filter(DBProposition.id == proposition_id).first()
         else:
+            # Never pick a near-duplicate: its canonical story is rendered instead
+            query = query.filter(DBProposition.duplicate_of_id.is_(None))
             if level:
                 query = query.filter(DBProposition.level == level)
             if source:
@@ -358,8 +525,39 @@ def build_parser() -> argparse.ArgumentParser:
     collect_parser = subparsers.add_parser("collect", help="Executa a coleta para todas as fontes.")
     collect_parser.add_argument("--days-back", type=int, default=5)
     collect_parser.add_argument("--limit", type=int, default=5)
-
-    subparsers.add_parser("regenerate-scripts", help="Recria todos os roteiros no banco.")
+    collect_parser.add_argument(
+        "--summary-only", action="store_true", help="Mostra só as contagens por fonte, sem os itens coletados"
+    )
+
+    backfill_parser = subparsers.add_parser(
+        "backfill-camara", help="Carrega todas as proposições da Câmara em um intervalo de datas."
+    )
+    backfill_parser.add_argument("--from", dest="date_from", type=str, required=True, help="Data inicial (YYYY-MM-DD)")
+    backfill_parser.add_argument("--to", dest="date_to", type=str, help="Data final (YYYY-MM-DD)")
+    backfill_parser.add_argument("--tipos", nargs="+", default=["PL", "PEC", "MPV", "PLP"], help="Valores de siglaTipo")
+
+    subparsers.add_parser(
+        "reindex-duplicates", help="Calcula fingerprints de proposições antigas e agrupa quase-duplicatas."
+    )
+
+    search_parser = subparsers.add_parser("search", help="Busca textual nas proposições salvas (ranking BM25).")
+    search_parser.add_argument("query", type=str, help="Termos da busca (todos precisam aparecer)")
+    search_parser.add_argument("--limit", type=int, default=10, help="Resultados por página")
+    search_parser.add_argument("--page", type=int, default=1)
+    search_parser.add_argument("--level", type=str, help="Filtro de nível (federal, estadual, municipal)")
+    search_parser.add_argument("--source", type=str, help="Filtro de fonte (ex.: camara_deputados)")
+
+    regenerate_parser = subparsers.add_parser("regenerate-scripts", help="Recria todos os roteiros no banco.")
+    regenerate_parser.add_argument(
+        "--concurrency", type=int, default=settings.SCRIPT_CONCURRENCY, help="Roteiros gerados em paralelo"
+    )
+    regenerate_parser.add_argument(
+        "--force", action="store_true", help="Ignora o cache e gera de novo mesmo proposições inalteradas"
+    )
+    regenerate_parser.add_argument(
+        "--batch", action="store_true", help="Usa a Batch API da OpenAI (mais barata, resultado em até 24h)"
+    )
+    regenerate_parser.add_argument("--batch-id", type=str, help="Retoma um batch já enviado e grava os resultados")
     subparsers.add_parser("print-script", help="Gera e imprime um roteiro informativo para a primeira proposição.")
 
     video_parser = subparsers.add_parser("generate-video", help="Gera vídeo com o Sora.")
@@ -368,6 +566,20 @@ def build_parser() -> argparse.ArgumentParser:
     video_parser.add_argument("--source", type=str, help="Filtro de fonte (ex.: camara_deputados)")
     video_parser.add_argument("--output-dir", type=Path, default=BASE_DIR / "output" / "videos" / "sora")
 
+    batch_parser = subparsers.add_parser(
+        "generate-videos", help="Renderiza vídeos para várias proposições em lote (retomável)."
+    )
+    batch_parser.add_argument("--limit", type=int, default=10, help="Quantidade de proposições do lote")
+    batch_parser.add_argument("--level", type=str, help="Filtro de nível (federal, estadual, municipal)")
+    batch_parser.add_argument("--source", type=str, help="Filtro de fonte (ex.: camara_deputados)")
+    batch_parser.add_argument("--output-dir", type=Path, default=BASE_DIR / "output" / "videos" / "batch")
+    batch_parser.add_argument("--resume", type=Path, help="Manifesto (ou pasta do run) de um lote interrompido")
+    batch_parser.add_argument(
+        "--include-rendered", action="store_true", help="Inclui proposições que já têm vídeo concluído"
+    )
+    batch_parser.add_argument("--script-concurrency", type=int, default=settings.BATCH_SCRIPT_CONCURRENCY)
+    batch_parser.add_argument("--render-concurrency", type=int, default=settings.BATCH_RENDER_CONCURRENCY)
+
     test_parser = subparsers.add_parser("test-sora", help="Teste rápido do endpoint do Sora.")
     test_parser.add_argument("--prompt", type=str, default="A video of a cat")
     test_parser.add_argument("--size", type=str, default="720x1280")
@@ -382,9 +594,17 @@ def main() -> None:
     args = parser.parse_args()
 
     if args.command == "collect":
-        cli.collect(days_back=args.days_back, limit=args.limit)
+        cli.collect(days_back=args.days_back, limit=args.limit, details=not args.summary_only)
+    elif args.command == "backfill-camara":
+        cli.backfill_camara(date_from=args.date_from, date_to=args.date_to, sigla_tipos=args.tipos)
+    elif args.command == "reindex-duplicates":
+        cli.reindex_duplicates()
+    elif args.command == "search":
+        cli.search(args.query, limit=args.limit, page=args.page, level=args.level, source=args.source)
     elif args.command == "regenerate-scripts":
-        cli.regenerate_scripts()
+        cli.regenerate_scripts(
+            concurrency=args.concurrency, force=args.force, batch=args.batch, batch_id=args.batch_id
+        )
     elif args.command == "print-script":
         cli.print_first_script()
     elif args.command == "generate-video":
@@ -394,6 +614,17 @@ def main() -> None:
             source=args.source,
             output_root=args.output_dir,
         )
+    elif args.command == "generate-videos":
+        cli.generate_videos(
+            limit=args.limit,
+            level=args.level,
+            source=args.source,
+            output_root=args.output_dir,
+            resume=args.resume,
+            include_rendered=args.include_rendered,
+            script_concurrency=args.script_concurrency,
+            render_concurrency=args.render_concurrency,
+        )
     elif args.command == "test-sora":
         cli.test_sora(prompt=args.prompt, size=args.size, seconds=args.seconds)
     else:
@@ -1,16 +1,49 @@
-from typing import List
-from src.collectors.base import BaseCollector
-from src.models.schemas import Proposition
-from src.utils.scraper import scraper
+import asyncio
+from typing import Dict, List, Optional
+from src.collectors.base import BaseCollector, Watermark
+from src.models.records import PropositionRecord
+from src.utils.scraper import get_scraper
 
 class AlespCollector(BaseCollector):
     """
     Collector for ALESP via Google Search.
     """
     
-    def collect(self, days_back: int, limit: int) -> List[Proposition]:
+    def collect(self, days_back: int, limit: int) -> List[PropositionRecord]:
         self.logger.info("Starting ALESP collection...")
         
+        results_per_query = [
+            get_scraper().search(query, days_back=days_back, limit=5)
+            for query in self._build_queries()
+        ]
+        return self._merge_results(results_per_query, limit)
+
+    async def acollect(
+        self, days_back: int, limit: int, watermark: Optional[Watermark] = None
+    ) -> List[PropositionRecord]:
+        self.logger.info("Starting ALESP collection...")
+
+        days_back = self.effective_days_back(days_back, watermark)
+        results_per_query = await asyncio.gather(*(
+            get_scraper().asearch(query, days_back=days_back, limit=5, raise_errors=True)
+            for query in self._build_queries()
+        ), return_exceptions=True)
+        failures = [result for result in results_per_query if isinstance(result, Exception)]
+        items = self._merge_results([result for result in results_per_query if not isinstance(result, Exception)])
+        # The next window starts at this run: a failed query or a cut must not skip items
+        return self.limit_complete(items, limit, failures)
+
+    def _merge_results(self, results_per_query: List[List[Dict]], limit: Optional[int] = None) -> List[PropositionRecord]:
+        all_items = []
+        for results in results_per_query:
+            all_items.extend(self._to_propositions(results))
+                
+        unique_items = {item.link: item for item in all_items}.values()
+        
+        self.logger.info(f"ALESP collection finished. Found {len(unique_items)} items.")
+        return list(unique_items)[:limit]
+
+    def _build_queries(self) -> List[str]:
         sites_query = " OR ".join([f"site:{f}" for f in [
             "g1.globo.com", "folha.uol.com.br", "estadao.com.br",
             "oglobo.globo.com", "uol.com.br", "cartacapital.com.br"
@@ -21,28 +54,24 @@ class AlespCollector(BaseCollector):
             f'"ALESP" "deputado estadual" "aprova" ({sites_query})',
             f'"assembleia legislativa SP" "projeto" ({sites_query})'
         ]
-        
-        all_items = []
-        for query in queries:
-            results = scraper.search(query, days_back=days_back, limit=5)
-            for item in results:
-                # Filter for SP
-                if "g1.globo.com" in item['link'] and "/sp/" not in item['link']:
-                    continue
-                    
-                prop = Proposition(
-                    title=item['title'],
-                    description=item['description'],
-                    content=item.get('content'),
-                    link=item['link'],
-                    date=item['date'],
-                    source="alesp",
-                    level="estadual",
-                    collection_type="google_search"
-                )
-                all_items.append(prop)
+        return queries
+
+    def _to_propositions(self, results: List[Dict]) -> List[PropositionRecord]:
+        items = []
+        for item in results:
+            # Filter for SP
+            if "g1.globo.com" in item['link'] and "/sp/" not in item['link']:
+                continue
                 
-        unique_items = {item.link: item for item in all_items}.values()
-        
-        self.logger.info(f"ALESP collection finished. Found {len(unique_items)} items.")
-        return list(unique_items)[:limit]
+            prop = PropositionRecord(
+                title=item['title'],
+                description=item['description'],
+                content=item.get('content'),
+                link=item['link'],
+                date=item['date'],
+                source="alesp",
+                level="estadual",
+                collection_type="google_search"
+            )
+            items.append(prop)
+        return items
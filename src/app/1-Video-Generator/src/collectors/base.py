@@ -1,10 +1,34 @@
+import asyncio
 from abc import ABC, abstractmethod
-from typing import List
-from src.models.schemas import Proposition
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional, Sequence
+from src.models.records import PropositionRecord
 from src.core.logging import get_logger
+from src.utils.relevance import relevance_scorer
 
 logger = get_logger(__name__)
 
+@dataclass
+class Watermark:
+    """
+    Last position reached by a collector, persisted in the `collection_state` table.
+    """
+    last_id: Optional[int] = None
+    last_date: Optional[str] = None
+    updated_at: Optional[datetime] = None
+
+class IncompleteCollection(Exception):
+    """
+    Raised by `acollect` when the run did not cover its whole window (a query
+    failed, or results were cut at `limit`). The items found are still saved,
+    but the watermark is not advanced, so the next run searches the same window.
+    """
+
+    def __init__(self, items: List[PropositionRecord], reason: str):
+        super().__init__(reason)
+        self.items = items
+
 class BaseCollector(ABC):
     """
     Abstract base class for data collectors.
@@ -14,28 +38,70 @@ class BaseCollector(ABC):
         self.logger = logger
 
     @abstractmethod
-    def collect(self, days_back: int, limit: int) -> List[Proposition]:
+    def collect(self, days_back: int, limit: int) -> List[PropositionRecord]:
         """
         Collect data from the source.
         """
         pass
 
-    def filter_relevant(self, items: List[Proposition]) -> List[Proposition]:
+    async def acollect(
+        self, days_back: int, limit: int, watermark: Optional[Watermark] = None
+    ) -> List[PropositionRecord]:
+        """
+        Collect data from the source without blocking the event loop.
+
+        Collectors backed by the shared async HTTP pool override this; the default
+        falls back to running the blocking `collect` in a worker thread. When a
+        `watermark` from a previous run is given, collectors only fetch the delta.
+        """
+        return await asyncio.to_thread(self.collect, days_back, limit)
+
+    def next_watermark(self, items: List[PropositionRecord], previous: Optional[Watermark]) -> Watermark:
+        """
+        Compute the watermark to persist after a run that returned `items`.
+        """
+        dates = [item.date for item in items if item.date]
+        if previous and previous.last_date:
+            dates.append(previous.last_date)
+        return Watermark(
+            last_id=previous.last_id if previous else None,
+            last_date=max(dates) if dates else None,
+        )
+
+    @staticmethod
+    def limit_complete(items: List[PropositionRecord], limit: int, failures: Sequence[Exception] = ()) -> List[PropositionRecord]:
+        """
+        Cut `items` at `limit`; raise `IncompleteCollection` with the kept items
+        when some `failures` happened or items had to be dropped.
+        """
+        kept = items[:limit]
+        if failures:
+            raise IncompleteCollection(kept, f"{len(failures)} failed queries: {failures[0]}")
+        if len(items) > limit:
+            raise IncompleteCollection(kept, f"{len(items) - limit} items over the limit of {limit}")
+        return kept
+
+    @staticmethod
+    def effective_days_back(days_back: int, watermark: Optional[Watermark]) -> int:
+        """
+        Narrow the search window to the time elapsed since the last successful run.
+        """
+        if not watermark or not watermark.updated_at:
+            return days_back
+        elapsed = (datetime.utcnow() - watermark.updated_at).days + 1
+        return max(1, min(days_back, elapsed))
+
+    def filter_relevant(self, items: List[PropositionRecord]) -> List[PropositionRecord]:
         """
-        Filter items by relevance keywords.
+        Keep items matching the relevance keywords, ranked by weighted score.
         """
-        keywords = [
-            'imposto', 'taxa', 'tributo', 'IPVA', 'IPI', 'ICMS',
-            'aumento', 'redução', 'benefício', 'auxílio', 'bolsa',
-            'transporte', 'educação', 'saúde', 'previdência',
-            'salário', 'mínimo', 'trabalho', 'emprego'
-        ]
+        scores = relevance_scorer.score_batch(items)
         
         relevant = []
-        for item in items:
-            text = f"{item.title} {item.description} {item.content or ''}".lower()
-            if any(keyword.lower() in text for keyword in keywords):
-                item.relevance_score = 10 # Simple score for now
+        for item, score in zip(items, scores):
+            if score > 0:
+                item.relevance_score = score
                 relevant.append(item)
                 
+        relevant.sort(key=lambda item: item.relevance_score, reverse=True)
         return relevant
@@ -1,57 +1,224 @@
 import requests
+import asyncio
+from contextlib import aclosing
 from datetime import datetime, timedelta
-from typing import List
-from src.collectors.base import BaseCollector
-from src.models.schemas import Proposition
+from typing import AsyncIterator, Dict, List, Optional, Sequence
+from src.collectors.base import BaseCollector, Watermark
+from src.core.config import settings
+from src.models.records import PropositionRecord
+from src.utils.http import http_pool
 
 class CamaraCollector(BaseCollector):
     """
     Collector for Camara dos Deputados API.
     """
     BASE_URL = "https://dadosabertos.camara.leg.br/api/v2"
-    
-    def collect(self, days_back: int, limit: int) -> List[Proposition]:
+    MAX_PAGE_SIZE = 100
+
+    def collect(self, days_back: int, limit: int) -> List[PropositionRecord]:
         self.logger.info("Starting Camara collection...")
-        
-        data_inicio = (datetime.now() - timedelta(days=days_back)).strftime('%Y-%m-%d')
-        
+
         url = f"{self.BASE_URL}/proposicoes"
-        params = {
-            'itens': limit,
-            'ordem': 'DESC',
-            'ordenarPor': 'id',
-            'siglaTipo': 'PL', # Default to PL
-            'dataInicio': data_inicio
-        }
-        
+        params = self._build_params('PL', min(max(limit, 1), self.MAX_PAGE_SIZE), days_back=days_back)
+
         try:
             response = requests.get(url, params=params, timeout=15)
-            
-            # Fallback if date filter fails (API issue sometimes)
-            if response.status_code == 400:
-                self.logger.warning("Camara API rejected date filter, retrying without it.")
-                del params['dataInicio']
-                response = requests.get(url, params=params, timeout=15)
-                
-            response.raise_for_status()
-            data = response.json().get('dados', [])
-            
-            propositions = []
-            for item in data:
-                prop = Proposition(
-                    title=f"{item.get('siglaTipo')} {item.get('numero')}/{item.get('ano')}",
-                    description=item.get('ementa', ''),
-                    link=item.get('uri'),
-                    date=item.get('dataApresentacao')[:10] if item.get('dataApresentacao') else None,
-                    source="camara_deputados",
-                    level="federal",
-                    collection_type="api"
-                )
-                propositions.append(prop)
-                
+            self._check_response(response)
+            propositions = [self._to_proposition(item) for item in response.json().get('dados', [])]
+
             self.logger.info(f"Camara collection finished. Found {len(propositions)} items.")
             return propositions
-            
+
         except Exception as e:
             self.logger.error(f"Error collecting from Camara: {e}")
             return []
+
+    async def acollect(
+        self, days_back: int, limit: int, watermark: Optional[Watermark] = None
+    ) -> List[PropositionRecord]:
+        self.logger.info("Starting Camara collection...")
+
+        # With a watermark the run reads everything newer than it, ignoring `limit`:
+        # the watermark then moves to the newest id, and anything left unread between
+        # it and the old watermark would never be fetched again. For the same reason a
+        # failed siglaTipo fails the whole run instead of being skipped.
+        incremental = watermark is not None and watermark.last_id is not None
+        propositions: List[PropositionRecord] = []
+        try:
+            stream = self.astream(
+                days_back=days_back,
+                page_size=min(max(limit, 1), settings.CAMARA_PAGE_SIZE),
+                watermark=watermark,
+                raise_errors=incremental,
+            )
+            async with aclosing(stream):
+                async for prop in stream:
+                    propositions.append(prop)
+                    if not incremental and len(propositions) >= limit:
+                        break
+
+            self.logger.info(f"Camara collection finished. Found {len(propositions)} items.")
+            return propositions
+
+        except Exception as e:
+            self.logger.error(f"Error collecting from Camara: {e}")
+            return []
+
+    async def astream(
+        self,
+        days_back: Optional[int] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        sigla_tipos: Optional[Sequence[str]] = None,
+        page_size: Optional[int] = None,
+        watermark: Optional[Watermark] = None,
+        raise_errors: bool = False,
+    ) -> AsyncIterator[PropositionRecord]:
+        """
+        Stream propositions page by page, following the API's `next` links.
+
+        Each `siglaTipo` is paged concurrently and the next page of a type is
+        prefetched while the current one is being consumed. With a `watermark`,
+        paging stops at the last id seen in a previous run (pages are ordered by
+        id DESC). A type whose request fails is logged and skipped, or re-raised
+        with `raise_errors`.
+        """
+        tipos = list(sigla_tipos or settings.CAMARA_SIGLA_TIPOS)
+        page_size = min(max(page_size or settings.CAMARA_PAGE_SIZE, 1), self.MAX_PAGE_SIZE)
+        last_id = watermark.last_id if watermark else None
+
+        def stream_for(tipo: str) -> AsyncIterator[PropositionRecord]:
+            params = self._build_params(tipo, page_size, days_back, date_from, date_to)
+            return self._astream_tipo(params, last_id)
+
+        if len(tipos) == 1:
+            async with aclosing(stream_for(tipos[0])) as stream:
+                async for prop in stream:
+                    yield prop
+            return
+
+        # Merge the per-type streams; the bounded queue keeps memory flat
+        queue: asyncio.Queue = asyncio.Queue(maxsize=page_size * len(tipos))
+        done_marker = object()
+
+        async def pump(tipo: str) -> None:
+            try:
+                async with aclosing(stream_for(tipo)) as stream:
+                    async for prop in stream:
+                        await queue.put(prop)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.error(f"Error streaming {tipo} from Camara: {e}")
+                if raise_errors:
+                    await queue.put(e)
+                    return
+            await queue.put(done_marker)
+
+        tasks = [asyncio.create_task(pump(tipo)) for tipo in tipos]
+        try:
+            remaining = len(tasks)
+            while remaining:
+                item = await queue.get()
+                if item is done_marker:
+                    remaining -= 1
+                    continue
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _astream_tipo(self, params: Dict, last_id: Optional[int]) -> AsyncIterator[PropositionRecord]:
+        next_page = asyncio.create_task(self._fetch_page(f"{self.BASE_URL}/proposicoes", params))
+        try:
+            while next_page is not None:
+                payload = await next_page
+                page_data = payload.get('dados', [])
+                reached_watermark = last_id is not None and any(
+                    (item.get('id') or 0) <= last_id for item in page_data
+                )
+
+                # Prefetch the next page while this one is consumed
+                next_url = None if reached_watermark else self._next_link(payload)
+                next_page = asyncio.create_task(self._fetch_page(next_url)) if next_url else None
+
+                for item in page_data:
+                    if last_id is not None and (item.get('id') or 0) <= last_id:
+                        break
+                    yield self._to_proposition(item)
+        finally:
+            if next_page is not None and not next_page.done():
+                next_page.cancel()
+                await asyncio.gather(next_page, return_exceptions=True)
+
+    async def _fetch_page(self, url: str, params: Optional[Dict] = None) -> Dict:
+        response = await http_pool.get(url, params=params)
+        self._check_response(response)
+        return response.json()
+
+    def _check_response(self, response) -> None:
+        # Never retry without the date filter: that would silently widen the window
+        if response.status_code == 400:
+            raise ValueError(f"Camara API rejected the request (400): {response.text[:200]}")
+        response.raise_for_status()
+
+    @staticmethod
+    def _next_link(payload: Dict) -> Optional[str]:
+        for link in payload.get('links', []):
+            if link.get('rel') == 'next':
+                return link.get('href')
+        return None
+
+    def next_watermark(self, items: List[PropositionRecord], previous: Optional[Watermark]) -> Watermark:
+        watermark = super().next_watermark(items, previous)
+        ids = [self._proposition_id(item.link) for item in items]
+        ids = [i for i in ids if i is not None]
+        if watermark.last_id is not None:
+            ids.append(watermark.last_id)
+        watermark.last_id = max(ids) if ids else None
+        return watermark
+
+    @staticmethod
+    def _proposition_id(uri: Optional[str]) -> Optional[int]:
+        """Extract the numeric id from a `.../proposicoes/<id>` URI."""
+        try:
+            return int(uri.rstrip('/').rsplit('/', 1)[-1])
+        except (AttributeError, ValueError):
+            return None
+
+    def _build_params(
+        self,
+        sigla_tipo: str,
+        page_size: int,
+        days_back: Optional[int] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+    ) -> Dict:
+        params = {
+            'itens': page_size,
+            'pagina': 1,
+            'ordem': 'DESC',
+            'ordenarPor': 'id',
+            'siglaTipo': sigla_tipo,
+        }
+        if date_from is None and days_back:
+            date_from = (datetime.now() - timedelta(days=days_back)).strftime('%Y-%m-%d')
+        if date_from:
+            params['dataInicio'] = date_from
+        if date_to:
+            params['dataFim'] = date_to
+        return params
+
+    def _to_proposition(self, item: Dict) -> PropositionRecord:
+        return PropositionRecord(
+            title=f"{item.get('siglaTipo')} {item.get('numero')}/{item.get('ano')}",
+            description=item.get('ementa', ''),
+            link=item.get('uri'),
+            date=item.get('dataApresentacao')[:10] if item.get('dataApresentacao') else None,
+            source="camara_deputados",
+            level="federal",
+            collection_type="api"
+        )
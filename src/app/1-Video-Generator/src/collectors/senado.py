@@ -1,16 +1,50 @@
-from typing import List
-from src.collectors.base import BaseCollector
-from src.models.schemas import Proposition
-from src.utils.scraper import scraper
+import asyncio
+from typing import Dict, List, Optional
+from src.collectors.base import BaseCollector, Watermark
+from src.models.records import PropositionRecord
+from src.utils.scraper import get_scraper
 
 class SenadoCollector(BaseCollector):
     """
     Collector for Senado Federal via Google Search.
     """
     
-    def collect(self, days_back: int, limit: int) -> List[Proposition]:
+    def collect(self, days_back: int, limit: int) -> List[PropositionRecord]:
         self.logger.info("Starting Senado collection...")
         
+        results_per_query = [
+            get_scraper().search(query, days_back=days_back, limit=5)
+            for query in self._build_queries()
+        ]
+        return self._merge_results(results_per_query, limit)
+
+    async def acollect(
+        self, days_back: int, limit: int, watermark: Optional[Watermark] = None
+    ) -> List[PropositionRecord]:
+        self.logger.info("Starting Senado collection...")
+
+        days_back = self.effective_days_back(days_back, watermark)
+        results_per_query = await asyncio.gather(*(
+            get_scraper().asearch(query, days_back=days_back, limit=5, raise_errors=True)
+            for query in self._build_queries()
+        ), return_exceptions=True)
+        failures = [result for result in results_per_query if isinstance(result, Exception)]
+        items = self._merge_results([result for result in results_per_query if not isinstance(result, Exception)])
+        # The next window starts at this run: a failed query or a cut must not skip items
+        return self.limit_complete(items, limit, failures)
+
+    def _merge_results(self, results_per_query: List[List[Dict]], limit: Optional[int] = None) -> List[PropositionRecord]:
+        all_items = []
+        for results in results_per_query:
+            all_items.extend(self._to_propositions(results))
+                
+        # Deduplicate by link
+        unique_items = {item.link: item for item in all_items}.values()
+        
+        self.logger.info(f"Senado collection finished. Found {len(unique_items)} items.")
+        return list(unique_items)[:limit]
+
+    def _build_queries(self) -> List[str]:
         sites_query = " OR ".join([f"site:{f}" for f in [
             "g1.globo.com", "folha.uol.com.br", "estadao.com.br",
             "oglobo.globo.com", "uol.com.br", "cartacapital.com.br"
@@ -21,30 +55,25 @@ class SenadoCollector(BaseCollector):
             f'"Senado" "senador" "aprova" ({sites_query})',
             f'"Senado Federal" "matéria" "tramitação" ({sites_query})'
         ]
-        
-        all_items = []
-        for query in queries:
-            results = scraper.search(query, days_back=days_back, limit=5)
-            for item in results:
-                # Filter to ensure it's about Senado
-                text = f"{item['title']} {item['description']} {item.get('content', '')}".lower()
-                if 'senado' not in text and 'senador' not in text:
-                    continue
-                    
-                prop = Proposition(
-                    title=item['title'],
-                    description=item['description'],
-                    content=item.get('content'),
-                    link=item['link'],
-                    date=item['date'],
-                    source="senado_federal",
-                    level="federal",
-                    collection_type="google_search"
-                )
-                all_items.append(prop)
+        return queries
+
+    def _to_propositions(self, results: List[Dict]) -> List[PropositionRecord]:
+        items = []
+        for item in results:
+            # Filter to ensure it's about Senado
+            text = f"{item['title']} {item['description']} {item.get('content', '')}".lower()
+            if 'senado' not in text and 'senador' not in text:
+                continue
                 
-        # Deduplicate by link
-        unique_items = {item.link: item for item in all_items}.values()
-        
-        self.logger.info(f"Senado collection finished. Found {len(unique_items)} items.")
-        return list(unique_items)[:limit]
+            prop = PropositionRecord(
+                title=item['title'],
+                description=item['description'],
+                content=item.get('content'),
+                link=item['link'],
+                date=item['date'],
+                source="senado_federal",
+                level="federal",
+                collection_type="google_search"
+            )
+            items.append(prop)
+        return items
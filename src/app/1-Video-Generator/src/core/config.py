@@ -1,5 +1,5 @@
 import os
-from typing import Optional
+from typing import List, Optional
 from pathlib import Path
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -18,13 +18,84 @@ class Settings(BaseSettings):
     AZURE_OPENAI_VIDEOS_API_KEY: Optional[str] = None
     AZURE_OPENAI_VIDEOS_MODEL: str = "sora-2"
     AZURE_OPENAI_VIDEOS_SIZE: str = "720x1280"
+    SORA_MAX_CONCURRENT_SEGMENTS: int = 2 # segments rendered in parallel per video
+    SORA_POLL_MIN_INTERVAL: float = 2.0 # first status checks come quickly...
+    SORA_POLL_MAX_INTERVAL: float = 15.0 # ...then back off up to this interval
+    SORA_POLL_BACKOFF: float = 1.5
+    SORA_POLL_DEADLINE: float = 1200.0 # give up on a render after this many seconds
+    SORA_DOWNLOAD_CHUNK_KB: int = 1024 # downloads are streamed to disk in chunks of this size
+    SORA_DOWNLOAD_ATTEMPTS: int = 3 # an interrupted download resumes from the bytes already saved
     
     # Collection Settings
     DEFAULT_DAYS_BACK: int = 30
     DEFAULT_LIMIT_PER_SOURCE: int = 10
     INCLUDE_MUNICIPAL: bool = True
     MAX_WORKERS: int = 10
-    
+    CAMARA_PAGE_SIZE: int = 100
+    CAMARA_SIGLA_TIPOS: List[str] = ["PL"]
+    NEAR_DUPLICATE_MAX_DISTANCE: int = 3
+
+    # HTTP Client Settings (shared async pool used by the collectors)
+    HTTP_TIMEOUT: float = 15.0
+    HTTP_MAX_CONNECTIONS: int = 50
+    HTTP_MAX_CONNECTIONS_PER_HOST: int = 6
+
+    # Article extraction stage of the Google scraper
+    EXTRACT_MAX_WORKERS: int = 8
+    EXTRACT_MAX_PER_DOMAIN: int = 2
+    EXTRACT_TIMEOUT: float = 10.0
+    EXTRACT_DEADLINE: float = 20.0
+
+    # On-disk cache of extracted article pages
+    PAGE_CACHE_ENABLED: bool = True
+    PAGE_CACHE_PATH: Optional[str] = None
+    PAGE_CACHE_TTL_HOURS: int = 24
+    PAGE_CACHE_MAX_MB: int = 200
+
+    # Google Custom Search query cache (the daily API quota is the scaling limit)
+    SEARCH_CACHE_ENABLED: bool = True
+    SEARCH_CACHE_PATH: Optional[str] = None
+    SEARCH_CACHE_TTL_MINUTES: int = 360
+
+    # Script generation (OpenAI chat completions)
+    OPENAI_RPM_LIMIT: int = 500 # requests per minute of the account tier
+    OPENAI_TPM_LIMIT: int = 30000 # tokens per minute (prompt + max_tokens are reserved up front)
+    SCRIPT_CONCURRENCY: int = 8 # completions in flight in bulk generation
+    OPENAI_BATCH_BASE_URL: str = "https://api.openai.com/v1" # Batch API (regenerate-scripts --batch)
+    OPENAI_BATCH_COMPLETION_WINDOW: str = "24h"
+    OPENAI_BATCH_POLL_INTERVAL: float = 60.0
+
+    # Batch rendering (generate-videos)
+    BATCH_SCRIPT_CONCURRENCY: int = 4 # scripts written ahead while videos render
+    BATCH_RENDER_CONCURRENCY: int = 2 # videos rendering at once (each renders its segments in parallel too)
+
+    # Video assembly (ffmpeg)
+    FFMPEG_BINARY: Optional[str] = None # default: ffmpeg on PATH, then the one bundled with imageio-ffmpeg
+    ASSEMBLY_WORKERS: int = 2 # segments normalized in parallel
+    ASSEMBLY_FPS: float = 24.0 # frame rate used when the segments disagree
+    ASSEMBLY_CRF: int = 18
+    ASSEMBLY_PRESET: str = "veryfast"
+    ASSEMBLY_OVERLAY_IMAGE: Optional[str] = None # branding image placed over every final video
+
+    # Content-addressed cache of rendered Sora segments
+    SEGMENT_CACHE_ENABLED: bool = True
+    SEGMENT_CACHE_PATH: Optional[str] = None
+    SEGMENT_CACHE_MAX_MB: int = 2048
+
+    # Database Settings (SQLite; default data/montoya.db in the module directory, a relative
+    # DATABASE_PATH is made absolute against the working directory at startup)
+    DATABASE_PATH: Optional[str] = None
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_CACHE_SIZE_MB: int = 64
+    SQLITE_MMAP_SIZE_MB: int = 256
+
+    # Background jobs (POST endpoints enqueue; an in-process worker pool runs them)
+    JOB_WORKERS: int = 2
+    JOB_POLL_INTERVAL: float = 1.0
+    JOB_HEARTBEAT_SECONDS: float = 10.0
+    JOB_STALE_SECONDS: float = 60.0
+    JOB_MAX_ATTEMPTS: int = 3
+
     # Server Settings
     PORT: int = 8000
     HOST: str = "0.0.0.0"
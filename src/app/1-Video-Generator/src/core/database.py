@@ -1,16 +1,61 @@
-from sqlalchemy import create_engine
+import shutil
+from pathlib import Path
+
+from sqlalchemy import create_engine, event, inspect, text
 from sqlalchemy.orm import sessionmaker, declarative_base
-from src.core.config import settings
+from src.core.config import settings, BASE_DIR
+
+# Versioned demo data; never opened directly, a missing default database starts as a copy of it
+SEED_DATABASE_PATH = BASE_DIR / "montoya.db"
+
+def database_path() -> Path:
+    """
+    Absolute path of the SQLite database.
+
+    `DATABASE_PATH` is made absolute against the working directory at startup;
+    the default, `data/montoya.db` (not versioned), lives in the module directory
+    wherever the app runs from.
+    """
+    return Path(settings.DATABASE_PATH).expanduser().resolve() if settings.DATABASE_PATH else BASE_DIR / "data" / "montoya.db"
+
+def build_engine(path: Path, read_only: bool = False):
+    """
+    Create an engine whose connections are tuned for concurrent use.
 
-# Use a local SQLite database
-DATABASE_URL = "sqlite:///./montoya.db"
+    WAL lets readers proceed while the API or a CLI process writes, and the busy
+    timeout makes writers wait for the lock instead of failing with
+    `database is locked`. Read-only engines refuse writes at the connection level.
+    """
+    engine = create_engine(
+        f"sqlite:///{path}",
+        connect_args={
+            "check_same_thread": False, # Needed for SQLite
+            "timeout": settings.SQLITE_BUSY_TIMEOUT_MS / 1000,
+        },
+    )
 
-engine = create_engine(
-    DATABASE_URL, 
-    connect_args={"check_same_thread": False} # Needed for SQLite
-)
+    @event.listens_for(engine, "connect")
+    def _configure_connection(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+        cursor.execute(f"PRAGMA cache_size=-{int(settings.SQLITE_CACHE_SIZE_MB) * 1024}")
+        cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE_MB) * 1024 * 1024}")
+        if read_only:
+            cursor.execute("PRAGMA query_only=ON")
+        cursor.close()
+
+    return engine
+
+DATABASE_PATH = database_path()
+DATABASE_URL = f"sqlite:///{DATABASE_PATH}"
+
+engine = build_engine(DATABASE_PATH)
+read_engine = build_engine(DATABASE_PATH, read_only=True)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
 
 Base = declarative_base()
 
@@ -22,6 +67,71 @@ def get_db():
     finally:
         db.close()
 
+def get_read_db():
+    """Dependency for a read-only DB session, for endpoints that only query."""
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
 def init_db():
     """Initialize database tables."""
+    _seed_database()
+    _upgrade_schema()
     Base.metadata.create_all(bind=engine)
+
+def _seed_database():
+    """Create the default database from the versioned seed on the first run."""
+    if settings.DATABASE_PATH or DATABASE_PATH.exists():
+        return
+    DATABASE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    if SEED_DATABASE_PATH.exists():
+        shutil.copyfile(SEED_DATABASE_PATH, DATABASE_PATH)
+
+def _upgrade_schema():
+    """
+    Bring tables created by older versions up to date.
+
+    `create_all` only creates missing tables, so columns and indexes added to
+    existing models are created here.
+    """
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    column_type = column.type.compile(dialect=engine.dialect)
+                    conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+            if "link_key" in table.columns and "link_key" not in existing:
+                _backfill_proposition_keys(conn)
+            for index in table.indexes:
+                index.create(bind=conn, checkfirst=True)
+        if inspector.has_table("propositions") and not inspector.has_table("propositions_fts"):
+            from src.models.db_models import create_propositions_fts
+            create_propositions_fts(conn, rebuild=True)
+
+def _backfill_proposition_keys(conn):
+    """
+    Fill the normalized dedup keys of propositions stored before they existed.
+
+    The first row wins; later rows with the same key keep NULL so the unique
+    indexes can still be created over legacy duplicates.
+    """
+    from src.utils.normalize import normalize_link, normalize_title
+
+    seen_links, seen_titles = set(), set()
+    rows = conn.execute(text("SELECT id, link, title FROM propositions ORDER BY id")).fetchall()
+    for row_id, link, title in rows:
+        link_key, title_key = normalize_link(link), normalize_title(title)
+        link_key = None if link_key in seen_links else link_key
+        title_key = None if title_key in seen_titles else title_key
+        seen_links.add(link_key)
+        seen_titles.add(title_key)
+        conn.execute(
+            text("UPDATE propositions SET link_key = :link_key, title_key = :title_key WHERE id = :id"),
+            {"link_key": link_key, "title_key": title_key, "id": row_id},
+        )
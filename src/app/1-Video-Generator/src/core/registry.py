@@ -0,0 +1,62 @@
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from src.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class ServiceRegistry:
+    """
+    Shared services, each built by its factory on first use.
+
+    Modules register a factory at import (cheap) instead of constructing the
+    service; the API resolves them through FastAPI dependencies and the CLI
+    through `get`, so a process only pays for the clients it actually uses.
+    A factory may return None for an optional service that is not
+    configured; that answer is cached like any other instance.
+    """
+
+    def __init__(self):
+        self._factories: Dict[str, Callable[[], Any]] = {}
+        self._instances: Dict[str, Any] = {}
+        self._lock = threading.RLock()
+
+    def register(self, name: str, factory: Callable[[], Any]) -> None:
+        with self._lock:
+            self._factories[name] = factory
+            self._instances.pop(name, None)
+
+    def get(self, name: str) -> Any:
+        try:
+            return self._instances[name]
+        except KeyError:
+            pass
+        with self._lock:
+            # Another thread may have built it while we waited
+            if name not in self._instances:
+                if name not in self._factories:
+                    raise KeyError(f"Service '{name}' is not registered")
+                self._instances[name] = self._factories[name]()
+                logger.debug(f"Service '{name}' created")
+            return self._instances[name]
+
+    def created(self, name: str) -> bool:
+        return name in self._instances
+
+    def override(self, name: str, instance: Any) -> None:
+        """Use `instance` instead of building the service (tests, scripts)."""
+        with self._lock:
+            self._instances[name] = instance
+
+    def reset(self, name: Optional[str] = None) -> None:
+        """Forget built instances so the next `get` calls the factory again."""
+        with self._lock:
+            if name is None:
+                self._instances.clear()
+            else:
+                self._instances.pop(name, None)
+
+
+# Global instance
+services = ServiceRegistry()
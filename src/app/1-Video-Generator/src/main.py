@@ -1,30 +1,54 @@
+import json
 import math
 import re
+from contextlib import asynccontextmanager
 from pathlib import Path
+from typing import Literal
 
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from src.core.config import settings, BASE_DIR
 from src.core.logging import setup_logging, get_logger
-from src.core.database import init_db, get_db
-from src.models.schemas import CollectionSummary, TikTokScriptRequest, VideoGenerationRequest
-from src.services.collector_service import collector_service
-from src.services.tiktok_service import tiktok_service
-from src.services.sora_service import sora_video_service
+from src.core.database import init_db, get_db, get_read_db, ReadSessionLocal, SessionLocal
+from src.models.db_models import DBJob
+from src.models.schemas import (
+    JobStatus,
+    PropositionSearchPage,
+    RecordPage,
+    TikTokScriptRequest,
+    VideoGenerationRequest,
+)
+from src.services.collector_service import get_collector_service
+from src.services.job_service import JobContext, job_queue
+from src.services.query_service import record_queries
+from src.services.search_service import proposition_search
+from src.services.tiktok_service import get_tiktok_service
+from src.services.sora_service import SoraVideoService, get_sora_service
+from src.utils.http import http_pool
 
 # Setup logging
 setup_logging()
 logger = get_logger(__name__)
 
-# Initialize DB
-init_db()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Schema upgrades run once at startup, not on import (CLI and tests import this module too)
+    init_db()
+    # Resume jobs left queued (or interrupted) by a previous run
+    job_queue.ensure_workers()
+    yield
+    await job_queue.shutdown()
+    # Release pooled connections held by the collectors
+    await http_pool.aclose()
 
 app = FastAPI(
     title="Montoya API",
     description="API for collecting legislative data and generating content.",
-    version="2.2.0"
+    version="2.2.0",
+    lifespan=lifespan,
 )
 
 # CORS
@@ -40,25 +64,205 @@ app.add_middleware(
 async def root():
     return {"message": "Montoya API is running", "environment": settings.ENVIRONMENT}
 
-@app.post("/collect", response_model=CollectionSummary)
-async def trigger_collection(days_back: int = 30, limit: int = 10, db: Session = Depends(get_db)):
+def _job_status(job: DBJob) -> JobStatus:
+    return JobStatus(
+        id=job.id,
+        kind=job.kind,
+        status=job.status,
+        progress=job.progress or 0.0,
+        progress_message=job.progress_message,
+        result=json.loads(job.result) if job.result else None,
+        error_message=job.error_message,
+        cancel_requested=bool(job.cancel_requested),
+        attempts=job.attempts or 0,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+    )
+
+@app.get("/jobs/{job_id}", response_model=JobStatus)
+async def get_job(job_id: int, db: Session = Depends(get_read_db)):
+    """
+    Status, progress and result of a background job.
+    """
+    job = db.get(DBJob, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return _job_status(job)
+
+@app.post("/jobs/{job_id}/cancel", response_model=JobStatus)
+async def cancel_job(job_id: int, db: Session = Depends(get_db)):
+    """
+    Cancel a queued job, or ask a running one to stop at its next checkpoint.
+    """
+    job = job_queue.cancel(db, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return _job_status(job)
+
+@job_queue.handler("collect")
+async def _run_collect_job(ctx: JobContext):
+    db = SessionLocal()
+    try:
+        await ctx.aprogress(0.0, "Collecting from all sources")
+        summary = await get_collector_service().run_collection(
+            ctx.payload["days_back"], ctx.payload["limit"], db,
+            run_id=ctx.job_id, details=ctx.payload.get("details", True),
+        )
+        return summary.model_dump(mode="json")
+    finally:
+        db.close()
+
+@app.post("/collect", response_model=JobStatus, status_code=202)
+async def trigger_collection(
+    days_back: int = 30,
+    limit: int = 10,
+    details: bool = Query(True, description="Embed every item in the result; false returns counts only"),
+    db: Session = Depends(get_db),
+):
+    """
+    Enqueue a full data collection from all sources; the summary is the job result.
+    """
+    job = job_queue.enqueue(db, "collect", {"days_back": days_back, "limit": limit, "details": details})
+    return _job_status(job)
+
+@app.get("/collect/{job_id}/items", response_model=RecordPage)
+async def list_collected_items(
+    job_id: int,
+    collector: str | None = Query(None, description="A key of the summary's sources_summary"),
+    fields: str | None = Query(None, description="Comma-separated columns to return"),
+    cursor: int | None = None,
+    limit: int | None = Query(None, ge=1, description="Page size (default 50, max 500); caps the rows of an NDJSON export"),
+    format: Literal["json", "ndjson"] = "json",
+    db: Session = Depends(get_read_db),
+):
+    """
+    Items found by a collection job, in collection order, with keyset pagination.
+    """
+    job = db.get(DBJob, job_id)
+    if job is None or job.kind != "collect":
+        raise HTTPException(status_code=404, detail=f"Collection job {job_id} not found")
+    return _list_records(
+        db, "collection_items", format, fields=fields, filters={"job_id": job_id, "collector": collector},
+        date_from=None, date_to=None, cursor=cursor, limit=limit,
+    )
+
+@app.get("/propositions/search", response_model=PropositionSearchPage)
+async def search_propositions(
+    q: str = Query(..., min_length=1, description="Free text; every word must match (as a prefix)"),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    level: str | None = None,
+    source: str | None = None,
+    include_duplicates: bool = False,
+    db: Session = Depends(get_read_db),
+):
+    """
+    Full-text search over stored propositions, ranked by BM25.
+    """
+    return proposition_search.search(
+        db, q, limit=limit, offset=offset, level=level, source=source,
+        include_duplicates=include_duplicates,
+    )
+
+def _list_records(db: Session, resource: str, format: str, **query):
+    """Serve one JSON page, or stream every matching row as NDJSON for exports."""
+    try:
+        if format == "ndjson":
+            # Fail before the response starts; a stream cannot turn into a 400 later
+            record_queries.validate(resource, query["fields"], query["filters"], query["date_from"], query["date_to"])
+            return StreamingResponse(_ndjson_lines(resource, query), media_type="application/x-ndjson")
+        query["limit"] = query["limit"] or 50
+        return record_queries.page(db, resource, **query)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+def _ndjson_lines(resource: str, query: dict):
+    # The request's session is closed once the handler returns, so the stream owns its own
+    db = ReadSessionLocal()
+    try:
+        for record in record_queries.iter_records(db, resource, **query):
+            yield json.dumps(record, ensure_ascii=False) + "\n"
+    finally:
+        db.close()
+
+@app.get("/propositions", response_model=RecordPage)
+async def list_propositions(
+    level: str | None = None,
+    source: str | None = None,
+    date_from: str | None = Query(None, description="YYYY-MM-DD, on the proposition date"),
+    date_to: str | None = Query(None, description="YYYY-MM-DD, on the proposition date"),
+    fields: str | None = Query(None, description="Comma-separated columns to return"),
+    cursor: int | None = None,
+    limit: int | None = Query(None, ge=1, description="Page size (default 50, max 500); caps the rows of an NDJSON export"),
+    format: Literal["json", "ndjson"] = "json",
+    db: Session = Depends(get_read_db),
+):
     """
-    Trigger a full data collection from all sources.
+    List stored propositions, newest first, with keyset pagination.
     """
+    return _list_records(
+        db, "propositions", format, fields=fields, filters={"level": level, "source": source},
+        date_from=date_from, date_to=date_to, cursor=cursor, limit=limit,
+    )
+
+@app.get("/scripts", response_model=RecordPage)
+async def list_scripts(
+    proposition_id: int | None = None,
+    style: str | None = None,
+    date_from: str | None = Query(None, description="YYYY-MM-DD, on created_at"),
+    date_to: str | None = Query(None, description="YYYY-MM-DD, on created_at"),
+    fields: str | None = Query(None, description="Comma-separated columns to return"),
+    cursor: int | None = None,
+    limit: int | None = Query(None, ge=1, description="Page size (default 50, max 500); caps the rows of an NDJSON export"),
+    format: Literal["json", "ndjson"] = "json",
+    db: Session = Depends(get_read_db),
+):
+    """
+    List generated scripts, newest first, with keyset pagination.
+    """
+    return _list_records(
+        db, "scripts", format, fields=fields, filters={"proposition_id": proposition_id, "style": style},
+        date_from=date_from, date_to=date_to, cursor=cursor, limit=limit,
+    )
+
+@app.get("/videos", response_model=RecordPage)
+async def list_videos(
+    status: str | None = None,
+    script_id: int | None = None,
+    date_from: str | None = Query(None, description="YYYY-MM-DD, on created_at"),
+    date_to: str | None = Query(None, description="YYYY-MM-DD, on created_at"),
+    fields: str | None = Query(None, description="Comma-separated columns to return"),
+    cursor: int | None = None,
+    limit: int | None = Query(None, ge=1, description="Page size (default 50, max 500); caps the rows of an NDJSON export"),
+    format: Literal["json", "ndjson"] = "json",
+    db: Session = Depends(get_read_db),
+):
+    """
+    List rendered videos, newest first, with keyset pagination.
+    """
+    return _list_records(
+        db, "videos", format, fields=fields, filters={"status": status, "script_id": script_id},
+        date_from=date_from, date_to=date_to, cursor=cursor, limit=limit,
+    )
+
+@job_queue.handler("tiktok")
+async def _run_tiktok_job(ctx: JobContext):
+    request = TikTokScriptRequest(**ctx.payload)
+    db = SessionLocal()
     try:
-        summary = await collector_service.run_collection(days_back, limit, db)
-        return summary
-    except Exception as e:
-        logger.error(f"Collection failed: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+        # AsyncOpenAI: the completion no longer holds a worker thread while it waits
+        return {"script": await get_tiktok_service().agenerate_script(request.proposition, request.style, db)}
+    finally:
+        db.close()
 
-@app.post("/generate/tiktok")
+@app.post("/generate/tiktok", response_model=JobStatus, status_code=202)
 async def generate_tiktok_script(request: TikTokScriptRequest, db: Session = Depends(get_db)):
     """
-    Generate a TikTok script for a specific proposition.
+    Enqueue TikTok script generation for a specific proposition; the script is the job result.
     """
-    script = tiktok_service.generate_script(request.proposition, request.style, db)
-    return {"script": script}
+    job = job_queue.enqueue(db, "tiktok", request.model_dump(mode="json"))
+    return _job_status(job)
 
 def _split_text(text: str, parts: int = 2) -> list[str]:
     words = text.split()
@@ -92,10 +296,37 @@ def _prepare_segments(script: str, desired: int = 2) -> list[dict[str, str]]:
     return [{"audio": chunk or cleaned, "visual": ""} for chunk in audio_chunks]
 
 
-@app.post("/generate/video")
-async def generate_video(request: VideoGenerationRequest):
+@job_queue.handler("video")
+async def _run_video_job(ctx: JobContext):
+    sora_video_service = get_sora_service()
+    if sora_video_service is None:
+        raise RuntimeError("Serviço do Sora indisponível.")
+
+    base_dir = BASE_DIR / "output" / "videos" / "api"
+    base_dir.mkdir(parents=True, exist_ok=True)
+
+    await ctx.aprogress(0.0, "Renderizando segmentos")
+    # Rendering blocks for minutes (create, poll, download, ffmpeg); run it in a thread.
+    # A cancelled job is marked only after the render stops at its next progress report.
+    result_path = await ctx.run_in_thread(
+        sora_video_service.generate_video_from_script,
+        ctx.payload["segments"],
+        base_filename=ctx.payload["base_filename"],
+        output_dir=base_dir,
+        max_segments=2,
+        segment_duration=ctx.payload["segment_duration"],
+        progress_callback=ctx.progress,
+    )
+    return {"result": str(result_path)}
+
+@app.post("/generate/video", response_model=JobStatus, status_code=202)
+async def generate_video(
+    request: VideoGenerationRequest,
+    db: Session = Depends(get_db),
+    sora_video_service: SoraVideoService | None = Depends(get_sora_service),
+):
     """
-    Generate a video using the Azure OpenAI (Sora) integration.
+    Enqueue video generation with the Azure OpenAI (Sora) integration; the file path is the job result.
     """
     if sora_video_service is None:
         raise HTTPException(status_code=500, detail="Serviço do Sora indisponível.")
@@ -105,18 +336,12 @@ async def generate_video(request: VideoGenerationRequest):
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc))
 
-    base_dir = BASE_DIR / "output" / "videos" / "api"
-    base_dir.mkdir(parents=True, exist_ok=True)
-
-    result_path = sora_video_service.generate_video_from_script(
-        segments,
-        base_filename=re.sub(r"\W+", "_", request.proposition.title or "video").lower()[:50],
-        output_dir=base_dir,
-        max_segments=2,
-        segment_duration=min(request.max_duration_seconds or 12, 12),
-    )
-
-    return {"result": str(result_path)}
+    job = job_queue.enqueue(db, "video", {
+        "segments": segments,
+        "base_filename": re.sub(r"\W+", "_", request.proposition.title or "video").lower()[:50],
+        "segment_duration": min(request.max_duration_seconds or 12, 12),
+    })
+    return _job_status(job)
 
 if __name__ == "__main__":
     import uvicorn
@@ -1,10 +1,25 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy import Boolean, Column, Integer, Float, String, Text, DateTime, ForeignKey, Index, event, text
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from src.core.database import Base
+from src.utils.normalize import normalize_link, normalize_title
+
+def _link_key_default(context):
+    return normalize_link(context.get_current_parameters().get("link"))
+
+def _title_key_default(context):
+    return normalize_title(context.get_current_parameters().get("title"))
 
 class DBProposition(Base):
     __tablename__ = "propositions"
+    __table_args__ = (
+        Index("ux_propositions_link_key", "link_key", unique=True),
+        Index("ux_propositions_title_key", "title_key", unique=True),
+        # Back the filtered, id-ordered pages of GET /propositions
+        Index("ix_propositions_level_id", "level", "id"),
+        Index("ix_propositions_source_id", "source", "id"),
+        Index("ix_propositions_date", "date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, index=True)
@@ -16,11 +31,29 @@ class DBProposition(Base):
     level = Column(String)
     collection_type = Column(String)
     created_at = Column(DateTime, default=datetime.utcnow)
+    simhash = Column(Integer, nullable=True) # signed 64-bit SimHash of title + content
+    duplicate_of_id = Column(Integer, nullable=True, index=True) # canonical item of the near-duplicate cluster
+    link_key = Column(String, nullable=True, default=_link_key_default) # normalized link, unique
+    title_key = Column(String, nullable=True, default=_title_key_default) # normalized title, unique
 
     scripts = relationship("DBScript", back_populates="proposition")
+    fingerprints = relationship("DBPropositionFingerprint", back_populates="proposition")
+
+class DBPropositionFingerprint(Base):
+    """LSH band of a proposition's SimHash, used to find near-duplicate candidates."""
+    __tablename__ = "proposition_fingerprints"
+    __table_args__ = (Index("ix_proposition_fingerprints_band_value", "band", "value"),)
+
+    id = Column(Integer, primary_key=True)
+    proposition_id = Column(Integer, ForeignKey("propositions.id"), index=True)
+    band = Column(Integer)
+    value = Column(Integer)
+
+    proposition = relationship("DBProposition", back_populates="fingerprints")
 
 class DBScript(Base):
     __tablename__ = "scripts"
+    __table_args__ = (Index("ix_scripts_proposition_id_id", "proposition_id", "id"),)
 
     id = Column(Integer, primary_key=True, index=True)
     proposition_id = Column(Integer, ForeignKey("propositions.id"))
@@ -33,6 +66,10 @@ class DBScript(Base):
 
 class DBVideo(Base):
     __tablename__ = "videos"
+    __table_args__ = (
+        Index("ix_videos_status_id", "status", "id"),
+        Index("ix_videos_script_id_id", "script_id", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     script_id = Column(Integer, ForeignKey("scripts.id"))
@@ -43,3 +80,110 @@ class DBVideo(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
 
     script = relationship("DBScript", back_populates="videos")
+
+class DBCollectionState(Base):
+    __tablename__ = "collection_state"
+
+    source = Column(String, primary_key=True)
+    last_id = Column(Integer, nullable=True)
+    last_date = Column(String, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+class DBCollectionItem(Base):
+    """Item found by one collection job, paged by GET /collect/{job_id}/items (no text, see the proposition)."""
+    __tablename__ = "collection_items"
+    __table_args__ = (
+        Index("ix_collection_items_job_id_id", "job_id", "id"),
+        Index("ix_collection_items_job_id_collector_id", "job_id", "collector", "id"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    job_id = Column(Integer, ForeignKey("jobs.id"))
+    collector = Column(String) # key of sources_summary, e.g. 'federal_camara'
+    proposition_id = Column(Integer, ForeignKey("propositions.id"), nullable=True)
+    title = Column(String)
+    link = Column(String, nullable=True)
+    date = Column(String, nullable=True)
+    source = Column(String)
+    level = Column(String)
+    relevance_score = Column(Integer, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class DBScriptCache(Base):
+    """Generated script reused while the prompt, model, temperature and prompt version are unchanged."""
+    __tablename__ = "script_cache"
+    __table_args__ = (
+        Index("ux_script_cache_key", "prompt_hash", "model", "temperature", "prompt_version", unique=True),
+    )
+
+    id = Column(Integer, primary_key=True)
+    prompt_hash = Column(String) # sha256 of the chat messages sent to the model
+    model = Column(String)
+    temperature = Column(Float)
+    prompt_version = Column(Integer)
+    content = Column(Text)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class DBJob(Base):
+    """Background job (collection, script or video) run by the worker pool."""
+    __tablename__ = "jobs"
+    __table_args__ = (Index("ix_jobs_status_id", "status", "id"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String) # 'collect', 'tiktok', 'video'
+    status = Column(String, default="queued") # 'queued', 'running', 'completed', 'failed', 'cancelled'
+    payload = Column(Text) # JSON arguments
+    result = Column(Text, nullable=True) # JSON result
+    error_message = Column(Text, nullable=True)
+    progress = Column(Float, default=0.0) # 0..1
+    progress_message = Column(String, nullable=True)
+    cancel_requested = Column(Boolean, default=False)
+    attempts = Column(Integer, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True) # refreshed while running; stale means the worker died
+
+# Full-text index over propositions. FTS5 "external content" table: it stores only
+# the index and reads the text back from `propositions`; triggers keep it in sync.
+# remove_diacritics 2 makes "reducao" match "redução".
+PROPOSITIONS_FTS_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS propositions_fts USING fts5(
+        title, description, content,
+        content='propositions', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS propositions_fts_insert AFTER INSERT ON propositions BEGIN
+        INSERT INTO propositions_fts(rowid, title, description, content)
+        VALUES (new.id, new.title, new.description, new.content);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS propositions_fts_delete AFTER DELETE ON propositions BEGIN
+        INSERT INTO propositions_fts(propositions_fts, rowid, title, description, content)
+        VALUES ('delete', old.id, old.title, old.description, old.content);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS propositions_fts_update AFTER UPDATE OF title, description, content ON propositions BEGIN
+        INSERT INTO propositions_fts(propositions_fts, rowid, title, description, content)
+        VALUES ('delete', old.id, old.title, old.description, old.content);
+        INSERT INTO propositions_fts(rowid, title, description, content)
+        VALUES (new.id, new.title, new.description, new.content);
+    END
+    """,
+]
+
+def create_propositions_fts(connection, rebuild: bool = False):
+    """Create the full-text index and its triggers; `rebuild` indexes rows already stored."""
+    for statement in PROPOSITIONS_FTS_DDL:
+        connection.execute(text(statement))
+    if rebuild:
+        connection.execute(text("INSERT INTO propositions_fts(propositions_fts) VALUES ('rebuild')"))
+
+@event.listens_for(DBProposition.__table__, "after_create")
+def _create_propositions_fts(target, connection, **kw):
+    create_propositions_fts(connection)
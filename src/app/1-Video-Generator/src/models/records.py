@@ -0,0 +1,32 @@
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+from src.models.schemas import Proposition
+
+
+@dataclass(slots=True, kw_only=True)
+class PropositionRecord:
+    """
+    A collected item as it moves through the pipeline (collect, score, save).
+
+    Same fields as the `Proposition` schema, but a slotted dataclass: no
+    validation on construction and no per-instance `__dict__`, so a large
+    backfill holds a fraction of the memory. Convert with `to_schema` only
+    where an item leaves through the API.
+    """
+    title: str
+    description: Optional[str] = None
+    content: Optional[str] = None
+    link: Optional[str] = None
+    date: Optional[str] = None
+    source: str
+    level: str
+    collection_type: str
+    relevance_score: Optional[int] = None
+
+    @classmethod
+    def from_schema(cls, prop: Proposition) -> "PropositionRecord":
+        return cls(**prop.model_dump())
+
+    def to_schema(self) -> Proposition:
+        return Proposition(**asdict(self))
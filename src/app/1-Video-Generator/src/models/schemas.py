@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import Any, List, Optional
 from pydantic import BaseModel, Field
 from datetime import datetime
 
@@ -32,7 +32,45 @@ class CollectionSummary(BaseModel):
     total_items: int
     sources_summary: dict[str, int]
     timestamp: datetime = Field(default_factory=datetime.now)
-    details: dict[str, List[Proposition]]
+    details: Optional[dict[str, List[Proposition]]] = Field(
+        None,
+        description="Items per source; null in summary-only runs (page them with GET /collect/{job_id}/items)"
+    )
+    search_usage: dict[str, int] = Field(
+        default_factory=dict,
+        description="Google Custom Search accounting for the run (api_calls, cache_hits, coalesced)"
+    )
+
+class PropositionSearchHit(BaseModel):
+    """
+    A stored proposition matched by full-text search.
+    """
+    id: int
+    title: str
+    description: Optional[str] = None
+    link: Optional[str] = None
+    date: Optional[str] = None
+    source: Optional[str] = None
+    level: Optional[str] = None
+    score: float = Field(..., description="BM25 score (higher is more relevant)")
+    snippet: Optional[str] = Field(None, description="Matching excerpt with hits in [brackets]")
+
+class PropositionSearchPage(BaseModel):
+    """
+    One page of full-text search results.
+    """
+    query: str
+    total: int
+    limit: int
+    offset: int
+    items: List[PropositionSearchHit]
+
+class RecordPage(BaseModel):
+    """
+    One keyset-paginated page of stored records (only the requested fields).
+    """
+    items: List[dict]
+    next_cursor: Optional[int] = Field(None, description="Pass as `cursor` to get the next page; null on the last page")
 
 class TikTokScriptRequest(BaseModel):
     """
@@ -53,3 +91,20 @@ class VideoGenerationRequest(BaseModel):
         le=60,
         description="Duração desejada (em segundos). Padrão: 30s, respeitando o limite de ~8s por segmento do modelo."
     )
+
+class JobStatus(BaseModel):
+    """
+    State of a background job; poll GET /jobs/{id} until `status` is terminal.
+    """
+    id: int
+    kind: str
+    status: str = Field(..., description="'queued', 'running', 'completed', 'failed' or 'cancelled'")
+    progress: float = Field(0.0, description="Fraction done, 0..1")
+    progress_message: Optional[str] = None
+    result: Optional[Any] = Field(None, description="Job output once completed")
+    error_message: Optional[str] = None
+    cancel_requested: bool = False
+    attempts: int = 0
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
@@ -0,0 +1,293 @@
+import asyncio
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import exists, select
+
+from src.core.config import settings
+from src.core.database import SessionLocal
+from src.core.logging import get_logger
+from src.models.db_models import DBProposition, DBScript, DBVideo
+from src.models.schemas import Proposition
+
+logger = get_logger(__name__)
+
+# Stages an item goes through; an interrupted batch resumes each item from its last stage
+PENDING, SCRIPTED, RENDERED, COMPLETED, FAILED = "pending", "scripted", "rendered", "completed", "failed"
+
+
+class BatchInterrupted(Exception):
+    """Raised inside a render still running when its batch is interrupted."""
+
+
+class BatchManifest:
+    """
+    JSON record of a batch: one entry per proposition with its stage, script,
+    rendered file and error. Written atomically after every stage change, so
+    a batch killed at any point can be resumed from the file.
+    """
+
+    FILENAME = "manifest.json"
+
+    def __init__(self, path: Path, items: Dict[str, Dict[str, Any]], options: Dict[str, Any]):
+        self.path = Path(path)
+        self.items = items
+        self.options = options
+
+    @classmethod
+    def create(cls, run_dir: Path, propositions: List[DBProposition], options: Dict[str, Any]) -> "BatchManifest":
+        items = {
+            str(prop.id): {
+                "proposition_id": prop.id,
+                "title": prop.title,
+                "stage": PENDING,
+                "script_id": None,
+                "video_id": None,
+                "video_path": None,
+                "error": None,
+                "attempts": 0,
+            }
+            for prop in propositions
+        }
+        manifest = cls(Path(run_dir) / cls.FILENAME, items, options)
+        manifest.save()
+        return manifest
+
+    @classmethod
+    def load(cls, path: Path) -> "BatchManifest":
+        path = Path(path)
+        if path.is_dir():
+            path = path / cls.FILENAME
+        data = json.loads(path.read_text(encoding="utf-8"))
+        return cls(path, data["items"], data.get("options", {}))
+
+    @property
+    def run_dir(self) -> Path:
+        return self.path.parent
+
+    def unfinished(self) -> List[Dict[str, Any]]:
+        return [item for item in self.items.values() if item["stage"] != COMPLETED]
+
+    def update(self, proposition_id: int, **values) -> None:
+        self.items[str(proposition_id)].update(values, updated_at=datetime.utcnow().isoformat())
+        self.save()
+
+    def save(self) -> None:
+        temporary = self.path.with_name(f".{self.path.name}.tmp")
+        temporary.write_text(
+            json.dumps({"options": self.options, "items": self.items}, ensure_ascii=False, indent=2),
+            encoding="utf-8",
+        )
+        os.replace(temporary, self.path)
+
+    def summary(self) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for item in self.items.values():
+            counts[item["stage"]] = counts.get(item["stage"], 0) + 1
+        return counts
+
+
+def select_propositions(
+    db,
+    limit: int,
+    level: Optional[str] = None,
+    source: Optional[str] = None,
+    include_rendered: bool = False,
+) -> List[DBProposition]:
+    """Newest canonical propositions matching the filters, skipping those that already have a video."""
+    query = db.query(DBProposition).filter(DBProposition.duplicate_of_id.is_(None))
+    if level:
+        query = query.filter(DBProposition.level == level)
+    if source:
+        query = query.filter(DBProposition.source == source)
+    if not include_rendered:
+        rendered = exists(
+            select(DBVideo.id)
+            .join(DBScript, DBVideo.script_id == DBScript.id)
+            .where(DBScript.proposition_id == DBProposition.id, DBVideo.status == "completed")
+        )
+        query = query.filter(~rendered)
+    return query.order_by(DBProposition.id.desc()).limit(limit).all()
+
+
+class BatchVideoPipeline:
+    """
+    Renders many propositions in one process, stages overlapping across them.
+
+    Each proposition goes script → render (Sora segments, download, assembly) →
+    `DBVideo` record. Stages are bounded separately: while `render_concurrency`
+    videos render, the scripts of the next ones are already being written, so
+    the Sora slots never wait on the chat model. Blocking calls run on the
+    pipeline's own thread pool; every stage reports to the manifest.
+
+    The script generator, segment preparation and renderer are injected by the
+    caller (the CLI wires the TikTok and Sora services). The renderer gets a
+    `progress_callback`; it raises once the batch is interrupted, and the batch
+    waits for its threads to stop before returning, so no render keeps going
+    (and billing) behind an interrupted batch.
+    """
+
+    def __init__(
+        self,
+        generate_script: Callable[[Any, Proposition], Optional[str]],
+        prepare_segments: Callable[[str], List[Dict[str, str]]],
+        render: Callable[..., Path],
+        slugify: Callable[[str], str],
+        session_factory=SessionLocal,
+        script_concurrency: int = settings.BATCH_SCRIPT_CONCURRENCY,
+        render_concurrency: int = settings.BATCH_RENDER_CONCURRENCY,
+        segment_duration: int = 12,
+    ):
+        self.generate_script = generate_script
+        self.prepare_segments = prepare_segments
+        self.render = render
+        self.slugify = slugify
+        self.session_factory = session_factory
+        self.script_concurrency = max(1, script_concurrency)
+        self.render_concurrency = max(1, render_concurrency)
+        self.segment_duration = segment_duration
+
+    async def run(self, manifest: BatchManifest) -> Dict[str, int]:
+        items = manifest.unfinished()
+        logger.info(
+            f"Batch of {len(items)} video(s) in {manifest.run_dir} "
+            f"(scripts x{self.script_concurrency}, renders x{self.render_concurrency})"
+        )
+        self._script_slots = asyncio.Semaphore(self.script_concurrency)
+        self._render_slots = asyncio.Semaphore(self.render_concurrency)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.script_concurrency + self.render_concurrency + 1, thread_name_prefix="batch"
+        )
+        self._interrupted = threading.Event()
+        try:
+            await asyncio.gather(*(self._process(manifest, item) for item in items))
+        finally:
+            # Renders stop at their next progress report; wait for them even if cancelled again
+            self._interrupted.set()
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            stopped = asyncio.ensure_future(asyncio.to_thread(self._executor.shutdown))
+            while not stopped.done():
+                try:
+                    await asyncio.wait([stopped])
+                except asyncio.CancelledError:
+                    pass
+        return manifest.summary()
+
+    async def _call(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, lambda: func(*args, **kwargs))
+
+    async def _process(self, manifest: BatchManifest, item: Dict[str, Any]) -> None:
+        proposition_id = item["proposition_id"]
+        manifest.update(proposition_id, attempts=item.get("attempts", 0) + 1, error=None)
+        try:
+            script_id = item.get("script_id")
+            if not script_id:
+                async with self._script_slots:
+                    script_id = await self._call(self._script_for, proposition_id)
+                manifest.update(proposition_id, stage=SCRIPTED, script_id=script_id)
+
+            # The video row exists (and its id is in the manifest) before it can complete or
+            # fail, so a resumed or retried item updates it instead of adding another
+            video_id = item.get("video_id")
+            if not video_id:
+                video_id = await self._call(self._open_video, script_id)
+                manifest.update(proposition_id, video_id=video_id)
+
+            video_path = item.get("video_path")
+            if not (video_path and Path(video_path).exists()):
+                async with self._render_slots:
+                    video_path = str(await self._call(self._render_script, proposition_id, script_id, manifest.run_dir))
+                manifest.update(proposition_id, stage=RENDERED, video_path=video_path)
+
+            await self._call(self._record, video_id, video_path, "completed")
+            manifest.update(proposition_id, stage=COMPLETED)
+            logger.info(f"Batch: proposition {proposition_id} rendered to {video_path}")
+        except Exception as e:
+            logger.error(f"Batch: proposition {proposition_id} failed: {e}")
+            if item.get("video_id"):
+                await self._call(self._record, item["video_id"], None, "failed", str(e))
+            manifest.update(proposition_id, stage=FAILED, error=str(e))
+
+    # ------------------------------------------------------------------ Blocking stages
+    def _script_for(self, proposition_id: int) -> int:
+        """Latest script of the proposition, writing one first when it has none."""
+        with self.session_factory() as db:
+            script = self._latest_script(db, proposition_id)
+            if script is None:
+                prop = db.get(DBProposition, proposition_id)
+                if prop is None:
+                    raise ValueError(f"Proposition {proposition_id} no longer exists")
+                self.generate_script(db, Proposition(
+                    title=prop.title,
+                    description=prop.description,
+                    content=prop.content,
+                    link=prop.link,
+                    date=prop.date,
+                    source=prop.source,
+                    level=prop.level,
+                    collection_type=prop.collection_type,
+                ))
+                script = self._latest_script(db, proposition_id)
+            if script is None:
+                raise RuntimeError("Script generation did not store a script")
+            return script.id
+
+    def _render_script(self, proposition_id: int, script_id: int, run_dir: Path) -> Path:
+        with self.session_factory() as db:
+            script = db.get(DBScript, script_id)
+            prop = db.get(DBProposition, proposition_id)
+            content, title = script.content, prop.title
+        segments = self.prepare_segments(content)
+        if not any(segment["audio"] for segment in segments):
+            raise ValueError("Script has no [AUDIO] sections")
+        return self.render(
+            segments,
+            base_filename=f"{proposition_id}_{self.slugify(title)[:50]}",
+            output_dir=Path(run_dir),
+            max_segments=len(segments),
+            segment_duration=self.segment_duration,
+            progress_callback=self._check_interrupted,
+        )
+
+    def _check_interrupted(self, fraction: float, message: str) -> None:
+        if self._interrupted.is_set():
+            raise BatchInterrupted("Batch interrupted")
+
+    def _open_video(self, script_id: int) -> int:
+        """
+        Id of the script's pending video row, adding one if it has none (a row
+        whose id never reached the manifest is picked up again here).
+        """
+        with self.session_factory() as db:
+            video = (
+                db.query(DBVideo)
+                .filter(DBVideo.script_id == script_id, DBVideo.status == "pending")
+                .order_by(DBVideo.id.desc())
+                .first()
+            )
+            if video is None:
+                video = DBVideo(script_id=script_id, status="pending")
+                db.add(video)
+                db.commit()
+            return video.id
+
+    def _record(self, video_id: int, video_path: Optional[str], status: str, error: Optional[str] = None) -> None:
+        with self.session_factory() as db:
+            video = db.get(DBVideo, video_id)
+            video.local_path, video.status, video.error_message = video_path, status, error
+            db.commit()
+
+    @staticmethod
+    def _latest_script(db, proposition_id: int) -> Optional[DBScript]:
+        return (
+            db.query(DBScript)
+            .filter(DBScript.proposition_id == proposition_id)
+            .order_by(DBScript.id.desc())
+            .first()
+        )
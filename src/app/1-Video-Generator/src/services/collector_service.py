@@ -1,16 +1,25 @@
 import asyncio
-from typing import List, Dict
-from concurrent.futures import ThreadPoolExecutor
+from contextlib import aclosing
+from datetime import datetime
+from typing import List, Dict, Optional, Sequence
+from sqlalchemy import or_, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
 
 from src.core.config import settings
 from src.core.logging import get_logger
-from src.models.schemas import CollectionResult, CollectionSummary, Proposition
-from src.models.db_models import DBProposition, DBScript
+from src.core.registry import services
+from src.models.schemas import CollectionSummary
+from src.models.db_models import DBProposition, DBCollectionItem, DBCollectionState
+from src.models.records import PropositionRecord
+from src.collectors.base import IncompleteCollection, Watermark
 from src.collectors.camara import CamaraCollector
 from src.collectors.senado import SenadoCollector
 from src.collectors.alesp import AlespCollector
 from src.collectors.municipal import MunicipalCollector
+from src.services.dedup_service import near_duplicates
+from src.utils.normalize import normalize_link, normalize_title
+from src.utils.search_cache import SearchUsage, search_usage_var
 
 logger = get_logger(__name__)
 
@@ -27,76 +36,222 @@ class CollectorService:
             'municipal': MunicipalCollector()
         }
         
-    async def run_collection(self, days_back: int, limit: int, db: Session = None) -> CollectionSummary:
+    async def run_collection(
+        self,
+        days_back: int,
+        limit: int,
+        db: Session = None,
+        run_id: Optional[int] = None,
+        details: bool = True,
+    ) -> CollectionSummary:
         """
-        Run all collectors in parallel and save to DB.
+        Run all collectors concurrently on the event loop and save to DB.
+
+        With a `run_id` (the collect job), every item found is also recorded in
+        `collection_items`, where GET /collect/{job_id}/items pages through it.
+        `details=False` leaves the items out of the summary itself.
         """
         days = days_back or settings.DEFAULT_DAYS_BACK
         limit_per_source = limit or settings.DEFAULT_LIMIT_PER_SOURCE
         
         logger.info(f"Starting full collection. Days: {days}, Limit: {limit_per_source}")
         
-        loop = asyncio.get_event_loop()
-        results_dict: Dict[str, List[Proposition]] = {}
+        results_dict: Dict[str, List[PropositionRecord]] = {}
+        search_usage = SearchUsage()
+        watermarks = self._load_watermarks(db) if db else {}
         
-        def run_collector(name, collector):
+        async def run_collector(name, collector):
+            """Return the collector's items and whether its watermark may advance."""
             try:
                 if name == 'municipal' and not settings.INCLUDE_MUNICIPAL:
-                    return []
-                return collector.collect(days, limit_per_source)
+                    return [], False
+                return await collector.acollect(days, limit_per_source, watermarks.get(name)), True
+            except IncompleteCollection as e:
+                logger.warning(f"Collector {name} incomplete, keeping its watermark: {e}")
+                return e.items, False
             except Exception as e:
                 logger.error(f"Collector {name} failed: {e}")
-                return []
-
-        with ThreadPoolExecutor(max_workers=settings.MAX_WORKERS) as executor:
-            futures = []
-            for name, collector in self.collectors.items():
-                futures.append(
-                    loop.run_in_executor(executor, run_collector, name, collector)
-                )
-            
-            collected_lists = await asyncio.gather(*futures)
+                return [], False
+
+        # Collector tasks inherit this context, so every CSE call is billed to this run
+        usage_token = search_usage_var.set(search_usage)
+        try:
+            collected_lists = await asyncio.gather(*(
+                run_collector(name, collector) for name, collector in self.collectors.items()
+            ))
+        finally:
+            search_usage_var.reset(usage_token)
+        
+        for name, (items, complete) in zip(self.collectors, collected_lists):
+            filtered = self.collectors[name].filter_relevant(items)
+            results_dict[name] = filtered
             
-            for i, (name, _) in enumerate(self.collectors.items()):
-                items = collected_lists[i]
-                filtered = self.collectors[name].filter_relevant(items)
-                results_dict[name] = filtered
-                
-                # Save to DB
-                if db:
-                    self._save_to_db(db, filtered)
+            # Save to DB
+            if db:
+                self._save_to_db(db, filtered, commit=False)
+                if run_id is not None:
+                    self._record_items(db, run_id, name, filtered)
+                # Only advance on a complete, non-empty run: an empty one may just be a failed request
+                if items and complete:
+                    watermarks[name] = self.collectors[name].next_watermark(items, watermarks.get(name))
+                    self._save_watermark(db, name, watermarks[name])
+
+        # One transaction per run: items and watermarks land together or not at all
+        if db:
+            db.commit()
 
         total = sum(len(items) for items in results_dict.values())
         summary_counts = {k: len(v) for k, v in results_dict.items()}
         
         logger.info(f"Collection completed. Total items: {total}")
+        logger.info(
+            f"Custom Search usage: {search_usage.api_calls} API calls, "
+            f"{search_usage.cache_hits} cache hits, {search_usage.coalesced} coalesced"
+        )
         
         return CollectionSummary(
             total_items=total,
             sources_summary=summary_counts,
-            details=results_dict
+            # The API boundary: only here do records become validated schemas
+            details={k: [item.to_schema() for item in v] for k, v in results_dict.items()} if details else None,
+            search_usage=search_usage.as_dict()
         )
 
-    def _save_to_db(self, db: Session, items: List[Proposition]):
-        """Save collected items to the database."""
-        for item in items:
-            # Check if exists (simple check by link or title)
-            exists = db.query(DBProposition).filter(
-                (DBProposition.link == item.link) | (DBProposition.title == item.title)
-            ).first()
-            
-            if not exists:
-                db_item = DBProposition(
-                    title=item.title,
-                    description=item.description,
-                    content=item.content,
-                    link=item.link,
-                    date=item.date,
-                    source=item.source,
-                    level=item.level,
-                    collection_type=item.collection_type
-                )
-                db.add(db_item)
-        db.commit()
-
-collector_service = CollectorService()
+    async def backfill_camara(
+        self,
+        db: Session,
+        date_from: str,
+        date_to: Optional[str] = None,
+        sigla_tipos: Optional[Sequence[str]] = None,
+        batch_size: int = 500,
+    ) -> int:
+        """
+        Stream every Camara proposition presented in a date range into the DB.
+
+        Items are filtered and saved in batches as pages arrive, so a full
+        legislative year never has to be held in memory at once.
+        """
+        collector = self.collectors['federal_camara']
+        logger.info(f"Starting Camara backfill from {date_from} to {date_to or 'today'}")
+
+        saved = 0
+        batch: List[PropositionRecord] = []
+        stream = collector.astream(date_from=date_from, date_to=date_to, sigla_tipos=sigla_tipos)
+        async with aclosing(stream):
+            async for prop in stream:
+                batch.append(prop)
+                if len(batch) >= batch_size:
+                    saved += self._save_batch(db, collector, batch)
+                    batch = []
+        if batch:
+            saved += self._save_batch(db, collector, batch)
+
+        logger.info(f"Camara backfill completed. Relevant items processed: {saved}")
+        return saved
+
+    def _save_batch(self, db: Session, collector, batch: List[PropositionRecord]) -> int:
+        relevant = collector.filter_relevant(batch)
+        self._save_to_db(db, relevant)
+        return len(relevant)
+
+    def _load_watermarks(self, db: Session) -> Dict[str, Watermark]:
+        """Load the per-source watermarks stored by previous runs."""
+        return {
+            state.source: Watermark(
+                last_id=state.last_id,
+                last_date=state.last_date,
+                updated_at=state.updated_at,
+            )
+            for state in db.query(DBCollectionState).all()
+        }
+
+    def _save_watermark(self, db: Session, source: str, watermark: Watermark):
+        """Persist the watermark reached by a source in this run."""
+        state = db.get(DBCollectionState, source) or DBCollectionState(source=source)
+        state.last_id = watermark.last_id
+        state.last_date = watermark.last_date
+        state.updated_at = datetime.utcnow()
+        db.add(state)
+
+    def _save_to_db(self, db: Session, items: Sequence[PropositionRecord], commit: bool = True) -> int:
+        """
+        Save collected items to the database in one multi-row INSERT.
+
+        An item whose normalized link or title is already stored (or appears
+        earlier in the batch) is skipped by the unique indexes instead of being
+        looked up one by one. Returns how many items were inserted.
+        """
+        rows = [
+            {
+                "title": item.title,
+                "description": item.description,
+                "content": item.content,
+                "link": item.link,
+                "date": item.date,
+                "source": item.source,
+                "level": item.level,
+                "collection_type": item.collection_type,
+                "link_key": normalize_link(item.link),
+                "title_key": normalize_title(item.title),
+            }
+            for item in items
+        ]
+        inserted = []
+        if rows:
+            # Core insert on the table: the ORM would split rows by which keys are None
+            table = DBProposition.__table__
+            stmt = (
+                sqlite_insert(table)
+                .on_conflict_do_nothing()
+                .returning(table.c.id, table.c.title, table.c.content, table.c.description)
+            )
+            inserted = db.execute(stmt, rows).all()
+            near_duplicates.register_many(db, inserted)
+            logger.info(f"Saved {len(inserted)} new propositions ({len(rows) - len(inserted)} already stored)")
+
+        if commit:
+            db.commit()
+        return len(inserted)
+
+    def _record_items(self, db: Session, run_id: int, collector: str, items: Sequence[PropositionRecord]) -> None:
+        """
+        Log the items a collection job found, in relevance order, without their text.
+
+        Each row points at the stored proposition, whether this run inserted it
+        or it was already there (matched on the normalized link, then title).
+        """
+        if not items:
+            return
+        keys = [(normalize_link(item.link), normalize_title(item.title)) for item in items]
+        link_keys = {link_key for link_key, _ in keys if link_key}
+        title_keys = {title_key for _, title_key in keys if title_key}
+        by_link, by_title = {}, {}
+        table = DBProposition.__table__
+        stmt = select(table.c.id, table.c.link_key, table.c.title_key).where(
+            or_(table.c.link_key.in_(link_keys), table.c.title_key.in_(title_keys))
+        )
+        for prop_id, link_key, title_key in db.execute(stmt):
+            by_link[link_key] = prop_id
+            by_title[title_key] = prop_id
+
+        db.execute(DBCollectionItem.__table__.insert(), [
+            {
+                "job_id": run_id,
+                "collector": collector,
+                "proposition_id": by_link.get(link_key) or by_title.get(title_key),
+                "title": item.title,
+                "link": item.link,
+                "date": item.date,
+                "source": item.source,
+                "level": item.level,
+                "relevance_score": item.relevance_score,
+            }
+            for item, (link_key, title_key) in zip(items, keys)
+        ])
+
+services.register("collector", CollectorService)
+
+
+def get_collector_service() -> CollectorService:
+    """Dependency returning the shared CollectorService, built on first use."""
+    return services.get("collector")
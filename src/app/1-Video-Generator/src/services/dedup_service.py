@@ -0,0 +1,161 @@
+from collections import defaultdict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, insert, or_, tuple_, update
+from sqlalchemy.orm import Session
+
+from src.core.config import settings
+from src.core.logging import get_logger
+from src.models.db_models import DBProposition, DBPropositionFingerprint
+from src.utils.fingerprint import bands, hamming, simhash, to_signed, to_unsigned
+
+logger = get_logger(__name__)
+
+
+class NearDuplicateService:
+    """
+    Clusters near-duplicate propositions (the same story published by several
+    outlets) as they are inserted.
+
+    Each proposition gets a SimHash of its title and body, stored next to the row
+    together with its LSH bands. Candidates are looked up by band through an index,
+    so insertion cost does not grow with the size of the table.
+    """
+
+    def __init__(self, max_distance: int = settings.NEAR_DUPLICATE_MAX_DISTANCE):
+        self.max_distance = max_distance
+        # One more band than the allowed distance guarantees no candidate is missed
+        self.band_count = max_distance + 1
+
+    @staticmethod
+    def fingerprint_text(prop: DBProposition) -> str:
+        return f"{prop.title or ''} {prop.content or prop.description or ''}"
+
+    def register(self, db: Session, prop: DBProposition) -> Optional[int]:
+        """
+        Fingerprint a flushed proposition and attach it to its cluster.
+
+        Returns the id of the canonical proposition when `prop` is a near-duplicate.
+        """
+        fingerprint = simhash(self.fingerprint_text(prop))
+        if fingerprint is None:
+            return None
+
+        canonical_id = self.find_duplicate(db, fingerprint, exclude_id=prop.id)
+        prop.simhash = to_signed(fingerprint)
+        prop.duplicate_of_id = canonical_id
+        db.add_all(
+            DBPropositionFingerprint(proposition_id=prop.id, band=band, value=value)
+            for band, value in bands(fingerprint, self.band_count)
+        )
+        if canonical_id:
+            logger.info(f"'{prop.title}' is a near-duplicate of proposition {canonical_id}")
+        return canonical_id
+
+    def find_duplicate(self, db: Session, fingerprint: int, exclude_id: Optional[int] = None) -> Optional[int]:
+        """Return the canonical id of the closest indexed proposition within `max_distance` bits."""
+        band_filters = [
+            and_(DBPropositionFingerprint.band == band, DBPropositionFingerprint.value == value)
+            for band, value in bands(fingerprint, self.band_count)
+        ]
+        candidates = (
+            db.query(DBProposition.id, DBProposition.simhash, DBProposition.duplicate_of_id)
+            .join(DBPropositionFingerprint, DBPropositionFingerprint.proposition_id == DBProposition.id)
+            .filter(or_(*band_filters))
+            .distinct()
+            .all()
+        )
+
+        best = None
+        for candidate_id, candidate_hash, duplicate_of_id in candidates:
+            if candidate_id == exclude_id or candidate_hash is None:
+                continue
+            distance = hamming(fingerprint, to_unsigned(candidate_hash))
+            if distance <= self.max_distance and (best is None or distance < best[0]):
+                best = (distance, duplicate_of_id or candidate_id)
+        return best[1] if best else None
+
+    def register_many(self, db: Session, rows: Sequence) -> int:
+        """
+        Fingerprint a batch of stored propositions with a constant number of queries.
+
+        `rows` are objects with `id`, `title`, `content` and `description` (ORM
+        instances or result rows), in insertion order. Candidates already in the
+        index are fetched with one band lookup per chunk; items of the same batch
+        are matched against each other in memory. Returns how many were indexed.
+        """
+        fingerprints: List[Tuple[int, int]] = []
+        for row in rows:
+            fingerprint = simhash(self.fingerprint_text(row))
+            if fingerprint is not None:
+                fingerprints.append((row.id, fingerprint))
+        if not fingerprints:
+            return 0
+
+        # band -> value -> [(id, fingerprint, canonical id)]
+        index: Dict[int, Dict[int, List[Tuple[int, int, int]]]] = defaultdict(lambda: defaultdict(list))
+        for candidate_id, candidate_hash, duplicate_of_id in self._candidates(db, fingerprints):
+            entry = (candidate_id, to_unsigned(candidate_hash), duplicate_of_id or candidate_id)
+            for band, value in bands(entry[1], self.band_count):
+                index[band][value].append(entry)
+
+        updates, band_rows = [], []
+        for prop_id, fingerprint in fingerprints:
+            prop_bands = bands(fingerprint, self.band_count)
+            best = None
+            for band, value in prop_bands:
+                for candidate_id, candidate_hash, canonical_id in index[band][value]:
+                    distance = hamming(fingerprint, candidate_hash)
+                    if distance <= self.max_distance and (best is None or distance < best[0]):
+                        best = (distance, canonical_id)
+            canonical_id = best[1] if best else None
+
+            # Later items of the batch must see this one as a candidate
+            entry = (prop_id, fingerprint, canonical_id or prop_id)
+            for band, value in prop_bands:
+                index[band][value].append(entry)
+                band_rows.append({"proposition_id": prop_id, "band": band, "value": value})
+            updates.append({"id": prop_id, "simhash": to_signed(fingerprint), "duplicate_of_id": canonical_id})
+
+        db.execute(update(DBProposition), updates)
+        db.execute(insert(DBPropositionFingerprint), band_rows)
+        clustered = sum(1 for row in updates if row["duplicate_of_id"])
+        if clustered:
+            logger.info(f"{clustered} of {len(updates)} new propositions are near-duplicates")
+        return len(updates)
+
+    def _candidates(self, db: Session, fingerprints: List[Tuple[int, int]]):
+        keys = {key for _, fingerprint in fingerprints for key in bands(fingerprint, self.band_count)}
+        keys = list(keys)
+        seen = set()
+        # Two bound parameters per key; stay well below SQLite's variable limit
+        for start in range(0, len(keys), 450):
+            chunk = keys[start:start + 450]
+            candidates = (
+                db.query(DBProposition.id, DBProposition.simhash, DBProposition.duplicate_of_id)
+                .join(DBPropositionFingerprint, DBPropositionFingerprint.proposition_id == DBProposition.id)
+                .filter(tuple_(DBPropositionFingerprint.band, DBPropositionFingerprint.value).in_(chunk))
+                .filter(DBProposition.simhash.is_not(None))
+                .distinct()
+                .all()
+            )
+            for candidate in candidates:
+                if candidate.id not in seen:
+                    seen.add(candidate.id)
+                    yield candidate
+
+    def rebuild(self, db: Session, batch_size: int = 1000) -> int:
+        """Index propositions stored before fingerprinting existed. Returns how many were indexed."""
+        pending = (
+            db.query(DBProposition.id, DBProposition.title, DBProposition.content, DBProposition.description)
+            .filter(DBProposition.simhash.is_(None))
+            .order_by(DBProposition.id.asc())
+            .all()
+        )
+        indexed = 0
+        for start in range(0, len(pending), batch_size):
+            indexed += self.register_many(db, pending[start:start + batch_size])
+        db.commit()
+        return indexed
+
+near_duplicates = NearDuplicateService()
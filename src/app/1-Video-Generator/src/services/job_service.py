@@ -0,0 +1,330 @@
+import asyncio
+import json
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from src.core.config import settings
+from src.core.database import SessionLocal
+from src.core.logging import get_logger
+from src.models.db_models import DBJob
+
+logger = get_logger(__name__)
+
+TERMINAL_STATUSES = frozenset({"completed", "failed", "cancelled"})
+
+
+class JobCancelled(Exception):
+    """Raised inside a job that was cancelled while it was running."""
+
+
+class JobContext:
+    """
+    Handle given to a running job: its arguments plus progress reporting.
+
+    `progress` is for worker threads and `aprogress` for the event loop (it
+    writes through a thread, so the loop never waits on the database). Both
+    raise `JobCancelled` once cancellation was requested, so long jobs stop
+    at their next checkpoint.
+
+    Blocking work goes through `run_in_thread`: when the job is cancelled it
+    waits for the thread to stop at its next `progress` call before the job
+    is marked cancelled, instead of leaving it running in the background.
+    """
+
+    def __init__(self, queue: "JobQueue", job_id: int, payload: Dict[str, Any]):
+        self.queue = queue
+        self.job_id = job_id
+        self.payload = payload
+        self._stop = threading.Event()
+
+    def progress(self, fraction: float, message: Optional[str] = None) -> None:
+        if self._stop.is_set() or self.queue.report_progress(self.job_id, fraction, message):
+            raise JobCancelled(f"Job {self.job_id} was cancelled")
+
+    async def aprogress(self, fraction: float, message: Optional[str] = None) -> None:
+        if await asyncio.to_thread(self.queue.report_progress, self.job_id, fraction, message):
+            raise JobCancelled(f"Job {self.job_id} was cancelled")
+
+    async def run_in_thread(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        future = asyncio.ensure_future(asyncio.to_thread(func, *args, **kwargs))
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            # The thread cannot be interrupted: make its next checkpoint raise and wait for it
+            self._stop.set()
+            while not future.done():
+                try:
+                    await asyncio.wait([future])
+                except asyncio.CancelledError:
+                    pass
+            future.exception()
+            raise
+
+
+Handler = Callable[[JobContext], Awaitable[Any]]
+
+
+class JobQueue:
+    """
+    Persistent job queue on the `jobs` table with an in-process asyncio worker pool.
+
+    Endpoints enqueue a job and return at once; workers claim queued jobs with a
+    single atomic UPDATE, so several processes can share the same database.
+    Blocking work must be pushed to threads by the handler (`ctx.run_in_thread`)
+    to keep the event loop free.
+
+    Running jobs refresh a heartbeat. A job whose heartbeat goes stale (the
+    process died or was restarted) is queued again, up to `max_attempts`.
+    Workers start lazily on the running loop the first time a job is enqueued
+    (or when the app starts), and restart transparently on a new loop.
+    """
+
+    def __init__(
+        self,
+        session_factory=SessionLocal,
+        workers: int = settings.JOB_WORKERS,
+        poll_interval: float = settings.JOB_POLL_INTERVAL,
+        heartbeat_seconds: float = settings.JOB_HEARTBEAT_SECONDS,
+        stale_seconds: float = settings.JOB_STALE_SECONDS,
+        max_attempts: int = settings.JOB_MAX_ATTEMPTS,
+    ):
+        self.session_factory = session_factory
+        self.workers = max(1, workers)
+        self.poll_interval = poll_interval
+        self.heartbeat_seconds = heartbeat_seconds
+        self.stale_seconds = stale_seconds
+        self.max_attempts = max_attempts
+        self._handlers: Dict[str, Handler] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tasks: List[asyncio.Task] = []
+        self._running: Dict[int, asyncio.Task] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stopping = False
+
+    def handler(self, kind: str):
+        """Decorator registering the coroutine that runs jobs of `kind`."""
+        def register(func: Handler) -> Handler:
+            self._handlers[kind] = func
+            return func
+        return register
+
+    # ------------------------------------------------------------------ API side
+    def enqueue(self, db: Session, kind: str, payload: Dict[str, Any]) -> DBJob:
+        if kind not in self._handlers:
+            raise ValueError(f"No handler registered for job kind '{kind}'")
+        job = DBJob(
+            kind=kind,
+            status="queued",
+            payload=json.dumps(payload, default=str),
+            progress=0.0,
+            cancel_requested=False,
+            attempts=0,
+        )
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+        logger.info(f"Enqueued {kind} job {job.id}")
+        self.ensure_workers()
+        return job
+
+    def cancel(self, db: Session, job_id: int) -> Optional[DBJob]:
+        """Cancel a queued job at once, or ask a running one to stop."""
+        job = db.get(DBJob, job_id)
+        if job is None or job.status in TERMINAL_STATUSES:
+            return job
+
+        # Conditional update: a worker may be claiming the job right now
+        cancelled = db.execute(
+            update(DBJob)
+            .where(DBJob.id == job_id, DBJob.status == "queued")
+            .values(status="cancelled", finished_at=datetime.utcnow())
+        ).rowcount
+        if not cancelled:
+            db.execute(update(DBJob).where(DBJob.id == job_id).values(cancel_requested=True))
+        db.commit()
+        db.refresh(job)
+
+        task = self._running.get(job_id)
+        if task is not None and self._loop is not None:
+            self._loop.call_soon_threadsafe(task.cancel)
+        return job
+
+    def ensure_workers(self) -> None:
+        """Start the worker pool on the running event loop, if not already running there."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return # Enqueued from sync code: a process with a running pool will pick it up
+        if loop is self._loop and any(not task.done() for task in self._tasks):
+            self._wakeup.set()
+            return
+
+        self._loop = loop
+        self._stopping = False
+        self._running = {}
+        self._wakeup = asyncio.Event()
+        self._tasks = [loop.create_task(self._worker()) for _ in range(self.workers)]
+        self._tasks.append(loop.create_task(self._supervise()))
+        self._wakeup.set()
+        logger.info(f"Started {self.workers} job workers")
+
+    async def shutdown(self) -> None:
+        """Stop the workers; jobs interrupted here are queued again for the next start."""
+        if not self._tasks:
+            return
+        if self._loop is not asyncio.get_running_loop():
+            # Started on a loop that is gone; its jobs will be recovered as stale
+            self._tasks = []
+            return
+        self._stopping = True
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    # ------------------------------------------------------------------ Worker side
+    def report_progress(self, job_id: int, fraction: float, message: Optional[str] = None) -> bool:
+        """Store progress for a running job. Returns True when it has been cancelled."""
+        with self.session_factory() as db:
+            db.execute(
+                update(DBJob)
+                .where(DBJob.id == job_id)
+                .values(progress=min(max(fraction, 0.0), 1.0), progress_message=message, heartbeat_at=datetime.utcnow())
+            )
+            db.commit()
+            return bool(db.execute(select(DBJob.cancel_requested).where(DBJob.id == job_id)).scalar())
+
+    async def _worker(self) -> None:
+        while True:
+            claiming = asyncio.ensure_future(asyncio.to_thread(self._claim))
+            try:
+                claimed = await asyncio.shield(claiming)
+            except asyncio.CancelledError:
+                # Shutdown landed while a job was being claimed: put it back in the queue
+                await asyncio.wait([claiming])
+                if claiming.result() is not None:
+                    await asyncio.to_thread(self._requeue, claiming.result()[0])
+                raise
+            if claimed is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._run(*claimed)
+
+    async def _run(self, job_id: int, kind: str, payload: Optional[str]) -> None:
+        handler = self._handlers.get(kind)
+        if handler is None:
+            await asyncio.to_thread(self._finish, job_id, "failed", error=f"Unknown job kind '{kind}'")
+            return
+
+        logger.info(f"Running {kind} job {job_id}")
+        context = JobContext(self, job_id, json.loads(payload or "{}"))
+        task = asyncio.ensure_future(handler(context))
+        self._running[job_id] = task
+        try:
+            result = await task
+        except (asyncio.CancelledError, JobCancelled):
+            if self._stopping:
+                await asyncio.to_thread(self._requeue, job_id)
+                raise
+            logger.info(f"Job {job_id} cancelled")
+            await asyncio.to_thread(self._finish, job_id, "cancelled")
+        except Exception as e:
+            logger.error(f"Job {job_id} ({kind}) failed: {e}")
+            await asyncio.to_thread(self._finish, job_id, "failed", error=str(e))
+        else:
+            await asyncio.to_thread(self._finish, job_id, "completed", result=result)
+        finally:
+            self._running.pop(job_id, None)
+
+    async def _supervise(self) -> None:
+        """Heartbeat our running jobs, apply cancellations from other processes, recover stale jobs."""
+        while True:
+            cancelled = await asyncio.to_thread(self._heartbeat, list(self._running))
+            for job_id in cancelled:
+                task = self._running.get(job_id)
+                if task is not None:
+                    task.cancel()
+            await asyncio.to_thread(self._requeue_stale)
+            await asyncio.sleep(self.heartbeat_seconds)
+
+    def _claim(self):
+        now = datetime.utcnow()
+        next_job = (
+            select(DBJob.id)
+            .where(DBJob.status == "queued")
+            .order_by(DBJob.id)
+            .limit(1)
+            .scalar_subquery()
+        )
+        with self.session_factory() as db:
+            claimed = db.execute(
+                update(DBJob)
+                .where(DBJob.id == next_job, DBJob.status == "queued")
+                .values(status="running", attempts=DBJob.attempts + 1, started_at=now, heartbeat_at=now)
+                .returning(DBJob.id, DBJob.kind, DBJob.payload)
+            ).first()
+            db.commit()
+        return tuple(claimed) if claimed else None
+
+    def _finish(self, job_id: int, status: str, result: Any = None, error: Optional[str] = None) -> None:
+        values = {"status": status, "finished_at": datetime.utcnow(), "error_message": error}
+        if status == "completed":
+            values.update(progress=1.0, result=json.dumps(result, default=str))
+        with self.session_factory() as db:
+            db.execute(update(DBJob).where(DBJob.id == job_id).values(**values))
+            db.commit()
+
+    def _requeue(self, job_id: int) -> None:
+        with self.session_factory() as db:
+            db.execute(
+                update(DBJob)
+                .where(DBJob.id == job_id, DBJob.status == "running")
+                .values(status="queued", heartbeat_at=None)
+            )
+            db.commit()
+
+    def _heartbeat(self, job_ids: List[int]) -> List[int]:
+        if not job_ids:
+            return []
+        with self.session_factory() as db:
+            db.execute(update(DBJob).where(DBJob.id.in_(job_ids)).values(heartbeat_at=datetime.utcnow()))
+            db.commit()
+            return list(db.execute(
+                select(DBJob.id).where(DBJob.id.in_(job_ids), DBJob.cancel_requested.is_(True))
+            ).scalars())
+
+    def _requeue_stale(self) -> None:
+        stale = (DBJob.status == "running") & (
+            DBJob.heartbeat_at.is_(None)
+            | (DBJob.heartbeat_at < datetime.utcnow() - timedelta(seconds=self.stale_seconds))
+        )
+        with self.session_factory() as db:
+            requeued = db.execute(
+                update(DBJob)
+                .where(stale, DBJob.attempts < self.max_attempts, DBJob.cancel_requested.is_(False))
+                .values(status="queued")
+            ).rowcount
+            # The user asked to stop these: losing the worker completes the cancel
+            cancelled = db.execute(
+                update(DBJob)
+                .where(stale, DBJob.cancel_requested.is_(True))
+                .values(status="cancelled", finished_at=datetime.utcnow())
+            ).rowcount
+            abandoned = db.execute(
+                update(DBJob)
+                .where(stale)
+                .values(status="failed", finished_at=datetime.utcnow(), error_message="Worker lost while running the job")
+            ).rowcount
+            db.commit()
+        if requeued or cancelled or abandoned:
+            logger.warning(f"Recovered stale jobs: {requeued} requeued, {cancelled} cancelled, {abandoned} given up")
+
+job_queue = JobQueue()
@@ -0,0 +1,142 @@
+import json
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+import httpx
+
+from src.core.config import settings
+from src.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+TERMINAL_BATCH_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+
+class BatchFailed(RuntimeError):
+    """The batch ended without output (failed, expired or cancelled) or did not finish in time."""
+
+
+class OpenAIBatchTransport:
+    """
+    Minimal client for the OpenAI Batch API: upload the JSONL input, create the
+    batch, poll it and download its output.
+
+    It talks to the REST endpoints with a plain `httpx.Client`, so any
+    `httpx.BaseTransport` can be plugged in (`httpx.MockTransport` in tests, a
+    proxy or a local stub server in staging) without touching the SDK.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: str = settings.OPENAI_BATCH_BASE_URL,
+        transport: Optional[httpx.BaseTransport] = None,
+        timeout: float = 120.0,
+    ):
+        self.client = httpx.Client(
+            base_url=base_url.rstrip("/") + "/",
+            headers={"Authorization": f"Bearer {api_key or settings.OPENAI_API_KEY or ''}"},
+            transport=transport,
+            timeout=timeout,
+        )
+
+    def upload(self, content: bytes, filename: str = "batch.jsonl") -> str:
+        response = self.client.post(
+            "files",
+            data={"purpose": "batch"},
+            files={"file": (filename, content, "application/jsonl")},
+        )
+        response.raise_for_status()
+        return response.json()["id"]
+
+    def create(
+        self,
+        input_file_id: str,
+        endpoint: str = "/v1/chat/completions",
+        metadata: Optional[Dict[str, str]] = None,
+    ) -> Dict[str, Any]:
+        response = self.client.post("batches", json={
+            "input_file_id": input_file_id,
+            "endpoint": endpoint,
+            "completion_window": settings.OPENAI_BATCH_COMPLETION_WINDOW,
+            "metadata": metadata or {},
+        })
+        response.raise_for_status()
+        return response.json()
+
+    def retrieve(self, batch_id: str) -> Dict[str, Any]:
+        response = self.client.get(f"batches/{batch_id}")
+        response.raise_for_status()
+        return response.json()
+
+    def download(self, file_id: str) -> bytes:
+        response = self.client.get(f"files/{file_id}/content")
+        response.raise_for_status()
+        return response.content
+
+    def wait(
+        self,
+        batch_id: str,
+        poll_interval: float = settings.OPENAI_BATCH_POLL_INTERVAL,
+        timeout: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """Poll until the batch reaches a terminal status; return it when it completed."""
+        deadline = time.monotonic() + timeout if timeout else None
+        last_counts = None
+        while True:
+            batch = self.retrieve(batch_id)
+            counts = batch.get("request_counts")
+            if counts != last_counts:
+                logger.info(f"Batch {batch_id}: {batch.get('status')} {counts or ''}")
+                last_counts = counts
+            if batch.get("status") in TERMINAL_BATCH_STATUSES:
+                if batch["status"] != "completed":
+                    raise BatchFailed(f"Batch {batch_id} ended as {batch['status']}: {batch.get('errors')}")
+                return batch
+            if deadline and time.monotonic() >= deadline:
+                raise BatchFailed(f"Batch {batch_id} still {batch.get('status')} after {timeout:.0f}s")
+            time.sleep(poll_interval)
+
+    def close(self) -> None:
+        self.client.close()
+
+    def __enter__(self) -> "OpenAIBatchTransport":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def encode_jsonl(rows: Iterable[Dict[str, Any]]) -> bytes:
+    return "".join(json.dumps(row, ensure_ascii=False) + "\n" for row in rows).encode("utf-8")
+
+
+def decode_jsonl(content: bytes) -> Iterator[Dict[str, Any]]:
+    for line in content.decode("utf-8").splitlines():
+        if line.strip():
+            yield json.loads(line)
+
+
+def chat_request(custom_id: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    """One line of a /v1/chat/completions batch input file."""
+    return {"custom_id": custom_id, "method": "POST", "url": "/v1/chat/completions", "body": params}
+
+
+def output_content(row: Dict[str, Any]) -> Optional[str]:
+    """Message content of one batch output line, or None when that request failed."""
+    response = row.get("response") or {}
+    if row.get("error") or response.get("status_code") != 200:
+        return None
+    choices: List[Dict[str, Any]] = response.get("body", {}).get("choices") or []
+    return choices[0]["message"]["content"] if choices else None
+
+
+def output_error(row: Optional[Dict[str, Any]]) -> str:
+    """Why a request has no usable output line."""
+    if row is None:
+        return "missing from the batch output"
+    error = row.get("error")
+    if error:
+        return str(error.get("message", error)) if isinstance(error, dict) else str(error)
+    response = row.get("response") or {}
+    return f"HTTP {response.get('status_code')}: {response.get('body')}"
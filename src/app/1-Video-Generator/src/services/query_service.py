@@ -0,0 +1,189 @@
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from src.models.db_models import DBCollectionItem, DBProposition, DBScript, DBVideo
+
+
+@dataclass(frozen=True)
+class ListSpec:
+    """
+    What a read endpoint may expose for one table.
+
+    `fields` are the columns a client may select; `default_fields` are returned
+    when none are asked for (large text columns stay out of the default).
+    `date_column` backs the `date_from`/`date_to` filters. `ascending` serves
+    the rows oldest first, for tables whose insertion order is meaningful.
+    """
+    model: Any
+    fields: Sequence[str]
+    default_fields: Sequence[str]
+    filters: Sequence[str] = field(default_factory=tuple)
+    date_column: str = "created_at"
+    ascending: bool = False
+
+
+LIST_SPECS: Dict[str, ListSpec] = {
+    "propositions": ListSpec(
+        model=DBProposition,
+        fields=(
+            "id", "title", "description", "content", "link", "date", "source", "level",
+            "collection_type", "created_at", "duplicate_of_id",
+        ),
+        default_fields=("id", "title", "link", "date", "source", "level", "duplicate_of_id"),
+        filters=("level", "source"),
+        date_column="date",
+    ),
+    "scripts": ListSpec(
+        model=DBScript,
+        fields=("id", "proposition_id", "content", "style", "created_at"),
+        default_fields=("id", "proposition_id", "style", "created_at"),
+        filters=("proposition_id", "style"),
+    ),
+    "videos": ListSpec(
+        model=DBVideo,
+        fields=("id", "script_id", "url", "local_path", "status", "error_message", "created_at"),
+        default_fields=("id", "script_id", "status", "local_path", "created_at"),
+        filters=("script_id", "status"),
+    ),
+    "collection_items": ListSpec(
+        model=DBCollectionItem,
+        fields=(
+            "id", "job_id", "collector", "proposition_id", "title", "link", "date", "source", "level",
+            "relevance_score", "created_at",
+        ),
+        default_fields=("id", "collector", "proposition_id", "title", "link", "date", "relevance_score"),
+        filters=("job_id", "collector"),
+        ascending=True,
+    ),
+}
+
+
+class RecordQueryService:
+    """
+    Keyset-paginated, column-projected reads for the dashboard endpoints.
+
+    Rows are returned newest first (`id DESC`, or `id ASC` for an `ascending`
+    spec). A page ends with the id of its last row as `next_cursor`; the next
+    page asks for `id < cursor` (`id > cursor`), which the
+    primary key (or a composite `(filter, id)` index) answers without scanning
+    the rows already served, however deep the client pages.
+    """
+
+    MAX_LIMIT = 500
+    EXPORT_BATCH = 1000
+
+    def resolve_fields(self, resource: str, fields: Optional[str]) -> List[str]:
+        """Validate a comma-separated projection; `id` is always included (it is the cursor)."""
+        spec = LIST_SPECS[resource]
+        if not fields:
+            return list(spec.default_fields)
+        requested = [name.strip() for name in fields.split(",") if name.strip()]
+        unknown = [name for name in requested if name not in spec.fields]
+        if unknown:
+            raise ValueError(f"Unknown fields for {resource}: {', '.join(unknown)}")
+        return ["id"] + [name for name in dict.fromkeys(requested) if name != "id"]
+
+    def validate(
+        self,
+        resource: str,
+        fields: Optional[str] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+    ) -> None:
+        """Raise ValueError for a bad request before any row is read (streams cannot fail late)."""
+        spec = LIST_SPECS[resource]
+        self.resolve_fields(resource, fields)
+        for name, value in (filters or {}).items():
+            if value is not None and name not in spec.filters:
+                raise ValueError(f"Unknown filter for {resource}: {name}")
+        for value in (date_from, date_to):
+            if value:
+                date.fromisoformat(value[:10])
+
+    def page(
+        self,
+        db: Session,
+        resource: str,
+        fields: Optional[str] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        cursor: Optional[int] = None,
+        limit: int = 50,
+    ) -> Dict[str, Any]:
+        self.validate(resource, fields, filters, date_from, date_to)
+        limit = min(max(limit, 1), self.MAX_LIMIT)
+        columns = self.resolve_fields(resource, fields)
+        # One extra row tells whether another page exists
+        rows = self._fetch(db, resource, columns, filters, date_from, date_to, cursor, limit + 1)
+        has_more = len(rows) > limit
+        items = [self._to_dict(columns, row) for row in rows[:limit]]
+        return {"items": items, "next_cursor": items[-1]["id"] if has_more else None}
+
+    def iter_records(
+        self,
+        db: Session,
+        resource: str,
+        fields: Optional[str] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        cursor: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield every matching row (up to `limit`) in keyset batches, for streaming exports."""
+        self.validate(resource, fields, filters, date_from, date_to)
+        columns = self.resolve_fields(resource, fields)
+        remaining = limit
+        while remaining is None or remaining > 0:
+            batch = self.EXPORT_BATCH if remaining is None else min(self.EXPORT_BATCH, remaining)
+            rows = self._fetch(db, resource, columns, filters, date_from, date_to, cursor, batch)
+            for row in rows:
+                yield self._to_dict(columns, row)
+            if len(rows) < batch:
+                return
+            cursor = rows[-1][0]
+            if remaining is not None:
+                remaining -= len(rows)
+
+    def _fetch(self, db, resource, columns, filters, date_from, date_to, cursor, limit):
+        spec = LIST_SPECS[resource]
+        table = spec.model.__table__
+        stmt = select(*(table.c[name] for name in columns))
+        for name, value in (filters or {}).items():
+            if value is not None:
+                stmt = stmt.where(table.c[name] == value)
+        date_column = table.c[spec.date_column]
+        if date_from:
+            stmt = stmt.where(date_column >= self._date_bound(spec, date_from))
+        if date_to:
+            stmt = stmt.where(date_column <= self._date_bound(spec, date_to, end=True))
+        if spec.ascending:
+            if cursor is not None:
+                stmt = stmt.where(table.c.id > cursor)
+            return db.execute(stmt.order_by(table.c.id.asc()).limit(limit)).all()
+        if cursor is not None:
+            stmt = stmt.where(table.c.id < cursor)
+        return db.execute(stmt.order_by(table.c.id.desc()).limit(limit)).all()
+
+    @staticmethod
+    def _date_bound(spec: ListSpec, value: str, end: bool = False):
+        # Proposition dates are stored as YYYY-MM-DD strings; created_at is a DateTime
+        if spec.date_column == "date":
+            return value
+        day = date.fromisoformat(value[:10])
+        return datetime.combine(day, datetime.max.time() if end else datetime.min.time())
+
+    @staticmethod
+    def _to_dict(columns: List[str], row) -> Dict[str, Any]:
+        return {
+            name: value.isoformat() if isinstance(value, datetime) else value
+            for name, value in zip(columns, row)
+        }
+
+record_queries = RecordQueryService()
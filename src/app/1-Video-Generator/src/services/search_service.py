@@ -0,0 +1,112 @@
+import re
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from src.core.logging import get_logger
+from src.models.schemas import PropositionSearchHit, PropositionSearchPage
+from src.utils.relevance import DEFAULT_FIELD_WEIGHTS
+
+logger = get_logger(__name__)
+
+_TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+
+class PropositionSearchService:
+    """
+    Full-text search over stored propositions, backed by the `propositions_fts`
+    FTS5 index.
+
+    Results are ranked with BM25, weighting title, description and content like
+    the relevance scorer does, and paginated with limit/offset.
+    """
+
+    MAX_LIMIT = 100
+
+    def __init__(self, field_weights: dict = DEFAULT_FIELD_WEIGHTS):
+        self.weights = ", ".join(
+            str(float(field_weights.get(field, 1))) for field in ("title", "description", "content")
+        )
+
+    @staticmethod
+    def build_match(query: str) -> Optional[str]:
+        """
+        Turn free text into an FTS5 query: every word must match, as a prefix.
+
+        Words are quoted, so FTS5 operators and punctuation typed by the user
+        are never interpreted.
+        """
+        terms = _TERM_RE.findall(query or "")
+        if not terms:
+            return None
+        return " ".join(f'"{term}"*' for term in terms)
+
+    def search(
+        self,
+        db: Session,
+        query: str,
+        limit: int = 20,
+        offset: int = 0,
+        level: Optional[str] = None,
+        source: Optional[str] = None,
+        include_duplicates: bool = False,
+    ) -> PropositionSearchPage:
+        limit = min(max(limit, 1), self.MAX_LIMIT)
+        offset = max(offset, 0)
+        match = self.build_match(query)
+        if match is None:
+            return PropositionSearchPage(query=query, total=0, limit=limit, offset=offset, items=[])
+
+        filters = ["propositions_fts MATCH :match"]
+        params = {"match": match, "limit": limit, "offset": offset}
+        if level:
+            filters.append("p.level = :level")
+            params["level"] = level
+        if source:
+            filters.append("p.source = :source")
+            params["source"] = source
+        if not include_duplicates:
+            filters.append("p.duplicate_of_id IS NULL")
+        where = " AND ".join(filters)
+
+        rows = db.execute(text(f"""
+            SELECT p.id, p.title, p.description, p.link, p.date, p.source, p.level,
+                   bm25(propositions_fts, {self.weights}) AS rank,
+                   snippet(propositions_fts, -1, '[', ']', '…', 12) AS snippet
+            FROM propositions_fts
+            JOIN propositions AS p ON p.id = propositions_fts.rowid
+            WHERE {where}
+            ORDER BY rank
+            LIMIT :limit OFFSET :offset
+        """), params).all()
+        total = db.execute(text(f"""
+            SELECT count(*)
+            FROM propositions_fts
+            JOIN propositions AS p ON p.id = propositions_fts.rowid
+            WHERE {where}
+        """), params).scalar()
+
+        return PropositionSearchPage(
+            query=query,
+            total=total,
+            limit=limit,
+            offset=offset,
+            items=[
+                PropositionSearchHit(
+                    id=row.id,
+                    title=row.title,
+                    description=row.description,
+                    link=row.link,
+                    date=row.date,
+                    source=row.source,
+                    level=row.level,
+                    # bm25() is lower-is-better; expose a higher-is-better score
+                    score=round(-row.rank, 4),
+                    snippet=row.snippet,
+                )
+                for row in rows
+            ],
+        )
+
+proposition_search = PropositionSearchService()
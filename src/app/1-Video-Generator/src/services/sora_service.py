@@ -2,16 +2,18 @@ from __future__ import annotations
 
 import math
 import os
-import subprocess
 import textwrap
-import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from pathlib import Path
-from typing import List, Optional, Dict
-
-from openai import OpenAI
+from typing import Callable, List, Optional, Dict, Sequence
 
 from src.core.config import settings
 from src.core.logging import get_logger
+from src.core.registry import services
+from src.services.video_poller import VideoStatusPoller
+from src.services.video_assembly import AssemblyError, AssemblyStep, default_assembly_steps, video_assembler
+from src.utils.files import download_resumable
+from src.utils.segment_cache import SegmentCacheReport, build_segment_cache, segment_key
 
 logger = get_logger(__name__)
 
@@ -24,6 +26,8 @@ class SoraVideoService:
 
     ALLOWED_DURATIONS = (4, 8, 12)
     ALLOWED_SIZES = ("720x1280", "1280x720", "1024x1792", "1792x1024")
+    # Intervalo máximo entre dois relatórios de progresso (e checagens de cancelamento) durante o render
+    progress_interval = settings.SORA_POLL_MIN_INTERVAL
 
     def __init__(self) -> None:
         base_url = (
@@ -53,11 +57,17 @@ class SoraVideoService:
             or "720x1280"
         )
         self.size = self._sanitize_size(size_candidate)
+        self.max_concurrent_segments = max(1, settings.SORA_MAX_CONCURRENT_SEGMENTS)
+        from openai import OpenAI
+
         self.client = OpenAI(
             api_key=api_key,
             base_url=self.base_url,
             default_headers={"api-key": api_key},
         )
+        self.poller = VideoStatusPoller(self.client.videos.retrieve)
+        self.segment_cache = build_segment_cache()
+        self.assembler = video_assembler
 
     @staticmethod
     def _normalize_base_url(url: str) -> str:
@@ -78,9 +88,17 @@ class SoraVideoService:
         output_dir: Path,
         max_segments: int = 2,
         segment_duration: int = 12,
+        progress_callback: Optional[Callable[[float, str], None]] = None,
+        assembly_steps: Optional[Sequence[AssemblyStep]] = None,
     ) -> Path:
         """
         Recebe uma lista de segmentos contendo áudio e orientação de cenas e produz os vídeos.
+
+        `progress_callback(fração, mensagem)` recebe o andamento geral (0..1), sempre
+        nesta thread e ao menos a cada `progress_interval` segundos enquanto os
+        segmentos renderizam; se levantar uma exceção, a geração é interrompida com ela. `assembly_steps`
+        (legendas, overlay) são aplicados na montagem final; por padrão, os das
+        configurações (`ASSEMBLY_OVERLAY_IMAGE`).
         """
         output_dir.mkdir(parents=True, exist_ok=True)
         prepared_segments = self._normalize_segments(segments, max_segments)
@@ -88,136 +106,143 @@ class SoraVideoService:
             raise ValueError("Nenhum segmento válido para gerar o vídeo.")
 
         duration = self._sanitize_duration(segment_duration)
-        segment_paths: List[Path] = []
-        previous_video_id: Optional[str] = None
-
+        total = len(prepared_segments)
+        segment_paths: List[Optional[Path]] = [None] * total
+        # Render fraction of each segment; downloads and concat take the last 10%
+        fractions = [0.0] * total
+
+        def report(message: str, overall: Optional[float] = None) -> None:
+            if progress_callback is not None:
+                progress_callback(overall if overall is not None else 0.9 * sum(fractions) / total, message)
+
+        statuses: Dict[int, str] = {}
+
+        def on_progress(idx: int):
+            # Roda na thread do poller, compartilhada por todos os jobs: só registra o estado,
+            # quem reporta (e pode tocar o banco ou cancelar) é o laço abaixo
+            def callback(video_id: str, status: str, progress: Optional[int]) -> None:
+                if progress is not None:
+                    fractions[idx - 1] = max(fractions[idx - 1], min(progress, 100) / 100 * 0.9)
+                statuses[idx] = f"Segmento {idx}/{total}: {status}" + (f" ({progress}%)" if progress is not None else "")
+            return callback
+
+        prompts: Dict[int, str] = {}
+        pending = []
+        cache_report = SegmentCacheReport()
         for idx, segment in enumerate(prepared_segments, start=1):
-            logger.info(
-                "Gerando segmento %s/%s (áudio %s chars)",
-                idx,
-                len(prepared_segments),
-                len(segment["audio"]),
-            )
-            prompt = self._build_prompt(
+            prompts[idx] = self._build_prompt(
                 segment["audio"],
                 segment.get("visual", ""),
                 idx,
-                len(prepared_segments),
+                total,
                 duration,
             )
-            video = self._create_and_wait(prompt, duration, previous_video_id)
-
-            segment_path = output_dir / f"{base_filename}_s{idx:02d}.mp4"
-            self._download_video(video.id, segment_path)
-            segment_paths.append(segment_path)
-
-            previous_video_id = video.id
+            # O prompt é determinístico: o mesmo trecho já renderizado sai do cache sem chamar a API
+            cached = self.segment_cache.get(self._segment_key(prompts[idx], duration)) if self.segment_cache else None
+            if cached:
+                segment_path = output_dir / f"{base_filename}_s{idx:02d}.mp4"
+                segment_paths[idx - 1] = self.segment_cache.materialize(cached, segment_path)
+                fractions[idx - 1] = 1.0
+                cache_report.hits += 1
+                logger.info("Segmento %s/%s reaproveitado do cache (vídeo %s)", idx, total, cached.video_id)
+            else:
+                pending.append((idx, segment))
+                cache_report.misses += 1
+        logger.info("Cache de segmentos: %s", cache_report)
+        report(f"Cache de segmentos: {cache_report}")
+
+        # Os segmentos são independentes: até max_concurrent_segments renderizam ao mesmo tempo,
+        # um único poller acompanha todos e cada um é baixado assim que fica pronto
+        rendering: Dict[Future, int] = {}
+        downloads: Dict[Future, int] = {}
+        video_ids: Dict[int, str] = {}
+        cap = max(1, min(self.max_concurrent_segments, total))
+        with ThreadPoolExecutor(max_workers=cap, thread_name_prefix="sora-download") as pool:
+            try:
+                while pending or rendering:
+                    while pending and len(rendering) < cap:
+                        idx, segment = pending.pop(0)
+                        logger.info(
+                            "Gerando segmento %s/%s (áudio %s chars)",
+                            idx,
+                            total,
+                            len(segment["audio"]),
+                        )
+                        video = self._create_video(prompts[idx], duration)
+                        video_ids[idx] = video.id
+                        rendering[self.poller.submit(video.id, on_progress=on_progress(idx))] = idx
+
+                    done, _ = wait(rendering, timeout=self.progress_interval, return_when=FIRST_COMPLETED)
+                    report("; ".join(statuses[idx] for idx in sorted(statuses)) or "Renderizando segmentos")
+                    for future in done:
+                        idx = rendering.pop(future)
+                        video = future.result()
+                        segment_path = output_dir / f"{base_filename}_s{idx:02d}.mp4"
+                        key = self._segment_key(prompts[idx], duration)
+                        downloads[pool.submit(self._download_segment, video.id, segment_path, key)] = idx
+
+                for future in downloads:
+                    segment_paths[downloads[future] - 1] = future.result()
+                    fractions[downloads[future] - 1] = 1.0
+                    report(f"Segmento {downloads[future]}/{total} baixado")
+            except BaseException:
+                for idx in rendering.values():
+                    self.poller.cancel(video_ids[idx])
+                for future in downloads:
+                    future.cancel()
+                raise
 
         final_path = output_dir / f"{base_filename}_final.mp4"
-        if len(segment_paths) == 1:
-            final_path.write_bytes(segment_paths[0].read_bytes())
-            return final_path
-
-        if not self._concat_videos(segment_paths, final_path):
+        report("Montando o vídeo final", overall=0.95)
+        if not self._concat_videos(segment_paths, final_path, assembly_steps):
             raise RuntimeError("Falha ao concatenar os segmentos com ffmpeg.")
         return final_path
 
-    def _create_and_wait(
-        self,
-        prompt: str,
-        duration: int,
-        remix_video_id: Optional[str] = None,
-    ):
-        kwargs = {
-            "model": self.model,
-            "prompt": prompt,
-            "seconds": str(duration),
-            "size": self.size,
-        }
-
-        video = self.client.videos.create(**kwargs)
-        return self._poll_until_complete(video.id)
-
-    def _poll_until_complete(self, video_id: str, sleep_seconds: int = 15):
-        while True:
-            video = self.client.videos.retrieve(video_id)
-            status = getattr(video, "status", "unknown")
-            logger.info("Vídeo %s → %s", video_id, status)
-            if status in {"completed", "failed", "cancelled"}:
-                if status != "completed":
-                    raise RuntimeError(f"Geração {video_id} falhou com status '{status}'.")
-                return video
-            time.sleep(sleep_seconds)
-
-    def _download_video(self, video_id: str, out_path: Path) -> None:
-        content = self.client.videos.download_content(video_id, variant="video")
-        out_path.parent.mkdir(parents=True, exist_ok=True)
-        content.write_to_file(str(out_path))
-        logger.info("Vídeo %s salvo em %s", video_id, out_path)
-
-    def _concat_videos(self, files: List[Path], output_path: Path) -> bool:
-        if len(files) == 1:
-            output_path.write_bytes(files[0].read_bytes())
-            return True
-
-        list_file = output_path.parent / f"{output_path.stem}_list.txt"
-        with list_file.open("w", encoding="utf-8") as f:
-            for file_path in files:
-                f.write(f"file '{file_path.as_posix()}'\n")
-
-        copy_cmd = [
-            "ffmpeg",
-            "-y",
-            "-f",
-            "concat",
-            "-safe",
-            "0",
-            "-i",
-            str(list_file),
-            "-c:v",
-            "copy",
-            "-c:a",
-            "aac",
-            str(output_path),
-        ]
+    def _segment_key(self, prompt: str, duration: int) -> str:
+        return segment_key(self.model, self.size, duration, prompt)
+
+    def _download_segment(self, video_id: str, out_path: Path, key: str) -> Path:
+        self._download_video(video_id, out_path)
+        if self.segment_cache:
+            self.segment_cache.put(key, video_id, out_path)
+        return out_path
+
+    def _create_video(self, prompt: str, duration: int):
+        return self.client.videos.create(
+            model=self.model,
+            prompt=prompt,
+            seconds=str(duration),
+            size=self.size,
+        )
 
-        result = subprocess.run(copy_cmd, capture_output=True, text=True)
-        if result.returncode == 0:
-            return True
-
-        logger.warning("ffmpeg concat copy falhou, tentando re-encode. %s", result.stderr)
-
-        transcode_cmd = [
-            "ffmpeg",
-            "-y",
-            "-f",
-            "concat",
-            "-safe",
-            "0",
-            "-i",
-            str(list_file),
-            "-r",
-            "24",
-            "-pix_fmt",
-            "yuv420p",
-            "-c:v",
-            "libx264",
-            "-preset",
-            "veryfast",
-            "-crf",
-            "18",
-            "-c:a",
-            "aac",
-            "-b:a",
-            "160k",
-            "-movflags",
-            "+faststart",
-            str(output_path),
-        ]
+    def _download_video(self, video_id: str, out_path: Path) -> Path:
+        def open_stream(offset: int):
+            headers = {"Range": f"bytes={offset}-"} if offset else None
+            return self.client.videos.with_streaming_response.download_content(
+                video_id, variant="video", extra_headers=headers
+            )
 
-        result = subprocess.run(transcode_cmd, capture_output=True, text=True)
-        if result.returncode != 0:
-            logger.error("ffmpeg re-encode também falhou: %s", result.stderr)
+        # Bytes vão direto para o disco em blocos; uma queda retoma de onde parou
+        sha256 = download_resumable(
+            open_stream,
+            out_path,
+            partial=out_path.with_name(f".{out_path.name}.{video_id}.part"),
+            chunk_size=settings.SORA_DOWNLOAD_CHUNK_KB * 1024,
+            attempts=max(1, settings.SORA_DOWNLOAD_ATTEMPTS),
+        )
+        logger.info("Vídeo %s salvo em %s (sha256 %s)", video_id, out_path, sha256[:12])
+        return out_path
+
+    def _concat_videos(
+        self,
+        files: List[Path],
+        output_path: Path,
+        steps: Optional[Sequence[AssemblyStep]] = None,
+    ) -> bool:
+        try:
+            self.assembler.assemble(files, output_path, default_assembly_steps() if steps is None else steps)
+        except AssemblyError as e:
+            logger.error("Falha ao montar o vídeo final: %s", e)
             return False
         return True
 
@@ -318,12 +343,18 @@ class SoraVideoService:
         return self.ALLOWED_SIZES[0]
 
 
-def build_sora_service() -> SoraVideoService:
-    return SoraVideoService()
+def build_sora_service() -> Optional[SoraVideoService]:
+    """Constrói o serviço, ou None quando o endpoint/credenciais não estão configurados."""
+    try:
+        return SoraVideoService()
+    except Exception as exc:
+        logger.warning("SoraVideoService indisponível: %s", exc)
+        return None
+
+
+services.register("sora", build_sora_service)
 
 
-try:
-    sora_video_service = SoraVideoService()
-except Exception as exc:
-    logger.warning("SoraVideoService indisponível: %s", exc)
-    sora_video_service = None
+def get_sora_service() -> Optional[SoraVideoService]:
+    """Dependência que devolve o SoraVideoService compartilhado (None se indisponível)."""
+    return services.get("sora")
@@ -1,12 +1,53 @@
-from openai import OpenAI
+import asyncio
+import hashlib
+import json
+from contextlib import nullcontext
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
-from src.core.config import settings
+from src.core.config import BASE_DIR, settings
+from src.core.database import SessionLocal
 from src.core.logging import get_logger
+from src.core.registry import services
 from src.models.schemas import Proposition
-from src.models.db_models import DBProposition, DBScript
+from src.models.db_models import DBProposition, DBScript, DBScriptCache
+from src.services.dedup_service import near_duplicates
+from src.services.openai_batch import (
+    OpenAIBatchTransport,
+    chat_request,
+    decode_jsonl,
+    encode_jsonl,
+    output_content,
+    output_error,
+)
+from src.utils.normalize import normalize_link, normalize_title
+from src.utils.rate_limit import RateLimiter
 
 logger = get_logger(__name__)
 
+# Bump when the meaning of the prompt changes (instructions, structure, tone):
+# cached scripts written for an older version are never reused.
+PROMPT_VERSION = 1
+
+# Request maps of submitted OpenAI batches, read back when their results are ingested
+BATCH_STATE_DIR = BASE_DIR / "output" / "batches"
+
+
+@dataclass
+class ScriptResult:
+    """Outcome of one proposition in `generate_scripts_bulk`."""
+    proposition: Proposition
+    script: Optional[str] = None
+    script_id: Optional[int] = None
+    error: Optional[str] = None
+    cached: bool = False # answered from script_cache, no API call
+
+
 class TikTokService:
     """
     Service to generate TikTok scripts using OpenAI.
@@ -16,37 +57,42 @@ class TikTokService:
         self.api_key = settings.OPENAI_API_KEY
         if not self.api_key:
             self.client = None
+            self.async_client = None
         else:
+            # The SDK takes ~0.6 s to import; only pay for it when a client is built
+            from openai import AsyncOpenAI, OpenAI
+
             self.client = OpenAI(api_key=self.api_key)
+            self.async_client = AsyncOpenAI(api_key=self.api_key)
+        self.limiter = RateLimiter(settings.OPENAI_RPM_LIMIT, settings.OPENAI_TPM_LIMIT)
 
-    def generate_script(self, proposition: Proposition, style: str = "informative", db: Session = None) -> str:
+    def generate_script(
+        self,
+        proposition: Proposition,
+        style: str = "informative",
+        db: Session = None,
+        force: bool = False,
+    ) -> str:
         """
         Generate a TikTok script for a given proposition.
+
+        With a `db`, an identical earlier request (same prompt, model,
+        temperature and PROMPT_VERSION) is answered from `script_cache`
+        unless `force` is set.
         """
         if not self.client:
             return "Error: OpenAI API Key not configured."
             
-        prompt = self._create_prompt(proposition, style)
+        params = self._completion_params(self._create_prompt(proposition, style))
         
         try:
-            logger.info(f"Generating script for: {proposition.title}")
-            response = self.client.chat.completions.create(
-                model="gpt-4o",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert content creator for TikTok, specializing in Brazilian politics and legislation."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                temperature=0.8,
-                max_tokens=2000
-            )
-            
-            script_content = response.choices[0].message.content
+            script_content = None if force or not db else self._cached_script(db, params)
+            if script_content is None:
+                logger.info(f"Generating script for: {proposition.title}")
+                response = self.client.chat.completions.create(**params)
+                script_content = response.choices[0].message.content
+                if db:
+                    self._cache_script(db, params, script_content)
             
             # Save to DB
             if db:
@@ -58,6 +104,326 @@ class TikTokService:
             logger.error(f"Error generating script: {e}")
             return f"Error generating script: {str(e)}"
 
+    async def agenerate_script(
+        self,
+        proposition: Proposition,
+        style: str = "informative",
+        db: Session = None,
+        force: bool = False,
+    ) -> str:
+        """
+        Async version of `generate_script`: the completion does not block the event
+        loop and goes through the shared RPM/TPM limiter. DB work runs in a thread.
+        """
+        if not self.async_client:
+            return "Error: OpenAI API Key not configured."
+
+        params = self._completion_params(self._create_prompt(proposition, style))
+        try:
+            script_content = None if force or not db else await asyncio.to_thread(self._cached_script, db, params)
+            if script_content is None:
+                logger.info(f"Generating script for: {proposition.title}")
+                script_content = await self._acomplete(params)
+                if db:
+                    await asyncio.to_thread(self._cache_script, db, params, script_content)
+            if db:
+                await asyncio.to_thread(self._save_to_db, db, proposition, script_content, style)
+            return script_content
+        except Exception as e:
+            logger.error(f"Error generating script: {e}")
+            return f"Error generating script: {str(e)}"
+
+    async def generate_scripts_bulk(
+        self,
+        propositions: Sequence[Proposition],
+        style: str = "informative",
+        concurrency: int = settings.SCRIPT_CONCURRENCY,
+        session_factory=SessionLocal,
+        replace_existing: bool = False,
+        force: bool = False,
+        on_result: Optional[Callable[[ScriptResult], None]] = None,
+    ) -> List[ScriptResult]:
+        """
+        Generate scripts for many propositions at once.
+
+        Propositions whose prompt is unchanged are served from `script_cache`
+        (no request, no tokens) unless `force` is set. Up to `concurrency`
+        completions are in flight, paced by the rate limiter. Each script is
+        stored as soon as its completion arrives, in its own short transaction,
+        so an interrupted run keeps everything finished so far. With
+        `replace_existing`, the proposition's older scripts are removed in that
+        same transaction. Results are returned in completion order.
+        """
+        if not self.async_client:
+            raise RuntimeError("OpenAI API Key not configured.")
+
+        slots = asyncio.Semaphore(max(1, concurrency))
+        results: List[ScriptResult] = []
+
+        async def run(proposition: Proposition) -> None:
+            params = self._completion_params(self._create_prompt(proposition, style))
+            try:
+                content = None if force else await asyncio.to_thread(self._lookup_cache, session_factory, params)
+                cached = content is not None
+                if not cached:
+                    async with slots:
+                        content = await self._acomplete(params)
+                script_id = await asyncio.to_thread(
+                    self._store_script, session_factory, proposition, params, content, style, replace_existing, cached
+                )
+                result = ScriptResult(proposition, content, script_id, cached=cached)
+            except Exception as e:
+                logger.error(f"Error generating script for {proposition.title}: {e}")
+                result = ScriptResult(proposition, error=str(e))
+            results.append(result)
+            if on_result is not None:
+                on_result(result)
+
+        await asyncio.gather(*(run(proposition) for proposition in propositions))
+        return results
+
+    async def _acomplete(self, params: Dict[str, Any]) -> str:
+        # Rough prompt size (~4 chars per token) plus the completion budget
+        estimated = sum(len(message["content"]) for message in params["messages"]) // 4 + params["max_tokens"]
+        await self.limiter.acquire(estimated)
+
+        response = await self.async_client.chat.completions.create(**params)
+        usage = getattr(response, "usage", None)
+        self.limiter.settle(estimated, getattr(usage, "total_tokens", None))
+        return response.choices[0].message.content
+
+    def _completion_params(self, prompt: str) -> Dict[str, Any]:
+        return {
+            "model": "gpt-4o",
+            "messages": [
+                {
+                    "role": "system",
+                    "content": "You are an expert content creator for TikTok, specializing in Brazilian politics and legislation."
+                },
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ],
+            "temperature": 0.8,
+            "max_tokens": 2000,
+        }
+
+    # ------------------------------------------------------------------ Script cache
+    @staticmethod
+    def _cache_filter(params: Dict[str, Any]):
+        prompt_hash = hashlib.sha256(
+            json.dumps(params["messages"], ensure_ascii=False, sort_keys=True).encode("utf-8")
+        ).hexdigest()
+        return (
+            DBScriptCache.prompt_hash == prompt_hash,
+            DBScriptCache.model == params["model"],
+            DBScriptCache.temperature == params["temperature"],
+            DBScriptCache.prompt_version == PROMPT_VERSION,
+        ), prompt_hash
+
+    def _cached_script(self, db: Session, params: Dict[str, Any]) -> Optional[str]:
+        conditions, _ = self._cache_filter(params)
+        return db.execute(select(DBScriptCache.content).where(*conditions)).scalar()
+
+    def _lookup_cache(self, session_factory, params: Dict[str, Any]) -> Optional[str]:
+        with session_factory() as db:
+            return self._cached_script(db, params)
+
+    def _cache_script(self, db: Session, params: Dict[str, Any], content: str, commit: bool = True) -> None:
+        _, prompt_hash = self._cache_filter(params)
+        stmt = sqlite_insert(DBScriptCache.__table__).values(
+            prompt_hash=prompt_hash,
+            model=params["model"],
+            temperature=params["temperature"],
+            prompt_version=PROMPT_VERSION,
+            content=content,
+            created_at=datetime.utcnow(),
+        )
+        # A forced regeneration overwrites the cached answer
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=["prompt_hash", "model", "temperature", "prompt_version"],
+            set_={"content": stmt.excluded.content, "created_at": stmt.excluded.created_at},
+        ))
+        if commit:
+            db.commit()
+
+    def invalidate_cache(self, db: Session, all_versions: bool = False) -> int:
+        """Drop cached scripts of older prompt versions (or every cached script)."""
+        stmt = delete(DBScriptCache)
+        if not all_versions:
+            stmt = stmt.where(DBScriptCache.prompt_version != PROMPT_VERSION)
+        removed = db.execute(stmt).rowcount
+        db.commit()
+        return removed
+
+    def _store_script(
+        self,
+        session_factory,
+        prop: Proposition,
+        params: Dict[str, Any],
+        content: str,
+        style: str,
+        replace_existing: bool = False,
+        cached: bool = False,
+    ) -> int:
+        with session_factory() as db:
+            db_script = self._add_script(db, prop, params, content, style, replace_existing, cached)
+            db.commit()
+            return db_script.id
+
+    def _add_script(
+        self,
+        db: Session,
+        prop: Proposition,
+        params: Dict[str, Any],
+        content: str,
+        style: str,
+        replace_existing: bool = False,
+        cached: bool = False,
+    ) -> DBScript:
+        """Add a generated script (and its cache entry) to the session without committing."""
+        db_prop = self._get_or_create_proposition(db, prop)
+        if replace_existing and db_prop is not None:
+            latest = (
+                db.query(DBScript)
+                .filter(DBScript.proposition_id == db_prop.id)
+                .order_by(DBScript.id.desc())
+                .first()
+            )
+            if cached and latest is not None and latest.content == content and latest.style == style:
+                # Unchanged proposition: keep the script (and the videos that point to it)
+                return latest
+            db.query(DBScript).filter(DBScript.proposition_id == db_prop.id).delete()
+        if not cached:
+            self._cache_script(db, params, content, commit=False)
+        db_script = DBScript(proposition_id=db_prop.id if db_prop else None, content=content, style=style)
+        db.add(db_script)
+        db.flush()
+        return db_script
+
+    # ------------------------------------------------------------------ Batch API
+    def submit_script_batch(
+        self,
+        propositions: Sequence[Proposition],
+        style: str = "informative",
+        transport: Optional[OpenAIBatchTransport] = None,
+        session_factory=SessionLocal,
+        replace_existing: bool = False,
+        force: bool = False,
+        state_dir: Path = BATCH_STATE_DIR,
+    ) -> Tuple[Optional[str], List[ScriptResult]]:
+        """
+        Submit the prompts of every proposition not answered by the cache as one
+        OpenAI batch (JSONL input, 24h window, no per-request rate limits).
+
+        Cached propositions are stored right away and returned; the returned
+        batch id is None when nothing was left to send. The map from request id
+        to proposition is saved in `state_dir`, so `ingest_script_batch` can run
+        later or in another process.
+        """
+        cached_results: List[ScriptResult] = []
+        requests: Dict[str, Dict[str, Any]] = {}
+        for index, proposition in enumerate(propositions):
+            params = self._completion_params(self._create_prompt(proposition, style))
+            content = None if force else self._lookup_cache(session_factory, params)
+            if content is not None:
+                script_id = self._store_script(
+                    session_factory, proposition, params, content, style, replace_existing, cached=True
+                )
+                cached_results.append(ScriptResult(proposition, content, script_id, cached=True))
+                continue
+            _, prompt_hash = self._cache_filter(params)
+            requests[f"{index}-{prompt_hash[:16]}"] = {
+                "proposition": proposition.model_dump(mode="json"),
+                "params": params,
+            }
+
+        if not requests:
+            return None, cached_results
+
+        content = encode_jsonl(chat_request(custom_id, item["params"]) for custom_id, item in requests.items())
+        with self._batch_transport(transport) as transport:
+            file_id = transport.upload(content, filename=f"scripts-{datetime.utcnow():%Y%m%d-%H%M%S}.jsonl")
+            batch = transport.create(file_id, metadata={"job": "regenerate-scripts", "style": style})
+        logger.info(f"Submitted script batch {batch['id']} with {len(requests)} request(s), {len(cached_results)} cached")
+
+        state_dir.mkdir(parents=True, exist_ok=True)
+        (state_dir / f"{batch['id']}.json").write_text(
+            json.dumps({"style": style, "replace_existing": replace_existing, "requests": requests}, ensure_ascii=False),
+            encoding="utf-8",
+        )
+        return batch["id"], cached_results
+
+    def ingest_script_batch(
+        self,
+        batch_id: str,
+        transport: Optional[OpenAIBatchTransport] = None,
+        session_factory=SessionLocal,
+        state_dir: Path = BATCH_STATE_DIR,
+        poll_interval: float = settings.OPENAI_BATCH_POLL_INTERVAL,
+        timeout: Optional[float] = None,
+    ) -> List[ScriptResult]:
+        """
+        Wait for a submitted batch, then store every returned script in a single
+        transaction. Requests the batch could not answer come back with `error`.
+        """
+        state = json.loads((state_dir / f"{batch_id}.json").read_text(encoding="utf-8"))
+        with self._batch_transport(transport) as transport:
+            batch = transport.wait(batch_id, poll_interval=poll_interval, timeout=timeout)
+
+            outputs: Dict[str, Dict[str, Any]] = {}
+            for file_id in (batch.get("output_file_id"), batch.get("error_file_id")):
+                if file_id:
+                    for row in decode_jsonl(transport.download(file_id)):
+                        outputs[row["custom_id"]] = row
+
+        results: List[ScriptResult] = []
+        with session_factory() as db:
+            stored = []
+            for custom_id, item in state["requests"].items():
+                proposition = Proposition(**item["proposition"])
+                row = outputs.get(custom_id)
+                content = output_content(row) if row else None
+                if content is None:
+                    results.append(ScriptResult(proposition, error=output_error(row)))
+                    continue
+                db_script = self._add_script(
+                    db, proposition, item["params"], content, state["style"], state["replace_existing"]
+                )
+                stored.append((proposition, content, db_script))
+            db.commit()
+            results.extend(ScriptResult(proposition, content, db_script.id) for proposition, content, db_script in stored)
+
+        logger.info(f"Ingested batch {batch_id}: {len(stored)} script(s), {len(results) - len(stored)} failure(s)")
+        return results
+
+    def generate_scripts_batch(
+        self,
+        propositions: Sequence[Proposition],
+        style: str = "informative",
+        transport: Optional[OpenAIBatchTransport] = None,
+        session_factory=SessionLocal,
+        replace_existing: bool = False,
+        force: bool = False,
+        state_dir: Path = BATCH_STATE_DIR,
+        poll_interval: float = settings.OPENAI_BATCH_POLL_INTERVAL,
+        timeout: Optional[float] = None,
+    ) -> List[ScriptResult]:
+        """Submit a batch and ingest it when it completes (see the two steps above)."""
+        with self._batch_transport(transport) as transport:
+            batch_id, results = self.submit_script_batch(
+                propositions, style, transport, session_factory, replace_existing, force, state_dir
+            )
+            if batch_id:
+                results += self.ingest_script_batch(batch_id, transport, session_factory, state_dir, poll_interval, timeout)
+        return results
+
+    @staticmethod
+    def _batch_transport(transport: Optional[OpenAIBatchTransport]):
+        """Use the caller's transport as is, or a default one closed when the block ends."""
+        return nullcontext(transport) if transport is not None else OpenAIBatchTransport()
+
     def _save_to_db(self, db: Session, prop: Proposition, content: str, style: str):
         """Save script to DB, creating the proposition if needed."""
         db_prop = self._get_or_create_proposition(db, prop)
@@ -72,18 +438,22 @@ class TikTokService:
         return db_script
 
     def _get_or_create_proposition(self, db: Session, prop: Proposition) -> DBProposition | None:
+        """Find the stored proposition or add it to the session (flushed, the caller commits)."""
         if not db:
             return None
 
-        query = db.query(DBProposition)
-        db_prop = None
-        if prop.link:
-            db_prop = query.filter(DBProposition.link == prop.link).first()
-        if not db_prop:
-            db_prop = query.filter(DBProposition.title == prop.title).first()
+        # Same keys as the unique indexes, so a match here is what the insert would collide with
+        link_key, title_key = normalize_link(prop.link), normalize_title(prop.title)
+        db_prop = self._find_proposition(db, link_key, title_key)
+        if db_prop:
+            return db_prop
 
-        if not db_prop:
-            db_prop = DBProposition(
+        # Concurrent writers (generate_scripts_bulk) may store the same proposition between
+        # the lookup and the insert: the unique indexes skip ours and we read theirs back
+        table = DBProposition.__table__
+        stmt = (
+            sqlite_insert(table)
+            .values(
                 title=prop.title,
                 description=prop.description,
                 content=prop.content,
@@ -92,11 +462,26 @@ class TikTokService:
                 source=prop.source,
                 level=prop.level,
                 collection_type=prop.collection_type,
+                link_key=link_key,
+                title_key=title_key,
             )
-            db.add(db_prop)
-            db.commit()
-            db.refresh(db_prop)
+            .on_conflict_do_nothing()
+            .returning(table.c.id, table.c.title, table.c.content, table.c.description)
+        )
+        inserted = db.execute(stmt).all()
+        if inserted:
+            near_duplicates.register_many(db, inserted)
+            return db.get(DBProposition, inserted[0].id)
+        return self._find_proposition(db, link_key, title_key)
 
+    @staticmethod
+    def _find_proposition(db: Session, link_key: Optional[str], title_key: Optional[str]) -> DBProposition | None:
+        query = db.query(DBProposition)
+        db_prop = None
+        if link_key:
+            db_prop = query.filter(DBProposition.link_key == link_key).first()
+        if not db_prop and title_key:
+            db_prop = query.filter(DBProposition.title_key == title_key).first()
         return db_prop
 
     def _create_prompt(self, prop: Proposition, style: str) -> str:
@@ -147,4 +532,9 @@ class TikTokService:
         - Linguagem continua ultra simples (fundamental), com frases curtas.
         """
 
-tiktok_service = TikTokService()
+services.register("tiktok", TikTokService)
+
+
+def get_tiktok_service() -> TikTokService:
+    """Dependency returning the shared TikTokService, built on first use."""
+    return services.get("tiktok")
@@ -0,0 +1,462 @@
+import hashlib
+import mmap
+import re
+import shutil
+import subprocess
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+from src.core.config import settings
+from src.core.logging import get_logger
+from src.utils.files import link_or_copy
+
+logger = get_logger(__name__)
+
+CHANNEL_COUNTS = {"mono": 1, "stereo": 2}
+
+
+class AssemblyError(RuntimeError):
+    """ffmpeg could not probe or assemble the segments."""
+
+
+def resolve_ffmpeg() -> str:
+    """FFMPEG_BINARY, else ffmpeg on PATH, else the binary bundled with imageio-ffmpeg (moviepy)."""
+    if settings.FFMPEG_BINARY:
+        return settings.FFMPEG_BINARY
+    found = shutil.which("ffmpeg")
+    if found:
+        return found
+    try:
+        import imageio_ffmpeg
+        return imageio_ffmpeg.get_ffmpeg_exe()
+    except Exception:
+        return "ffmpeg"
+
+
+@dataclass(frozen=True)
+class StreamInfo:
+    """What the assembly needs to know about one segment."""
+    path: Path
+    duration: Optional[float]
+    video_codec: Optional[str]
+    width: int
+    height: int
+    fps: Optional[float]
+    pix_fmt: Optional[str]
+    audio_codec: Optional[str] = None
+    sample_rate: Optional[int] = None
+    channels: Optional[str] = None
+    codec_profile: Optional[str] = None # e.g. 'High'
+    time_base: Optional[str] = None # container timebase ('12288 tbn')
+    codec_config: Optional[str] = None # digest of the avcC/hvcC box: profile, level, SPS/PPS
+
+    @property
+    def copy_key(self) -> tuple:
+        """What a stream copy concat needs identical beyond size/fps/format."""
+        return (self.codec_profile, self.time_base, self.codec_config)
+
+
+def read_codec_config(path: Path) -> Optional[str]:
+    """
+    Digest of the mp4 decoder configuration box (avcC for H.264, hvcC for HEVC).
+
+    It carries the profile, level and SPS/PPS, none of which `ffmpeg -i` prints
+    in full; segments that differ here cannot share one stream-copied track.
+    """
+    try:
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            for tag in (b"avcC", b"hvcC"):
+                at = data.find(tag)
+                if at >= 4:
+                    size = int.from_bytes(data[at - 4:at], "big")
+                    return hashlib.sha256(data[at - 4:at - 4 + size]).hexdigest()[:16]
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+@dataclass(frozen=True)
+class AssemblyProfile:
+    """Parameters every segment must share for the concat demuxer to stream-copy them."""
+    width: int
+    height: int
+    fps: float
+    sample_rate: Optional[int] = 48000 # None: the video has no audio track
+    channels: str = "stereo"
+    pix_fmt: str = "yuv420p"
+    video_codec: str = "h264"
+    audio_codec: str = "aac"
+    copy_key: Optional[tuple] = None # shared StreamInfo.copy_key; None when the segments disagree
+
+    def video_matches(self, info: StreamInfo) -> bool:
+        return (
+            self.copy_key is not None
+            and info.copy_key == self.copy_key
+            and info.video_codec == self.video_codec
+            and info.pix_fmt == self.pix_fmt
+            and (info.width, info.height) == (self.width, self.height)
+            and info.fps is not None
+            and abs(info.fps - self.fps) < 0.01
+        )
+
+    def audio_matches(self, info: StreamInfo) -> bool:
+        if self.sample_rate is None:
+            return info.audio_codec is None
+        return (
+            info.audio_codec == self.audio_codec
+            and info.sample_rate == self.sample_rate
+            and info.channels == self.channels
+        )
+
+    def matches(self, info: StreamInfo) -> bool:
+        return self.video_matches(info) and self.audio_matches(info)
+
+
+class AssemblyStep(ABC):
+    """
+    Extra filter applied to the joined video inside the final encode.
+
+    `graph` receives the label of the current video stream, the labels of this
+    step's `inputs` (extra files passed to ffmpeg) and the label to produce.
+    """
+    inputs: Sequence[Path] = ()
+
+    @abstractmethod
+    def graph(self, source: str, extra: List[str], output: str) -> str:
+        """Filter graph fragment reading `[source]` (and `extra`) and writing `[output]`."""
+
+
+class BurnSubtitles(AssemblyStep):
+    """Burn an .srt/.ass file into the picture (libass)."""
+
+    def __init__(self, path: Path, style: Optional[str] = None):
+        self.path = Path(path)
+        self.style = style
+
+    def graph(self, source: str, extra: List[str], output: str) -> str:
+        options = f"filename={_filter_value(self.path.as_posix())}"
+        if self.style:
+            options += f":force_style={_filter_value(self.style)}"
+        return f"[{source}]subtitles={options}[{output}]"
+
+
+class Overlay(AssemblyStep):
+    """Place an image (logo, watermark) over the whole video."""
+
+    def __init__(self, image: Path, x: str = "W-w-24", y: str = "24"):
+        self.inputs = (Path(image),)
+        self.x = x
+        self.y = y
+
+    def graph(self, source: str, extra: List[str], output: str) -> str:
+        return f"[{source}][{extra[0]}]overlay={self.x}:{self.y}[{output}]"
+
+
+def default_assembly_steps() -> List[AssemblyStep]:
+    """Steps applied to every final video according to the settings (branding overlay)."""
+    steps: List[AssemblyStep] = []
+    if settings.ASSEMBLY_OVERLAY_IMAGE:
+        steps.append(Overlay(Path(settings.ASSEMBLY_OVERLAY_IMAGE)))
+    return steps
+
+
+def _filter_value(value: str) -> str:
+    escaped = value.replace("\\", "\\\\").replace("'", "\\'").replace(":", "\\:")
+    return f"'{escaped}'"
+
+
+def _split_top_level(text: str) -> List[str]:
+    """Split ffmpeg's stream description on commas that are not inside parentheses."""
+    parts, depth, current = [], 0, ""
+    for char in text:
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        if char == "," and depth == 0:
+            parts.append(current.strip())
+            current = ""
+        else:
+            current += char
+    parts.append(current.strip())
+    return parts
+
+
+class VideoAssembler:
+    """
+    Joins Sora segments into the final video with as little encoding as possible.
+
+    Every segment is probed first, so the assembler picks its path up front
+    instead of trying a stream copy and failing:
+
+    - all segments already share codec, size, frame rate and audio layout: a
+      single concat with stream copy (no encode at all);
+    - some differ only in audio: those get their audio re-encoded (video
+      copied), then the copy concat runs;
+    - any picture differs (size, fps, or codec profile/level/SPS): every
+      segment is re-encoded with the same encoder settings, in parallel
+      (`workers` ffmpeg processes), so the copy concat joins identical streams;
+    - `steps` (subtitles, overlay) are given: decode, normalize, join and
+      filter everything in one filter graph and encode once.
+    """
+
+    def __init__(
+        self,
+        binary: Optional[str] = None,
+        workers: int = settings.ASSEMBLY_WORKERS,
+        fps: float = settings.ASSEMBLY_FPS,
+        crf: int = settings.ASSEMBLY_CRF,
+        preset: str = settings.ASSEMBLY_PRESET,
+    ):
+        self._binary = binary
+        self.workers = max(1, workers)
+        self.fps = fps
+        self.crf = crf
+        self.preset = preset
+
+    @property
+    def binary(self) -> str:
+        if self._binary is None:
+            self._binary = resolve_ffmpeg()
+        return self._binary
+
+    # ------------------------------------------------------------------ Probing
+    def probe(self, path: Path) -> StreamInfo:
+        """Read codec parameters from `ffmpeg -i` (works without ffprobe) and the mp4 config box."""
+        path = Path(path)
+        result = subprocess.run(
+            [self.binary, "-hide_banner", "-i", str(path)], capture_output=True, text=True
+        )
+        info = self.parse_probe(path, result.stderr)
+        return replace(info, codec_config=read_codec_config(path))
+
+    @staticmethod
+    def parse_probe(path: Path, output: str) -> StreamInfo:
+        video = re.search(r"Stream #\d+:\d+.*?: Video: (.+)", output)
+        if not video:
+            raise AssemblyError(f"No video stream in {path}: {output.strip()[-300:]}")
+        parts = _split_top_level(video.group(1))
+        size = next((m for m in (re.search(r"\b(\d{2,5})x(\d{2,5})\b", p) for p in parts) if m), None)
+        if not size:
+            raise AssemblyError(f"Could not read the frame size of {path}")
+        fps = re.search(r"([\d.]+) fps", video.group(1))
+        codec_profile = re.match(r"\S+ \(([^)]+)\)", parts[0])
+        time_base = re.search(r"(\d+(?:\.\d+)?k?) tbn", video.group(1))
+        duration = re.search(r"Duration: (\d+):(\d+):([\d.]+)", output)
+
+        audio_codec = sample_rate = channels = None
+        audio = re.search(r"Stream #\d+:\d+.*?: Audio: (.+)", output)
+        if audio:
+            audio_parts = _split_top_level(audio.group(1))
+            audio_codec = audio_parts[0].split()[0]
+            rate = re.search(r"(\d+) Hz", audio.group(1))
+            sample_rate = int(rate.group(1)) if rate else None
+            channels = audio_parts[2].split()[0] if len(audio_parts) > 2 else None
+
+        return StreamInfo(
+            path=path,
+            duration=(
+                int(duration.group(1)) * 3600 + int(duration.group(2)) * 60 + float(duration.group(3))
+                if duration else None
+            ),
+            video_codec=parts[0].split()[0],
+            width=int(size.group(1)),
+            height=int(size.group(2)),
+            fps=float(fps.group(1)) if fps else None,
+            pix_fmt=parts[1].split("(")[0].strip() if len(parts) > 1 else None,
+            audio_codec=audio_codec,
+            sample_rate=sample_rate,
+            channels=channels,
+            codec_profile=codec_profile.group(1) if codec_profile else None,
+            time_base=time_base.group(1) if time_base else None,
+        )
+
+    def profile_for(self, infos: Sequence[StreamInfo]) -> AssemblyProfile:
+        """Common target: the first segment's size, and shared fps/audio rate when all agree."""
+        first = infos[0]
+        frame_rates = {info.fps for info in infos}
+        fps = first.fps if len(frame_rates) == 1 and first.fps else self.fps
+        copy_keys = {info.copy_key for info in infos}
+        copy_key = first.copy_key if len(copy_keys) == 1 else None
+        with_audio = [info for info in infos if info.audio_codec]
+        if not with_audio:
+            return AssemblyProfile(
+                width=first.width, height=first.height, fps=fps, sample_rate=None, copy_key=copy_key
+            )
+        rates = {info.sample_rate for info in with_audio}
+        layouts = {info.channels for info in with_audio}
+        return AssemblyProfile(
+            width=first.width,
+            height=first.height,
+            fps=fps,
+            sample_rate=rates.pop() if len(rates) == 1 and None not in rates else 48000,
+            channels=layouts.pop() if len(layouts) == 1 and layouts <= set(CHANNEL_COUNTS) else "stereo",
+            copy_key=copy_key,
+        )
+
+    # ------------------------------------------------------------------ Assembly
+    def assemble(self, segments: Sequence[Path], output: Path, steps: Sequence[AssemblyStep] = ()) -> Path:
+        segments = [Path(segment) for segment in segments]
+        output = Path(output)
+        if not segments:
+            raise AssemblyError("No segments to assemble")
+        output.parent.mkdir(parents=True, exist_ok=True)
+        if len(segments) == 1 and not steps:
+            return link_or_copy(segments[0], output)
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            infos = list(pool.map(self.probe, segments))
+        profile = self.profile_for(infos)
+
+        if steps:
+            logger.info(f"Assembling {len(segments)} segments with {len(steps)} filter step(s) in one pass")
+            self._run(self._single_pass_command(infos, profile, output, steps))
+            return output
+
+        mismatched = [info for info in infos if not profile.matches(info)]
+        if not mismatched:
+            logger.info(f"Segments share {profile.width}x{profile.height}@{profile.fps:g}: stream copy concat")
+            self._concat_copy(segments, output)
+            return output
+
+        # Re-encoded and original H.264 streams differ in SPS/PPS even at the same size and
+        # fps, so once one picture is re-encoded every segment goes through the same encoder
+        reencode_video = any(not profile.video_matches(info) for info in infos)
+        if reencode_video:
+            mismatched = list(infos)
+            logger.info(f"Re-encoding all {len(infos)} segments before the stream copy concat")
+        else:
+            logger.info(f"Re-encoding the audio of {len(mismatched)}/{len(infos)} segments before the concat")
+        workdir = output.parent / f".{output.stem}_parts"
+        workdir.mkdir(exist_ok=True)
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                normalized = dict(zip(
+                    (info.path for info in mismatched),
+                    pool.map(
+                        lambda item: self._normalize(
+                            item[1], profile, workdir / f"{item[0]:02d}.mp4", reencode_video
+                        ),
+                        enumerate(mismatched),
+                    ),
+                ))
+            self._concat_copy([normalized.get(segment, segment) for segment in segments], output)
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+        return output
+
+    def _normalize(
+        self, info: StreamInfo, profile: AssemblyProfile, target: Path, reencode_video: bool = True
+    ) -> Path:
+        cmd = [self.binary, "-hide_banner", "-y", "-i", str(info.path)]
+        needs_silence = profile.sample_rate is not None and info.audio_codec is None
+        if needs_silence:
+            cmd += ["-f", "lavfi", "-i", self._silence(profile)]
+        cmd += ["-map", "0:v:0"]
+        if profile.sample_rate is not None:
+            cmd += ["-map", "1:a:0" if needs_silence else "0:a:0"]
+
+        # Only when no segment's picture is re-encoded may this one keep its video stream
+        if not reencode_video:
+            cmd += ["-c:v", "copy"]
+        else:
+            cmd += ["-vf", self._video_chain(profile)] + self._video_codec_args()
+        if profile.sample_rate is not None:
+            cmd += self._audio_codec_args(profile)
+        if needs_silence:
+            cmd += ["-shortest"]
+        cmd += ["-movflags", "+faststart", str(target)]
+        self._run(cmd)
+        return target
+
+    def _concat_copy(self, segments: Sequence[Path], output: Path) -> None:
+        list_file = output.parent / f"{output.stem}_list.txt"
+        with list_file.open("w", encoding="utf-8") as f:
+            for segment in segments:
+                escaped = Path(segment).resolve().as_posix().replace("'", "'\\''")
+                f.write(f"file '{escaped}'\n")
+        try:
+            self._run([
+                self.binary, "-hide_banner", "-y", "-f", "concat", "-safe", "0", "-i", str(list_file),
+                "-c", "copy", "-movflags", "+faststart", str(output),
+            ])
+        finally:
+            list_file.unlink(missing_ok=True)
+
+    def _single_pass_command(
+        self,
+        infos: Sequence[StreamInfo],
+        profile: AssemblyProfile,
+        output: Path,
+        steps: Sequence[AssemblyStep],
+    ) -> List[str]:
+        cmd = [self.binary, "-hide_banner", "-y"]
+        for info in infos:
+            cmd += ["-i", str(info.path)]
+        next_input = len(infos)
+        graph, joined = [], ""
+        for k, info in enumerate(infos):
+            graph.append(f"[{k}:v]{self._video_chain(profile)}[v{k}]")
+            joined += f"[v{k}]"
+            if profile.sample_rate is None:
+                continue
+            if info.audio_codec:
+                audio_label = f"{k}:a"
+            else:
+                cmd += ["-f", "lavfi", "-t", f"{info.duration or 0:.3f}", "-i", self._silence(profile)]
+                audio_label = f"{next_input}:a"
+                next_input += 1
+            graph.append(
+                f"[{audio_label}]aformat=sample_rates={profile.sample_rate}:channel_layouts={profile.channels}[a{k}]"
+            )
+            joined += f"[a{k}]"
+        has_audio = int(profile.sample_rate is not None)
+        graph.append(f"{joined}concat=n={len(infos)}:v=1:a={has_audio}[joined]" + ("[audio]" if has_audio else ""))
+
+        label = "joined"
+        for j, step in enumerate(steps):
+            extra = []
+            for path in step.inputs:
+                cmd += ["-i", str(path)]
+                extra.append(f"{next_input}:v")
+                next_input += 1
+            graph.append(step.graph(label, extra, f"step{j}"))
+            label = f"step{j}"
+
+        cmd += ["-filter_complex", ";".join(graph), "-map", f"[{label}]"]
+        if has_audio:
+            cmd += ["-map", "[audio]"] + self._audio_codec_args(profile)
+        return cmd + self._video_codec_args() + ["-movflags", "+faststart", str(output)]
+
+    @staticmethod
+    def _video_chain(profile: AssemblyProfile) -> str:
+        w, h = profile.width, profile.height
+        return (
+            f"scale={w}:{h}:force_original_aspect_ratio=decrease,pad={w}:{h}:(ow-iw)/2:(oh-ih)/2,"
+            f"setsar=1,fps={profile.fps:g},format={profile.pix_fmt}"
+        )
+
+    def _video_codec_args(self) -> List[str]:
+        return ["-c:v", "libx264", "-preset", self.preset, "-crf", str(self.crf)]
+
+    @staticmethod
+    def _audio_codec_args(profile: AssemblyProfile) -> List[str]:
+        return [
+            "-c:a", "aac", "-b:a", "160k",
+            "-ar", str(profile.sample_rate), "-ac", str(CHANNEL_COUNTS.get(profile.channels, 2)),
+        ]
+
+    @staticmethod
+    def _silence(profile: AssemblyProfile) -> str:
+        return f"anullsrc=r={profile.sample_rate}:cl={profile.channels}"
+
+    @staticmethod
+    def _run(cmd: List[str]) -> None:
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise AssemblyError(f"ffmpeg failed ({result.returncode}): {result.stderr.strip()[-500:]}")
+
+video_assembler = VideoAssembler()
@@ -0,0 +1,233 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional
+
+from src.core.config import settings
+from src.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# (video_id, status, progress 0-100 or None)
+ProgressCallback = Callable[[str, str, Optional[int]], None]
+
+FAILED_STATUSES = {"failed", "cancelled"}
+
+
+@dataclass
+class _TrackedVideo:
+    video_id: str
+    future: Future
+    on_progress: Optional[ProgressCallback]
+    deadline: float
+    interval: float
+    next_check: float
+    started: float
+    status: Optional[str] = None
+    progress: Optional[int] = None
+    errors: int = 0
+    samples: list = field(default_factory=list) # (monotonic time, progress) to estimate the rate
+
+
+class VideoStatusPoller:
+    """
+    Acompanha todas as renderizações em andamento em um único loop assíncrono.
+
+    Roda em uma thread própria com seu event loop. Quem submete um vídeo recebe
+    um `concurrent.futures.Future` (ou aguarda `wait` em código assíncrono), em
+    vez de manter uma thread dormindo por renderização.
+
+    A cada rodada, os status de todos os vídeos vencidos são consultados juntos
+    (em paralelo). O intervalo de cada vídeo começa curto e cresce até
+    `max_interval`; quando a API informa `progress`, a próxima consulta é
+    agendada para perto do término estimado, o que reduz a latência depois que o
+    vídeo fica pronto. Cada vídeo tem um prazo global (`deadline`).
+    """
+
+    def __init__(
+        self,
+        retrieve: Callable[[str], Any],
+        min_interval: float = settings.SORA_POLL_MIN_INTERVAL,
+        max_interval: float = settings.SORA_POLL_MAX_INTERVAL,
+        backoff: float = settings.SORA_POLL_BACKOFF,
+        deadline: float = settings.SORA_POLL_DEADLINE,
+        max_batch: int = 16,
+    ):
+        self._retrieve = retrieve
+        self.min_interval = min_interval
+        self.max_interval = max(max_interval, min_interval)
+        self.backoff = max(backoff, 1.0)
+        self.deadline = deadline
+        self.max_batch = max(1, max_batch)
+        self._tracked: Dict[str, _TrackedVideo] = {}
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    # ------------------------------------------------------------------ API
+    def submit(
+        self,
+        video_id: str,
+        on_progress: Optional[ProgressCallback] = None,
+        deadline: Optional[float] = None,
+    ) -> Future:
+        """
+        Começa a acompanhar `video_id`. O future resolve com o vídeo concluído, ou
+        falha com RuntimeError (status failed/cancelled) ou TimeoutError (prazo).
+
+        `on_progress` roda na thread do poller e deve ser rápido; se levantar
+        uma exceção, o acompanhamento para e o future falha com ela.
+        """
+        future: Future = Future()
+        now = time.monotonic()
+        tracked = _TrackedVideo(
+            video_id=video_id,
+            future=future,
+            on_progress=on_progress,
+            deadline=now + (deadline or self.deadline),
+            interval=self.min_interval,
+            next_check=now + self.min_interval,
+            started=now,
+        )
+        loop = self._ensure_started()
+        loop.call_soon_threadsafe(self._track, tracked)
+        return future
+
+    async def wait(self, video_id: str, on_progress: Optional[ProgressCallback] = None, deadline: Optional[float] = None):
+        return await asyncio.wrap_future(self.submit(video_id, on_progress, deadline))
+
+    def cancel(self, video_id: str) -> None:
+        """Para de acompanhar `video_id` (o job no servidor não é cancelado)."""
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._untrack, video_id)
+
+    @property
+    def outstanding(self) -> int:
+        return len(self._tracked)
+
+    # ------------------------------------------------------------------ Poller loop
+    def _ensure_started(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                loop = asyncio.new_event_loop()
+                ready = threading.Event()
+
+                def run():
+                    asyncio.set_event_loop(loop)
+                    self._wakeup = asyncio.Event()
+                    loop.create_task(self._run())
+                    loop.call_soon(ready.set)
+                    loop.run_forever()
+
+                self._loop = loop
+                self._thread = threading.Thread(target=run, name="sora-poller", daemon=True)
+                self._thread.start()
+                ready.wait()
+            return self._loop
+
+    def _track(self, tracked: _TrackedVideo) -> None:
+        if tracked.future.cancelled():
+            return
+        self._tracked[tracked.video_id] = tracked
+        self._wakeup.set()
+
+    def _untrack(self, video_id: str) -> None:
+        tracked = self._tracked.pop(video_id, None)
+        if tracked is not None and not tracked.future.done():
+            tracked.future.cancel()
+
+    async def _run(self) -> None:
+        while True:
+            if not self._tracked:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            now = time.monotonic()
+            due = sorted(
+                (t for t in self._tracked.values() if t.next_check <= now),
+                key=lambda t: t.next_check,
+            )[: self.max_batch]
+            if not due:
+                next_check = min(t.next_check for t in self._tracked.values())
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), max(next_check - now, 0.0))
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            # One round for every due video; the SDK client is blocking, so each call gets a thread
+            results = await asyncio.gather(
+                *(asyncio.to_thread(self._retrieve, t.video_id) for t in due),
+                return_exceptions=True,
+            )
+            now = time.monotonic()
+            for tracked, result in zip(due, results):
+                if self._tracked.get(tracked.video_id) is tracked:
+                    self._apply(tracked, result, now)
+
+    def _apply(self, tracked: _TrackedVideo, video: Any, now: float) -> None:
+        if isinstance(video, BaseException):
+            tracked.errors += 1
+            logger.warning("Falha ao consultar vídeo %s (%s): %s", tracked.video_id, tracked.errors, video)
+            return self._reschedule(tracked, now)
+
+        tracked.errors = 0
+        status = getattr(video, "status", "unknown")
+        progress = getattr(video, "progress", None)
+        if status != tracked.status or progress != tracked.progress:
+            logger.info("Vídeo %s → %s%s", tracked.video_id, status, f" ({progress}%)" if progress is not None else "")
+            tracked.status, tracked.progress = status, progress
+            if progress is not None:
+                tracked.samples.append((now, progress))
+            if tracked.on_progress is not None:
+                try:
+                    tracked.on_progress(tracked.video_id, status, progress)
+                except BaseException as exc:
+                    return self._resolve(tracked, error=exc)
+
+        if status == "completed":
+            return self._resolve(tracked, video=video)
+        if status in FAILED_STATUSES:
+            return self._resolve(tracked, error=RuntimeError(f"Geração {tracked.video_id} falhou com status '{status}'."))
+        self._reschedule(tracked, now)
+
+    def _reschedule(self, tracked: _TrackedVideo, now: float) -> None:
+        if now >= tracked.deadline:
+            elapsed = int(now - tracked.started)
+            return self._resolve(tracked, error=TimeoutError(
+                f"Geração {tracked.video_id} não terminou em {elapsed}s (último status '{tracked.status}')."
+            ))
+
+        delay = tracked.interval
+        tracked.interval = min(tracked.interval * self.backoff, self.max_interval)
+        eta = self._estimate_remaining(tracked)
+        if eta is not None:
+            # Check again near the estimated finish instead of a full backoff step late
+            delay = min(max(eta, self.min_interval), self.max_interval)
+        tracked.next_check = min(now + delay, tracked.deadline)
+
+    @staticmethod
+    def _estimate_remaining(tracked: _TrackedVideo) -> Optional[float]:
+        if len(tracked.samples) < 2:
+            return None
+        (t0, p0), (t1, p1) = tracked.samples[0], tracked.samples[-1]
+        if p1 <= p0 or t1 <= t0:
+            return None
+        rate = (p1 - p0) / (t1 - t0)
+        return (100 - p1) / rate
+
+    def _resolve(self, tracked: _TrackedVideo, video: Any = None, error: Optional[BaseException] = None) -> None:
+        self._tracked.pop(tracked.video_id, None)
+        if tracked.future.done():
+            return
+        if error is not None:
+            tracked.future.set_exception(error)
+        else:
+            tracked.future.set_result(video)
@@ -0,0 +1,143 @@
+import base64
+import hashlib
+import os
+import shutil
+import sys
+import time
+from pathlib import Path
+from typing import Callable, ContextManager, Optional
+
+from src.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# ioctl number of FICLONE (copy-on-write clone) on Linux: btrfs, xfs, ...
+_FICLONE = 0x40049409
+
+
+class DownloadError(Exception):
+    """A download ended with a size or checksum that does not match what the server announced."""
+
+
+def _reflink(source: Path, destination: Path) -> None:
+    if not sys.platform.startswith("linux"):
+        raise OSError("reflink not supported on this platform")
+    import fcntl
+
+    with open(source, "rb") as src, open(destination, "wb") as dst:
+        try:
+            fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+        except OSError:
+            dst.close()
+            destination.unlink(missing_ok=True)
+            raise
+
+
+def link_or_copy(source: Path, destination: Path) -> Path:
+    """
+    Make `destination` have the contents of `source` without reading it into memory.
+
+    Tries a hardlink, then a copy-on-write clone (reflink) and falls back to a
+    streamed copy. `destination` is replaced atomically if it exists.
+    """
+    source, destination = Path(source), Path(destination)
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    temporary = destination.with_name(f".{destination.name}.tmp")
+    if temporary.exists():
+        temporary.unlink()
+    try:
+        os.link(source, temporary)
+    except OSError:
+        try:
+            _reflink(source, temporary)
+        except OSError:
+            shutil.copyfile(source, temporary)
+    os.replace(temporary, destination)
+    return destination
+
+
+def file_sha256(path: Path, chunk_size: int = 1024 * 1024) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def download_resumable(
+    open_stream: Callable[[int], ContextManager],
+    destination: Path,
+    partial: Optional[Path] = None,
+    chunk_size: int = 1024 * 1024,
+    attempts: int = 3,
+    retry_delay: float = 1.0,
+) -> str:
+    """
+    Stream a download to `destination` in chunks, resuming after failures.
+
+    `open_stream(offset)` opens the response starting at byte `offset` (an HTTP
+    Range request); it must yield an object with `status_code`, `headers` and
+    `iter_bytes(chunk_size)`. Bytes go to `partial` (kept between attempts and
+    between runs) and are renamed into place only once the size, and the
+    `Content-MD5` when the server sends one, match. Returns the sha256 of the file.
+    """
+    destination = Path(destination)
+    partial = Path(partial) if partial else destination.with_name(f".{destination.name}.part")
+    destination.parent.mkdir(parents=True, exist_ok=True)
+
+    last_error: Optional[BaseException] = None
+    for attempt in range(1, attempts + 1):
+        offset = partial.stat().st_size if partial.exists() else 0
+        try:
+            with open_stream(offset) as response:
+                if offset and response.status_code != 206:
+                    # Server ignored the Range header: start over
+                    offset = 0
+                expected_size = _expected_size(response.headers, offset)
+                expected_md5 = response.headers.get("content-md5") if offset == 0 else None
+
+                sha256, md5 = hashlib.sha256(), hashlib.md5()
+                if offset:
+                    # Seed the digests with the bytes kept from the previous attempt
+                    with open(partial, "rb") as f:
+                        for chunk in iter(lambda: f.read(chunk_size), b""):
+                            sha256.update(chunk)
+                            md5.update(chunk)
+                with open(partial, "ab" if offset else "wb") as f:
+                    for chunk in response.iter_bytes(chunk_size):
+                        f.write(chunk)
+                        sha256.update(chunk)
+                        md5.update(chunk)
+
+            size = partial.stat().st_size
+            if expected_size is not None and size != expected_size:
+                if size > expected_size:
+                    partial.unlink(missing_ok=True)
+                raise DownloadError(f"Expected {expected_size} bytes, got {size}")
+            if expected_md5 and base64.b64encode(md5.digest()).decode() != expected_md5:
+                partial.unlink(missing_ok=True)
+                raise DownloadError("Content-MD5 mismatch")
+            os.replace(partial, destination)
+            return sha256.hexdigest()
+        except Exception as e:
+            last_error = e
+            if getattr(e, "status_code", None) == 416:
+                # Range not satisfiable: the partial file is stale, start over
+                partial.unlink(missing_ok=True)
+            if attempt == attempts:
+                break
+            logger.warning(f"Download to {destination.name} failed (attempt {attempt}/{attempts}), resuming: {e}")
+            time.sleep(retry_delay * attempt)
+    raise last_error
+
+
+def _expected_size(headers, offset: int) -> Optional[int]:
+    content_range = headers.get("content-range")
+    if content_range and "/" in content_range:
+        total = content_range.rsplit("/", 1)[1]
+        if total.isdigit():
+            return int(total)
+    length = headers.get("content-length")
+    if length and length.isdigit():
+        return offset + int(length)
+    return None
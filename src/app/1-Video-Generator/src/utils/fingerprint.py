@@ -0,0 +1,76 @@
+import hashlib
+import re
+from typing import List, Optional, Tuple
+
+from src.utils.relevance import fold
+
+SIMHASH_BITS = 64
+# Word sets (1-grams) are far more stable than longer shingles on the short
+# excerpts we store, where every edit would otherwise change several n-grams
+SHINGLE_SIZE = 1
+# Texts shorter than this (in shingles) are too small to fingerprint reliably
+MIN_SHINGLES = 8
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def _hash64(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> List[str]:
+    """Word n-grams of the accent-folded text."""
+    tokens = _TOKEN_RE.findall(fold(text))
+    if size == 1:
+        return tokens
+    if len(tokens) < size:
+        return [" ".join(tokens)] if tokens else []
+    return [" ".join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)]
+
+
+def simhash(text: str) -> Optional[int]:
+    """
+    64-bit SimHash of a text, or None when it is too short to be meaningful.
+
+    Near-duplicate texts yield fingerprints that differ in only a few bits.
+    """
+    grams = set(shingles(text))
+    if len(grams) < MIN_SHINGLES:
+        return None
+
+    counts = [0] * SIMHASH_BITS
+    for gram in grams:
+        h = _hash64(gram)
+        for bit in range(SIMHASH_BITS):
+            counts[bit] += 1 if (h >> bit) & 1 else -1
+
+    fingerprint = 0
+    for bit, count in enumerate(counts):
+        if count > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def hamming(a: int, b: int) -> int:
+    return bin((a ^ b) & ((1 << SIMHASH_BITS) - 1)).count("1")
+
+
+def bands(fingerprint: int, count: int = 4) -> List[Tuple[int, int]]:
+    """
+    Split a fingerprint into `count` LSH bands of equal width.
+
+    Two fingerprints within `count - 1` bits of each other always share at least
+    one band, so looking up bands finds every candidate within that distance.
+    """
+    width = SIMHASH_BITS // count
+    mask = (1 << width) - 1
+    return [(index, (fingerprint >> (index * width)) & mask) for index in range(count)]
+
+
+def to_signed(fingerprint: int) -> int:
+    """Map an unsigned 64-bit fingerprint onto SQLite's signed INTEGER range."""
+    return fingerprint - (1 << SIMHASH_BITS) if fingerprint >= 1 << (SIMHASH_BITS - 1) else fingerprint
+
+
+def to_unsigned(value: int) -> int:
+    return value + (1 << SIMHASH_BITS) if value < 0 else value
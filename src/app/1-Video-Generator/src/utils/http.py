@@ -0,0 +1,133 @@
+import asyncio
+from typing import Dict, Optional
+
+import httpx
+
+from src.core.config import settings
+from src.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+}
+
+
+class KeyedLimiter:
+    """
+    Per-key (usually per-host) concurrency limiter built on asyncio semaphores.
+
+    Semaphores are bound to the event loop they are first used on, so the
+    limiter transparently resets itself when it is reused from a new loop
+    (e.g. successive `asyncio.run` calls in the CLI).
+    """
+
+    def __init__(self, limit: int):
+        self.limit = max(1, limit)
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def __call__(self, key: str) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._semaphores = {}
+            self._loop = loop
+        semaphore = self._semaphores.get(key)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.limit)
+            self._semaphores[key] = semaphore
+        return semaphore
+
+
+class AsyncHttpPool:
+    """
+    Shared `httpx.AsyncClient` with connection pooling and per-host concurrency limits.
+
+    A single pool is reused by every collector so that TCP/TLS connections are kept
+    alive between queries instead of being opened per request.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = settings.HTTP_MAX_CONNECTIONS,
+        max_per_host: int = settings.HTTP_MAX_CONNECTIONS_PER_HOST,
+        timeout: float = settings.HTTP_TIMEOUT,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.transport = transport
+        self.host_limiter = KeyedLimiter(max_per_host)
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._closer = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """
+        Return the pooled client, creating it for the running event loop if needed.
+
+        A client only works on the loop it was created on, so a new loop (each
+        `asyncio.run` of the CLI) gets a new client; the previous one is closed
+        on its own loop, see `_close_with_loop`.
+        """
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or loop is not self._loop:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                headers=DEFAULT_HEADERS,
+                follow_redirects=True,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+                transport=self.transport,
+            )
+            self._loop = loop
+            self._closer = self._close_with_loop(self._client, loop)
+        return self._client
+
+    @staticmethod
+    def _close_with_loop(client: httpx.AsyncClient, loop: asyncio.AbstractEventLoop):
+        """
+        Tie `client` to the lifetime of `loop` through an async generator.
+
+        The loop finalizes its async generators before it closes (`asyncio.run`
+        does), and runs the finalizer of one dropped while it is still alive, so
+        the client is closed on its own loop either way: when that loop ends, or
+        when it is replaced here. Returns the generator, which the pool keeps.
+        """
+        async def closer():
+            try:
+                yield
+            finally:
+                await client.aclose()
+
+        generator = closer()
+        # First iteration on `loop` registers the generator with it
+        loop.create_task(generator.__anext__())
+        return generator
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """Send a request, waiting for a free slot on the target host first."""
+        host = httpx.URL(url).host
+        async with self.host_limiter(host):
+            return await self.client.request(method, url, **kwargs)
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def aclose(self) -> None:
+        """Close the underlying client (called on application shutdown)."""
+        if self._client is not None and not self._client.is_closed:
+            try:
+                await self._client.aclose()
+            except RuntimeError as e:
+                # The loop that owned the client is already gone
+                logger.debug(f"Could not close HTTP client cleanly: {e}")
+        self._client = None
+        self._loop = None
+        self._closer = None
+
+# Global instance
+http_pool = AsyncHttpPool()
@@ -0,0 +1,35 @@
+from typing import Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from src.utils.relevance import fold
+
+# Query parameters that only track the visit and never change the page
+_TRACKING_PREFIXES = ("utm_", "fbclid", "gclid", "mc_")
+
+
+def normalize_link(link: Optional[str]) -> Optional[str]:
+    """
+    Canonical form of a URL used as a dedup key.
+
+    Lowercases scheme and host, drops the fragment, tracking parameters,
+    a leading "www." and any trailing slash.
+    """
+    if not link or not link.strip():
+        return None
+    parts = urlsplit(link.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = urlencode([
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith(_TRACKING_PREFIXES)
+    ])
+    path = parts.path.rstrip("/")
+    return urlunsplit((parts.scheme.lower(), host, path, query, ""))
+
+
+def normalize_title(title: Optional[str]) -> Optional[str]:
+    """Accent-folded, lowercased title with collapsed whitespace, used as a dedup key."""
+    if not title or not title.strip():
+        return None
+    return " ".join(fold(title).split())
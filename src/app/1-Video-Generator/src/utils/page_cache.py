@@ -0,0 +1,141 @@
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional
+
+from src.core.config import settings, BASE_DIR
+from src.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class CachedPage:
+    """
+    Extracted article text plus the HTTP validators needed to revalidate it.
+    """
+    url: str
+    text: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fetched_at: float
+
+    def is_fresh(self, ttl_seconds: float) -> bool:
+        return time.time() - self.fetched_at < ttl_seconds
+
+    def validators(self) -> Dict[str, str]:
+        """Headers for a conditional GET against the origin."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class PageCache:
+    """
+    On-disk (SQLite) cache of extracted article text keyed by URL.
+
+    Entries younger than the TTL are served without touching the network; older
+    ones are revalidated with a conditional GET. The store is bounded in bytes and
+    evicts the least recently used entries first.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS pages (
+            url TEXT PRIMARY KEY,
+            body BLOB NOT NULL,
+            etag TEXT,
+            last_modified TEXT,
+            fetched_at REAL NOT NULL,
+            last_access REAL NOT NULL,
+            size INTEGER NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS ix_pages_last_access ON pages (last_access);
+    """
+
+    def __init__(self, path: Path, ttl_seconds: float, max_bytes: int):
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(self.SCHEMA)
+        return self._conn
+
+    def get(self, url: str) -> Optional[CachedPage]:
+        """Return the cached entry for `url` (fresh or stale) and mark it as recently used."""
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute(
+                "SELECT body, etag, last_modified, fetched_at FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE pages SET last_access = ? WHERE url = ?", (time.time(), url))
+
+        body, etag, last_modified, fetched_at = row
+        return CachedPage(url, zlib.decompress(body).decode("utf-8"), etag, last_modified, fetched_at)
+
+    def put(self, url: str, text: str, etag: Optional[str] = None, last_modified: Optional[str] = None) -> None:
+        """Store extracted text and validators, evicting old entries if over quota."""
+        body = zlib.compress(text.encode("utf-8"))
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO pages (url, body, etag, last_modified, fetched_at, last_access, size) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, body, etag, last_modified, now, now, len(body)),
+            )
+            self._evict(conn)
+
+    def touch(self, url: str) -> None:
+        """Mark an entry as revalidated (origin answered 304 Not Modified)."""
+        now = time.time()
+        with self._lock:
+            self._connection().execute(
+                "UPDATE pages SET fetched_at = ?, last_access = ? WHERE url = ?", (now, now, url)
+            )
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        # Free a little extra room so we don't evict on every insert
+        target = int(self.max_bytes * 0.9)
+        removed = 0
+        for url, size in conn.execute("SELECT url, size FROM pages ORDER BY last_access ASC").fetchall():
+            if total <= target:
+                break
+            conn.execute("DELETE FROM pages WHERE url = ?", (url,))
+            total -= size
+            removed += 1
+        logger.debug(f"Page cache evicted {removed} entries ({total} bytes remaining)")
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def build_page_cache() -> Optional[PageCache]:
+    if not settings.PAGE_CACHE_ENABLED:
+        return None
+    return PageCache(
+        path=Path(settings.PAGE_CACHE_PATH) if settings.PAGE_CACHE_PATH else BASE_DIR / "cache" / "pages.db",
+        ttl_seconds=settings.PAGE_CACHE_TTL_HOURS * 3600,
+        max_bytes=settings.PAGE_CACHE_MAX_MB * 1024 * 1024,
+    )
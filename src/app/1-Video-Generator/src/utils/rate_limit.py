@@ -0,0 +1,73 @@
+import asyncio
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """
+    Async token bucket: `capacity` tokens, refilled continuously at `rate_per_minute`.
+
+    `acquire(n)` waits until `n` tokens are available and takes them; waiters
+    are served in arrival order so a large request is not starved by small
+    ones. Like `KeyedLimiter`, the lock is rebuilt when the bucket is used
+    from a new event loop.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate = max(rate_per_minute, 1e-9) / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock: Optional[asyncio.Lock] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _get_lock(self) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._lock = asyncio.Lock()
+            self._loop = loop
+        return self._lock
+
+    async def acquire(self, amount: float = 1) -> None:
+        # A request larger than the bucket could never fit; let it drain the bucket instead
+        amount = min(amount, self.capacity)
+        async with self._get_lock():
+            while True:
+                self._refill()
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return
+                await asyncio.sleep((amount - self._tokens) / self.rate)
+
+    def refund(self, amount: float) -> None:
+        """Give back tokens taken by an overestimate (negative `amount` charges extra)."""
+        self._refill()
+        self._tokens = min(self.capacity, self._tokens + amount)
+
+
+class RateLimiter:
+    """
+    Requests-per-minute and tokens-per-minute limits of one API key and model.
+
+    A call reserves one request and an estimate of its tokens (prompt plus
+    `max_tokens`, which is what the API counts against TPM up front), then
+    `settle` corrects the token bucket with the real usage once the
+    response arrives.
+    """
+
+    def __init__(self, rpm: int, tpm: int):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+
+    async def acquire(self, estimated_tokens: int) -> None:
+        await self.requests.acquire(1)
+        await self.tokens.acquire(estimated_tokens)
+
+    def settle(self, estimated_tokens: int, used_tokens: Optional[int]) -> None:
+        if used_tokens is not None:
+            self.tokens.refund(estimated_tokens - used_tokens)
@@ -0,0 +1,85 @@
+import re
+import unicodedata
+from bisect import bisect_right
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from src.models.records import PropositionRecord
+
+DEFAULT_KEYWORDS = [
+    'imposto', 'taxa', 'tributo', 'IPVA', 'IPI', 'ICMS',
+    'aumento', 'redução', 'benefício', 'auxílio', 'bolsa',
+    'transporte', 'educação', 'saúde', 'previdência',
+    'salário', 'mínimo', 'trabalho', 'emprego'
+]
+
+# A hit in the title says more about an item than one buried in the body
+DEFAULT_FIELD_WEIGHTS = {'title': 3, 'description': 2, 'content': 1}
+
+# Separator between items when a batch is scanned as one string; never matched by \w
+_SEPARATOR = "\x1f"
+
+
+def fold(text: str) -> str:
+    """Lowercase and strip accents ("Redução" -> "reducao")."""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return decomposed.encode("ascii", "ignore").decode("ascii")
+
+
+class RelevanceScorer:
+    """
+    Weighted keyword scorer backed by one precompiled, accent-folded regex.
+
+    Keywords match at the start of a word, so plurals and inflections
+    ("impostos", "taxas") count as hits. The score of an item is the sum over
+    fields of `field weight * keyword weight * hits`, with hits of the same keyword
+    in one field capped at `max_hits_per_keyword`.
+    """
+
+    def __init__(
+        self,
+        keywords: Iterable[str] = DEFAULT_KEYWORDS,
+        keyword_weights: Optional[Dict[str, int]] = None,
+        field_weights: Optional[Dict[str, int]] = None,
+        max_hits_per_keyword: int = 3,
+    ):
+        folded = {fold(keyword) for keyword in keywords}
+        self.keyword_weights = {fold(k): w for k, w in (keyword_weights or {}).items()}
+        self.field_weights = field_weights or DEFAULT_FIELD_WEIGHTS
+        self.max_hits_per_keyword = max_hits_per_keyword
+        # Longest first so overlapping keywords resolve to the most specific one
+        alternation = "|".join(re.escape(k) for k in sorted(folded, key=len, reverse=True))
+        self._pattern = re.compile(rf"\b(?:{alternation})")
+
+    def score(self, item: PropositionRecord) -> int:
+        return self.score_batch([item])[0]
+
+    def score_batch(self, items: Sequence[PropositionRecord]) -> List[int]:
+        """
+        Score every item with a single regex scan per field over the whole batch.
+        """
+        scores = [0] * len(items)
+        if not items:
+            return scores
+
+        for field, field_weight in self.field_weights.items():
+            texts = [fold(getattr(item, field) or "") for item in items]
+            # Offsets of each item inside the joined string, to map matches back
+            starts, position = [], 0
+            for text in texts:
+                starts.append(position)
+                position += len(text) + len(_SEPARATOR)
+
+            hits: List[Counter] = [Counter() for _ in items]
+            for match in self._pattern.finditer(_SEPARATOR.join(texts)):
+                hits[bisect_right(starts, match.start()) - 1][match.group()] += 1
+
+            for index, counter in enumerate(hits):
+                for keyword, count in counter.items():
+                    weight = self.keyword_weights.get(keyword, 1)
+                    scores[index] += field_weight * weight * min(count, self.max_hits_per_keyword)
+
+        return scores
+
+# Global instance
+relevance_scorer = RelevanceScorer()
@@ -1,11 +1,20 @@
-import requests
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
 from typing import List, Dict, Optional
 from datetime import datetime, timedelta
-from bs4 import BeautifulSoup
-from googleapiclient.discovery import build
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
 
 from src.core.config import settings
 from src.core.logging import get_logger
+from src.core.registry import services
+from src.utils.http import http_pool, DEFAULT_HEADERS, KeyedLimiter
+from src.utils.page_cache import build_page_cache
+from src.utils.search_cache import SearchKey, build_search_cache, current_search_usage
 
 logger = get_logger(__name__)
 
@@ -13,6 +22,7 @@ class GoogleScraper:
     """
     Utility class for scraping news via Google Custom Search API.
     """
+    SEARCH_URL = "https://www.googleapis.com/customsearch/v1"
     
     def __init__(self):
         self.api_key = settings.GOOGLE_SEARCH_API_KEY
@@ -20,6 +30,29 @@ class GoogleScraper:
         
         if not self.api_key or not self.engine_id:
             logger.warning("Google Search credentials not set. Search functionality will be disabled.")
+
+        # Content extraction budget (shared by every concurrent query)
+        self.extract_workers = settings.EXTRACT_MAX_WORKERS
+        self.extract_per_domain = settings.EXTRACT_MAX_PER_DOMAIN
+        self.extract_timeout = settings.EXTRACT_TIMEOUT
+        self.extract_deadline = settings.EXTRACT_DEADLINE
+        self._worker_limiter = KeyedLimiter(self.extract_workers)
+        self._domain_limiter = KeyedLimiter(self.extract_per_domain)
+        self._domain_locks: Dict[str, threading.BoundedSemaphore] = {}
+        self._domain_locks_guard = threading.Lock()
+        # Blocking path: one pool for every query (threads start on first use)
+        self._extract_executor = ThreadPoolExecutor(max_workers=self.extract_workers, thread_name_prefix="extract")
+        self.page_cache = build_page_cache()
+
+        # Long-lived session for the blocking path, created on first use
+        self._session: Optional["requests.Session"] = None
+        self._session_lock = threading.Lock()
+
+        # Query-level cache and in-flight coalescing for the Custom Search API
+        self.search_cache = build_search_cache()
+        self.api_calls_total = 0
+        self._inflight: Dict[SearchKey, asyncio.Task] = {}
+        self._inflight_loop: Optional[asyncio.AbstractEventLoop] = None
             
     def search(
         self, 
@@ -35,44 +68,19 @@ class GoogleScraper:
             return []
             
         try:
-            service = build("customsearch", "v1", developerKey=self.api_key)
+            key = (query, days_back, limit)
+            items = self._cached_items(key)
+            if items is None:
+                items = self._call_api(key)
             
-            logger.info(f"Searching for: '{query}'")
-            res = service.cse().list(
-                q=query, 
-                cx=self.engine_id, 
-                num=min(limit, 10),
-                sort="date"
-            ).execute()
-            
-            if "items" not in res:
+            if not items:
                 return []
                 
-            results = []
-            for item in res["items"]:
-                # Extract date
-                news_date = item.get("pagemap", {}).get("metatags", [{}])[0].get("article:published_time", "")
-                news_date = news_date[:10] if news_date else ""
-                
-                # Filter by date
-                if days_back > 0 and not self._is_recent(news_date, days_back):
-                    continue
-                    
-                result = {
-                    "title": item["title"],
-                    "link": item["link"],
-                    "description": item.get("snippet", ""),
-                    "date": news_date,
-                    "source": "google_search"
-                }
-                
-                if extract_content:
-                    result["content"] = self._extract_content(item["link"])
-                    
-                results.append(result)
-                
-                if len(results) >= limit:
-                    break
+            results = self._parse_items(items, days_back, limit)
+            if extract_content:
+                contents = self._extract_contents([result["link"] for result in results])
+                for result, content in zip(results, contents):
+                    result["content"] = content
                     
             return results
             
@@ -80,6 +88,161 @@ class GoogleScraper:
             logger.error(f"Error in Google Search: {e}")
             return []
 
+    async def asearch(
+        self,
+        query: str,
+        days_back: int = 30,
+        limit: int = 10,
+        extract_content: bool = True,
+        raise_errors: bool = False,
+    ) -> List[Dict]:
+        """
+        Perform a Google Custom Search on the event loop through the shared HTTP pool.
+
+        A failed search returns no results, or raises with `raise_errors` so
+        incremental collectors can tell it apart from an empty one.
+        """
+        if not self.api_key or not self.engine_id:
+            return []
+
+        try:
+            items = await self._afetch_items(query, days_back, limit)
+            if not items:
+                return []
+
+            results = self._parse_items(items, days_back, limit)
+            if extract_content:
+                contents = await self._aextract_contents([result["link"] for result in results])
+                for result, content in zip(results, contents):
+                    result["content"] = content
+
+            return results
+
+        except Exception as e:
+            logger.error(f"Error in Google Search: {e}")
+            if raise_errors:
+                raise
+            return []
+
+    async def _afetch_items(self, query: str, days_back: int, limit: int) -> List[Dict]:
+        """
+        Return raw API items for a query, from the cache when fresh.
+
+        Identical queries issued concurrently share a single in-flight API call.
+        """
+        key = (query, days_back, limit)
+        items = self._cached_items(key)
+        if items is not None:
+            return items
+
+        loop = asyncio.get_running_loop()
+        if loop is not self._inflight_loop:
+            self._inflight = {}
+            self._inflight_loop = loop
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._acall_api(key))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            # The shared call is counted in api_calls of the run that started it
+            current_search_usage().coalesced += 1
+        return await asyncio.shield(task)
+
+    def _call_api(self, key: SearchKey) -> List[Dict]:
+        logger.info(f"Searching for: '{key[0]}'")
+        self._count_api_call()
+        resp = self.session.get(self.SEARCH_URL, params=self._api_params(key), timeout=settings.HTTP_TIMEOUT)
+        resp.raise_for_status()
+        items = resp.json().get("items", [])
+        self._store_items(key, items)
+        return items
+
+    async def _acall_api(self, key: SearchKey) -> List[Dict]:
+        logger.info(f"Searching for: '{key[0]}'")
+        self._count_api_call()
+        resp = await http_pool.get(self.SEARCH_URL, params=self._api_params(key))
+        resp.raise_for_status()
+        items = resp.json().get("items", [])
+        self._store_items(key, items)
+        return items
+
+    def _api_params(self, key: SearchKey) -> Dict:
+        query, days_back, limit = key
+        params = {
+            "key": self.api_key,
+            "cx": self.engine_id,
+            "q": query,
+            "num": min(limit, 10),
+            "sort": "date",
+        }
+        if days_back > 0:
+            # Let the API restrict the window instead of filtering it locally only
+            params["dateRestrict"] = f"d{days_back}"
+        return params
+
+    @property
+    def session(self) -> requests.Session:
+        """
+        Pooled `requests.Session` shared by every blocking search and page fetch.
+
+        It is configured once and never mutated afterwards, which keeps it safe to
+        use from the extraction thread pool.
+        """
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(
+                        pool_connections=settings.HTTP_MAX_CONNECTIONS,
+                        pool_maxsize=settings.HTTP_MAX_CONNECTIONS_PER_HOST,
+                    )
+                    session.mount("https://", adapter)
+                    session.mount("http://", adapter)
+                    session.headers.update(DEFAULT_HEADERS)
+                    self._session = session
+        return self._session
+
+    def _cached_items(self, key: SearchKey) -> Optional[List[Dict]]:
+        items = self.search_cache.get(key) if self.search_cache else None
+        if items is not None:
+            current_search_usage().cache_hits += 1
+        return items
+
+    def _store_items(self, key: SearchKey, items: List[Dict]) -> None:
+        if self.search_cache:
+            self.search_cache.put(key, items)
+
+    def _count_api_call(self) -> None:
+        self.api_calls_total += 1
+        current_search_usage().api_calls += 1
+
+    def _parse_items(self, items: List[Dict], days_back: int, limit: int) -> List[Dict]:
+        """Convert raw Custom Search items into result dicts, filtering by date."""
+        results = []
+        for item in items:
+            # Extract date
+            news_date = item.get("pagemap", {}).get("metatags", [{}])[0].get("article:published_time", "")
+            news_date = news_date[:10] if news_date else ""
+            
+            # Filter by date
+            if days_back > 0 and not self._is_recent(news_date, days_back):
+                continue
+                
+            results.append({
+                "title": item["title"],
+                "link": item["link"],
+                "description": item.get("snippet", ""),
+                "date": news_date,
+                "source": "google_search"
+            })
+            
+            if len(results) >= limit:
+                break
+                
+        return results
+
     def _is_recent(self, date_str: str, days: int) -> bool:
         """Check if date is within the last N days."""
         if not date_str:
@@ -91,32 +254,137 @@ class GoogleScraper:
         except:
             return True
 
+    def _extract_contents(self, urls: List[str]) -> List[str]:
+        """
+        Extraction stage for the blocking path: fetch pages on the scraper's
+        bounded thread pool, shared by every concurrent query.
+
+        Pages not finished before `extract_deadline` are returned as empty strings.
+        """
+        if not urls:
+            return []
+
+        futures = [self._extract_executor.submit(self._extract_content_limited, url) for url in urls]
+        done, pending = wait(futures, timeout=self.extract_deadline)
+        for future in pending:
+            future.cancel()
+
+        if pending:
+            logger.warning(f"Content extraction deadline reached; {len(pending)} page(s) skipped.")
+        return [future.result() if future in done else "" for future in futures]
+
+    def _extract_content_limited(self, url: str) -> str:
+        with self._domain_lock(urlparse(url).netloc):
+            return self._extract_content(url)
+
+    def _domain_lock(self, domain: str) -> threading.BoundedSemaphore:
+        with self._domain_locks_guard:
+            lock = self._domain_locks.get(domain)
+            if lock is None:
+                lock = threading.BoundedSemaphore(self.extract_per_domain)
+                self._domain_locks[domain] = lock
+            return lock
+
+    async def _aextract_contents(self, urls: List[str]) -> List[str]:
+        """
+        Extraction stage for the async path: fetch pages concurrently within the
+        worker budget and per-domain cap, giving up on whatever is still pending
+        when the per-query deadline expires.
+        """
+        if not urls:
+            return []
+
+        async def fetch(url: str) -> str:
+            async with self._worker_limiter("workers"), self._domain_limiter(urlparse(url).netloc):
+                return await self._aextract_content(url)
+
+        tasks = [asyncio.create_task(fetch(url)) for url in urls]
+        started = time.monotonic()
+        done, pending = await asyncio.wait(tasks, timeout=self.extract_deadline)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+        if pending:
+            logger.warning(
+                f"Content extraction deadline reached after {time.monotonic() - started:.1f}s; "
+                f"{len(pending)} page(s) skipped."
+            )
+        return [task.result() if task in done else "" for task in tasks]
+
     def _extract_content(self, url: str, max_chars: int = 2000) -> str:
         """Extract main text content from a URL."""
+        cached = self.page_cache.get(url) if self.page_cache else None
+        if cached and cached.is_fresh(self.page_cache.ttl_seconds):
+            return cached.text[:max_chars]
+
         try:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            }
-            resp = requests.get(url, timeout=10, headers=headers)
+            headers = cached.validators() if cached else {}
+            resp = self.session.get(url, timeout=self.extract_timeout, headers=headers)
+            if cached and resp.status_code == 304:
+                self.page_cache.touch(url)
+                return cached.text[:max_chars]
             resp.raise_for_status()
-            soup = BeautifulSoup(resp.content, "html.parser")
-            
-            # Remove junk
-            for s in soup(["script", "style", "nav", "footer", "header"]):
-                s.extract()
-            
-            # Find main content
-            article = soup.find('article') or soup.find('main') or soup.find('div', class_=lambda x: x and 'content' in str(x).lower())
-            if article:
-                text = article.get_text(separator=" ")
-            else:
-                text = soup.get_text(separator=" ")
-                
-            text = " ".join(text.split())
-            return text[:max_chars]
+            text = self._parse_content(resp.content, max_chars)
+            self._store_page(url, text, resp.headers)
+            return text
+        except Exception as e:
+            logger.warning(f"Failed to extract content from {url}: {e}")
+            return cached.text[:max_chars] if cached else ""
+
+    async def _aextract_content(self, url: str, max_chars: int = 2000) -> str:
+        """
+        Async variant of `_extract_content` using the shared HTTP pool.
+
+        The page cache (SQLite + zlib) and the HTML parser block, so they run
+        in threads like the rest of the blocking I/O.
+        """
+        cached = await asyncio.to_thread(self.page_cache.get, url) if self.page_cache else None
+        if cached and cached.is_fresh(self.page_cache.ttl_seconds):
+            return cached.text[:max_chars]
+
+        try:
+            headers = cached.validators() if cached else {}
+            resp = await http_pool.get(url, timeout=self.extract_timeout, headers=headers)
+            if cached and resp.status_code == 304:
+                await asyncio.to_thread(self.page_cache.touch, url)
+                return cached.text[:max_chars]
+            resp.raise_for_status()
+            text = await asyncio.to_thread(self._parse_content, resp.content, max_chars)
+            await asyncio.to_thread(self._store_page, url, text, resp.headers)
+            return text
         except Exception as e:
             logger.warning(f"Failed to extract content from {url}: {e}")
-            return ""
+            return cached.text[:max_chars] if cached else ""
+
+    def _store_page(self, url: str, text: str, headers) -> None:
+        if self.page_cache and text:
+            self.page_cache.put(url, text, headers.get("ETag"), headers.get("Last-Modified"))
+
+    @staticmethod
+    def _parse_content(html: bytes, max_chars: int) -> str:
+        """Extract the main article text from an HTML document."""
+        from bs4 import BeautifulSoup
+
+        soup = BeautifulSoup(html, "html.parser")
+        
+        # Remove junk
+        for s in soup(["script", "style", "nav", "footer", "header"]):
+            s.extract()
+        
+        # Find main content
+        article = soup.find('article') or soup.find('main') or soup.find('div', class_=lambda x: x and 'content' in str(x).lower())
+        if article:
+            text = article.get_text(separator=" ")
+        else:
+            text = soup.get_text(separator=" ")
+            
+        text = " ".join(text.split())
+        return text[:max_chars]
+
+services.register("scraper", GoogleScraper)
+
 
-# Global instance
-scraper = GoogleScraper()
+def get_scraper() -> GoogleScraper:
+    """The shared GoogleScraper (caches, limiters, session), built on first use."""
+    return services.get("scraper")
@@ -0,0 +1,115 @@
+import json
+import sqlite3
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from src.core.config import settings, BASE_DIR
+from src.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+SearchKey = Tuple[str, int, int]
+
+
+@dataclass
+class SearchUsage:
+    """
+    Custom Search API accounting for one collection run.
+
+    A search coalesced onto an identical in-flight one counts as `coalesced`
+    for the run that waited; the API call itself is counted once, for the run
+    that issued it, since only one request is billed.
+    """
+    api_calls: int = 0
+    cache_hits: int = 0
+    coalesced: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return asdict(self)
+
+
+# Usage counter of the collection run currently executing (one per task context)
+search_usage_var: ContextVar[Optional[SearchUsage]] = ContextVar("search_usage", default=None)
+
+
+def current_search_usage() -> SearchUsage:
+    """Counter of the active run, or a throwaway one when called outside a run."""
+    return search_usage_var.get() or SearchUsage()
+
+
+class SearchCache:
+    """
+    SQLite cache of raw Custom Search results keyed by (query, days_back, limit).
+
+    Entries are served while younger than the freshness window; after that the
+    next search for the same key goes back to the API and overwrites them.
+    Every write also deletes the expired entries, so the file only holds
+    searches still within the window.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS searches (
+            query TEXT NOT NULL,
+            days_back INTEGER NOT NULL,
+            result_limit INTEGER NOT NULL,
+            items TEXT NOT NULL,
+            fetched_at REAL NOT NULL,
+            PRIMARY KEY (query, days_back, result_limit)
+        );
+        CREATE INDEX IF NOT EXISTS ix_searches_fetched_at ON searches (fetched_at);
+    """
+
+    def __init__(self, path: Path, ttl_seconds: float):
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(self.SCHEMA)
+        return self._conn
+
+    def get(self, key: SearchKey) -> Optional[List[Dict]]:
+        """Return the cached API items for `key` if still within the freshness window."""
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT items, fetched_at FROM searches WHERE query = ? AND days_back = ? AND result_limit = ?",
+                key,
+            ).fetchone()
+        if row is None or time.time() - row[1] >= self.ttl_seconds:
+            return None
+        return json.loads(row[0])
+
+    def put(self, key: SearchKey, items: List[Dict]) -> None:
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute("DELETE FROM searches WHERE fetched_at <= ?", (now - self.ttl_seconds,))
+            conn.execute(
+                "INSERT OR REPLACE INTO searches (query, days_back, result_limit, items, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (*key, json.dumps(items), now),
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def build_search_cache() -> Optional[SearchCache]:
+    if not settings.SEARCH_CACHE_ENABLED:
+        return None
+    return SearchCache(
+        path=Path(settings.SEARCH_CACHE_PATH) if settings.SEARCH_CACHE_PATH else BASE_DIR / "cache" / "searches.db",
+        ttl_seconds=settings.SEARCH_CACHE_TTL_MINUTES * 60,
+    )
@@ -0,0 +1,148 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from src.core.config import settings, BASE_DIR
+from src.core.logging import get_logger
+from src.utils.files import link_or_copy
+
+logger = get_logger(__name__)
+
+
+def segment_key(model: str, size: str, seconds: int, prompt: str) -> str:
+    """Content address of a render: identical inputs always produce the same key."""
+    digest = hashlib.sha256()
+    for part in (model, size, str(seconds), prompt):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+@dataclass
+class CachedSegment:
+    key: str
+    video_id: str
+    path: Path
+    size: int
+
+
+@dataclass
+class SegmentCacheReport:
+    """Hits and misses of one render."""
+    hits: int = 0
+    misses: int = 0
+
+    def __str__(self) -> str:
+        return f"{self.hits} hit(s), {self.misses} miss(es)"
+
+
+class SegmentCache:
+    """
+    Content-addressed store of rendered Sora segments.
+
+    Each mp4 is kept under the hash of (model, size, seconds, prompt) together
+    with the remote video id, so re-rendering the same script (after an ffmpeg
+    failure or a metadata-only change) costs no API call. Files live next to a
+    SQLite index; the store is bounded in bytes and evicts the least recently
+    used segments first.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS segments (
+            key TEXT PRIMARY KEY,
+            video_id TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            created_at REAL NOT NULL,
+            last_access REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS ix_segments_last_access ON segments (last_access);
+    """
+
+    def __init__(self, directory: Path, max_bytes: int):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(
+                str(self.directory / "index.db"), check_same_thread=False, isolation_level=None
+            )
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(self.SCHEMA)
+        return self._conn
+
+    def _file(self, key: str) -> Path:
+        return self.directory / f"{key}.mp4"
+
+    def get(self, key: str) -> Optional[CachedSegment]:
+        """Return the cached segment for `key` and mark it as recently used."""
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute("SELECT video_id, size FROM segments WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            path = self._file(key)
+            if not path.exists():
+                # File removed behind our back: forget the entry
+                conn.execute("DELETE FROM segments WHERE key = ?", (key,))
+                return None
+            conn.execute("UPDATE segments SET last_access = ? WHERE key = ?", (time.time(), key))
+        return CachedSegment(key, row[0], path, row[1])
+
+    def put(self, key: str, video_id: str, source: Path) -> CachedSegment:
+        """Store a downloaded segment (hardlinked when possible), evicting old ones if over quota."""
+        path = link_or_copy(source, self._file(key))
+        size = path.stat().st_size
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO segments (key, video_id, size, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, video_id, size, now, now),
+            )
+            self._evict(conn)
+        return CachedSegment(key, video_id, path, size)
+
+    def materialize(self, cached: CachedSegment, destination: Path) -> Path:
+        """Place a cached segment at `destination` without copying its bytes when possible."""
+        return link_or_copy(cached.path, destination)
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM segments").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        # Free a little extra room so we don't evict on every insert
+        target = int(self.max_bytes * 0.9)
+        removed = 0
+        for key, size in conn.execute("SELECT key, size FROM segments ORDER BY last_access ASC").fetchall():
+            if total <= target:
+                break
+            conn.execute("DELETE FROM segments WHERE key = ?", (key,))
+            self._file(key).unlink(missing_ok=True)
+            total -= size
+            removed += 1
+        logger.debug(f"Segment cache evicted {removed} entries ({total} bytes remaining)")
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def build_segment_cache() -> Optional[SegmentCache]:
+    if not settings.SEGMENT_CACHE_ENABLED:
+        return None
+    return SegmentCache(
+        directory=Path(settings.SEGMENT_CACHE_PATH) if settings.SEGMENT_CACHE_PATH else BASE_DIR / "cache" / "segments",
+        max_bytes=settings.SEGMENT_CACHE_MAX_MB * 1024 * 1024,
+    )
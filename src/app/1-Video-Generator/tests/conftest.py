@@ -1,8 +1,19 @@
+import os
+import tempfile
 import pytest
 import asyncio
 from httpx import AsyncClient, ASGITransport
+
+# Keep the test run away from the real montoya.db; must be set before src is imported
+os.environ.setdefault("DATABASE_PATH", os.path.join(tempfile.mkdtemp(prefix="montoya-tests-"), "montoya.db"))
+
 from src.main import app
+from src.services.job_service import job_queue
 from src.core.config import settings
+from src.core.database import init_db
+
+# ASGITransport does not run the lifespan, where the app creates its tables
+init_db()
 
 # Force testing environment
 settings.ENVIRONMENT = "testing"
@@ -20,3 +31,5 @@ async def client():
     transport = ASGITransport(app=app)
     async with AsyncClient(transport=transport, base_url="http://test") as ac:
         yield ac
+    # ASGITransport does not run the lifespan; stop the workers started by enqueue
+    await job_queue.shutdown()
@@ -1,6 +1,20 @@
+import asyncio
+
 import pytest
 from httpx import AsyncClient
 
+async def _wait_for_job(client: AsyncClient, job_id: int, timeout: float = 60.0) -> dict:
+    """Poll a background job until it reaches a terminal status."""
+    deadline = asyncio.get_running_loop().time() + timeout
+    while True:
+        response = await client.get(f"/jobs/{job_id}")
+        assert response.status_code == 200
+        job = response.json()
+        if job["status"] in ("completed", "failed", "cancelled"):
+            return job
+        assert asyncio.get_running_loop().time() < deadline, f"job {job_id} still {job['status']}"
+        await asyncio.sleep(0.1)
+
 @pytest.mark.asyncio
 async def test_root(client: AsyncClient):
     """Test the root endpoint."""
@@ -19,8 +33,10 @@ async def test_collect_endpoint(client: AsyncClient):
     params = {"days_back": 1, "limit": 1}
     response = await client.post("/collect", params=params)
     
-    assert response.status_code == 200
-    data = response.json()
+    assert response.status_code == 202
+    job = await _wait_for_job(client, response.json()["id"])
+    assert job["status"] == "completed"
+    data = job["result"]
     
     assert "total_items" in data
     assert "sources_summary" in data
@@ -45,8 +61,10 @@ async def test_generate_tiktok_script(client: AsyncClient):
     }
     
     response = await client.post("/generate/tiktok", json=payload)
-    assert response.status_code == 200
-    data = response.json()
+    assert response.status_code == 202
+    job = await _wait_for_job(client, response.json()["id"])
+    assert job["status"] == "completed"
+    data = job["result"]
     assert "script" in data
     # If API key is missing, it returns an error message string, but status 200
     assert isinstance(data["script"], str)
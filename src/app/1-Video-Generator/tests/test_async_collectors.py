@@ -0,0 +1,362 @@
+import asyncio
+import threading
+
+import httpx
+import pytest
+
+from src.collectors import camara
+from src.collectors import senado
+from src.collectors.base import IncompleteCollection, Watermark
+from src.collectors.camara import CamaraCollector
+from src.collectors.senado import SenadoCollector
+from src.utils import scraper as scraper_module
+from src.utils.http import AsyncHttpPool
+
+
+def _camara_payload():
+    return {
+        "dados": [
+            {
+                "id": 1001,
+                "siglaTipo": "PL",
+                "numero": 42,
+                "ano": 2025,
+                "ementa": "Dispõe sobre o transporte público.",
+                "uri": "https://dadosabertos.camara.leg.br/api/v2/proposicoes/1001",
+                "dataApresentacao": "2025-01-10T10:00",
+            }
+        ]
+    }
+
+
+@pytest.mark.asyncio
+async def test_camara_acollect_uses_shared_pool(monkeypatch):
+    """CamaraCollector.acollect should go through the shared async pool."""
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request.url)
+        return httpx.Response(200, json=_camara_payload())
+
+    pool = AsyncHttpPool(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(camara, "http_pool", pool)
+
+    items = await CamaraCollector().acollect(days_back=5, limit=1)
+    await pool.aclose()
+
+    assert len(seen) == 1
+    assert seen[0].params["siglaTipo"] == "PL"
+    assert [item.title for item in items] == ["PL 42/2025"]
+    assert items[0].date == "2025-01-10"
+
+
+@pytest.mark.asyncio
+async def test_pool_respects_per_host_limit():
+    """No more than `max_per_host` requests should be in flight for the same host."""
+    in_flight = 0
+    peak = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return httpx.Response(200, text="ok")
+
+    pool = AsyncHttpPool(max_per_host=2, transport=httpx.MockTransport(handler))
+    await asyncio.gather(*(pool.get("https://example.com/page") for _ in range(8)))
+    await pool.aclose()
+
+    assert peak == 2
+
+
+def test_pool_closes_the_client_of_each_finished_loop():
+    pool = AsyncHttpPool(transport=httpx.MockTransport(lambda request: httpx.Response(200)))
+    clients = []
+
+    async def fetch():
+        await pool.get("https://dadosabertos.camara.leg.br/api/v2/proposicoes")
+        clients.append(pool.client)
+
+    # Each CLI command runs its own loop
+    asyncio.run(fetch())
+    assert clients[0].is_closed
+    asyncio.run(fetch())
+    assert clients[1] is not clients[0] and clients[1].is_closed
+
+
+@pytest.mark.asyncio
+async def test_asearch_fetches_results_and_content(monkeypatch):
+    """GoogleScraper.asearch should query the REST endpoint and extract pages concurrently."""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.host == "www.googleapis.com":
+            return httpx.Response(200, json={
+                "items": [
+                    {"title": "Notícia", "link": "https://g1.globo.com/sp/a", "snippet": "resumo"},
+                ]
+            })
+        return httpx.Response(200, text="<html><article>Texto da matéria</article></html>")
+
+    pool = AsyncHttpPool(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(scraper_module, "http_pool", pool)
+
+    google = scraper_module.GoogleScraper()
+    google.api_key, google.engine_id = "key", "cx"
+    google.page_cache = None
+    google.search_cache = None
+    results = await google.asearch("senado", days_back=5, limit=5)
+    await pool.aclose()
+
+    assert results == [{
+        "title": "Notícia",
+        "link": "https://g1.globo.com/sp/a",
+        "description": "resumo",
+        "date": "",
+        "source": "google_search",
+        "content": "Texto da matéria",
+    }]
+
+
+@pytest.mark.asyncio
+async def test_pages_are_parsed_off_the_event_loop(monkeypatch):
+    pool = AsyncHttpPool(transport=httpx.MockTransport(
+        lambda request: httpx.Response(200, text="<html><main>Texto</main></html>")
+    ))
+    monkeypatch.setattr(scraper_module, "http_pool", pool)
+    parsed_on = []
+    parse = scraper_module.GoogleScraper._parse_content
+
+    def recording_parse(html, max_chars):
+        parsed_on.append(threading.current_thread())
+        return parse(html, max_chars)
+
+    google = scraper_module.GoogleScraper()
+    google.page_cache = None
+    monkeypatch.setattr(google, "_parse_content", recording_parse)
+    contents = await google._aextract_contents(["https://g1.globo.com/a", "https://g1.globo.com/b"])
+    await pool.aclose()
+
+    assert contents == ["Texto", "Texto"]
+    assert parsed_on and threading.main_thread() not in parsed_on
+
+
+def test_blocking_extraction_reuses_one_pool(monkeypatch):
+    google = scraper_module.GoogleScraper()
+    workers = set()
+
+    def fetch(url):
+        workers.add(threading.current_thread().name)
+        return url
+
+    monkeypatch.setattr(google, "_extract_content_limited", fetch)
+    for query in range(3):
+        urls = [f"https://g1.globo.com/{query}/{i}" for i in range(4)]
+        assert google._extract_contents(urls) == urls
+
+    assert len(workers) <= google.extract_workers
+    assert all(name.startswith("extract") for name in workers)
+
+
+@pytest.mark.asyncio
+async def test_extraction_stage_deadline_and_domain_cap(monkeypatch):
+    """Slow pages come back empty at the deadline and each domain stays within its cap."""
+    in_flight = {}
+    peak = {}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        in_flight[host] = in_flight.get(host, 0) + 1
+        peak[host] = max(peak.get(host, 0), in_flight[host])
+        try:
+            await asyncio.sleep(5 if host == "slow.example.com" else 0.01)
+        finally:
+            in_flight[host] -= 1
+        return httpx.Response(200, text=f"<html><main>{host}</main></html>")
+
+    pool = AsyncHttpPool(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(scraper_module, "http_pool", pool)
+
+    google = scraper_module.GoogleScraper()
+    google.page_cache = None
+    google.extract_deadline = 0.2
+    google._domain_limiter = scraper_module.KeyedLimiter(2)
+
+    urls = [f"https://fast.example.com/{i}" for i in range(6)] + ["https://slow.example.com/x"]
+    contents = await google._aextract_contents(urls)
+    await pool.aclose()
+
+    assert contents[:6] == ["fast.example.com"] * 6
+    assert contents[6] == ""
+    assert peak["fast.example.com"] == 2
+
+
+@pytest.mark.asyncio
+async def test_camara_acollect_stops_at_watermark(monkeypatch):
+    """Only propositions newer than the stored id are returned."""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        dados = [
+            {"id": i, "siglaTipo": "PL", "numero": i, "ano": 2025,
+             "uri": f"https://dadosabertos.camara.leg.br/api/v2/proposicoes/{i}"}
+            for i in (105, 104, 103, 102, 101)
+        ]
+        return httpx.Response(200, json={"dados": dados})
+
+    pool = AsyncHttpPool(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(camara, "http_pool", pool)
+
+    collector = CamaraCollector()
+    items = await collector.acollect(days_back=5, limit=5, watermark=Watermark(last_id=103))
+    await pool.aclose()
+
+    assert [item.title for item in items] == ["PL 105/2025", "PL 104/2025"]
+    assert collector.next_watermark(items, Watermark(last_id=103)).last_id == 105
+
+
+@pytest.mark.asyncio
+async def test_camara_incremental_run_reads_past_limit(monkeypatch):
+    """More new items than `limit` must all be read, or those past it fall below the next watermark."""
+    ids = list(range(130, 100, -1))
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        page = int(request.url.params["pagina"])
+        size = int(request.url.params["itens"])
+        chunk = ids[(page - 1) * size: page * size]
+        links = []
+        if page * size < len(ids):
+            links.append({"rel": "next", "href": str(request.url.copy_set_param("pagina", str(page + 1)))})
+        dados = [
+            {"id": i, "siglaTipo": "PL", "numero": i, "ano": 2025,
+             "uri": f"https://dadosabertos.camara.leg.br/api/v2/proposicoes/{i}"}
+            for i in chunk
+        ]
+        return httpx.Response(200, json={"dados": dados, "links": links})
+
+    pool = AsyncHttpPool(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(camara, "http_pool", pool)
+
+    collector = CamaraCollector()
+    first = await collector.acollect(days_back=5, limit=10, watermark=Watermark(last_id=100))
+    watermark = collector.next_watermark(first, Watermark(last_id=100))
+    second = await collector.acollect(days_back=5, limit=10, watermark=watermark)
+    await pool.aclose()
+
+    assert sorted(collector._proposition_id(item.link) for item in first) == list(range(101, 131))
+    assert watermark.last_id == 130
+    assert second == []
+
+
+@pytest.mark.asyncio
+async def test_camara_incremental_run_fails_when_a_tipo_fails(monkeypatch):
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.params["siglaTipo"] == "PEC":
+            return httpx.Response(503)
+        return httpx.Response(200, json={"dados": [
+            {"id": 120, "siglaTipo": "PL", "numero": 120, "ano": 2025,
+             "uri": "https://dadosabertos.camara.leg.br/api/v2/proposicoes/120"}
+        ]})
+
+    pool = AsyncHttpPool(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(camara, "http_pool", pool)
+    monkeypatch.setattr(camara.settings, "CAMARA_SIGLA_TIPOS", ["PL", "PEC"])
+
+    # Keeping PL 120 would move the watermark past PECs that were never read
+    items = await CamaraCollector().acollect(days_back=5, limit=10, watermark=Watermark(last_id=100))
+    await pool.aclose()
+    assert items == []
+
+
+def _paged_handler(pages_per_tipo, calls):
+    """Serve `pages_per_tipo` pages of two items per siglaTipo, linked through `next`."""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url)
+        tipo = request.url.params["siglaTipo"]
+        page = int(request.url.params["pagina"])
+        dados = [
+            {"id": page * 10 + i, "siglaTipo": tipo, "numero": page * 10 + i, "ano": 2025}
+            for i in (2, 1)
+        ]
+        links = []
+        if page < pages_per_tipo:
+            next_url = request.url.copy_set_param("pagina", str(page + 1))
+            links.append({"rel": "next", "href": str(next_url)})
+        return httpx.Response(200, json={"dados": dados, "links": links})
+
+    return handler
+
+
+@pytest.mark.asyncio
+async def test_camara_astream_follows_next_links_for_each_tipo(monkeypatch):
+    calls = []
+    pool = AsyncHttpPool(transport=httpx.MockTransport(_paged_handler(3, calls)))
+    monkeypatch.setattr(camara, "http_pool", pool)
+
+    titles = [
+        prop.title
+        async for prop in CamaraCollector().astream(
+            date_from="2025-01-01", sigla_tipos=["PL", "PEC"], page_size=2
+        )
+    ]
+    await pool.aclose()
+
+    assert sorted(titles) == sorted(
+        f"{tipo} {n}/2025" for tipo in ("PL", "PEC") for n in (12, 11, 22, 21, 32, 31)
+    )
+    assert len(calls) == 6
+    assert all(call.params["dataInicio"] == "2025-01-01" for call in calls)
+
+
+@pytest.mark.asyncio
+async def test_camara_acollect_does_not_widen_window_on_400(monkeypatch):
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url)
+        return httpx.Response(400, text="dataInicio inválida")
+
+    pool = AsyncHttpPool(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(camara, "http_pool", pool)
+
+    items = await CamaraCollector().acollect(days_back=5, limit=5)
+    await pool.aclose()
+
+    assert items == []
+    assert len(calls) == 1
+
+
+class StubScraper:
+    """Answers each Google query with one Senado result; queries containing `fail` raise."""
+
+    def __init__(self, fail=None):
+        self.fail = fail
+        self.calls = []
+
+    async def asearch(self, query, days_back, limit, raise_errors=False):
+        self.calls.append((query, raise_errors))
+        if self.fail and self.fail in query:
+            raise httpx.ConnectError("down")
+        return [{"title": f"Senado aprova {len(self.calls)}", "description": "senador", "date": "2025-01-01",
+                 "link": f"https://g1.globo.com/politica/{len(self.calls)}"}]
+
+
+@pytest.mark.asyncio
+async def test_google_collector_reports_failed_queries_and_cuts(monkeypatch):
+    scraper = StubScraper(fail="matéria")
+    monkeypatch.setattr(senado, "get_scraper", lambda: scraper)
+    watermark = Watermark(updated_at=None)
+
+    with pytest.raises(IncompleteCollection) as failed:
+        await SenadoCollector().acollect(days_back=5, limit=10, watermark=watermark)
+    assert len(failed.value.items) == 2 and all(raise_errors for _, raise_errors in scraper.calls)
+
+    scraper = StubScraper()
+    monkeypatch.setattr(senado, "get_scraper", lambda: scraper)
+    with pytest.raises(IncompleteCollection) as cut:
+        await SenadoCollector().acollect(days_back=5, limit=2, watermark=watermark)
+    assert len(cut.value.items) == 2
+
+    scraper.calls.clear()
+    assert len(await SenadoCollector().acollect(days_back=5, limit=3, watermark=watermark)) == 3
@@ -0,0 +1,183 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from src.core.database import Base, build_engine
+from src.models.db_models import DBProposition, DBScript, DBVideo
+from src.services.batch_render import (
+    COMPLETED,
+    FAILED,
+    BatchManifest,
+    BatchVideoPipeline,
+    select_propositions,
+)
+
+SCRIPT = "[AUDIO] primeira parte [VISUAL] ruas\n[AUDIO] segunda parte [VISUAL] mapas"
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    # A file database: stages write from several threads, each with its own connection
+    engine = build_engine(tmp_path / "batch.db")
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+def _seed(session_factory, count, scripted=()):
+    with session_factory() as db:
+        for i in range(1, count + 1):
+            db.add(DBProposition(
+                id=i, title=f"PL {i}/2025", link=f"https://camara.leg.br/proposicoes/{i}",
+                source="camara_deputados", level="federal", collection_type="api",
+            ))
+        db.flush()
+        for i in scripted:
+            db.add(DBScript(proposition_id=i, content=SCRIPT, style="informative"))
+        db.commit()
+
+
+class FakeStages:
+    """Script writer and renderer that record how much of each stage ran at once."""
+
+    def __init__(self, fail_title=None, render_seconds=0.1):
+        self.fail_title = fail_title
+        self.render_seconds = render_seconds
+        self.lock = threading.Lock()
+        self.scripts = []
+        self.renders = []
+        self.active_renders = 0
+        self.max_active_renders = 0
+        self.script_during_render = False
+
+    def generate_script(self, db, schema):
+        time.sleep(0.02)
+        with self.lock:
+            self.scripts.append(schema.title)
+            self.script_during_render |= self.active_renders > 0
+        prop = db.query(DBProposition).filter(DBProposition.title == schema.title).one()
+        db.add(DBScript(proposition_id=prop.id, content=SCRIPT, style="informative"))
+        db.commit()
+        return SCRIPT
+
+    def render(self, segments, base_filename, output_dir, max_segments, segment_duration, progress_callback):
+        with self.lock:
+            self.renders.append(base_filename)
+            self.active_renders += 1
+            self.max_active_renders = max(self.max_active_renders, self.active_renders)
+        try:
+            deadline = time.monotonic() + self.render_seconds
+            while time.monotonic() < deadline:
+                progress_callback(0.5, "renderizando")
+                time.sleep(0.01)
+            if self.fail_title and base_filename.startswith(self.fail_title):
+                raise RuntimeError("Sora recusou o prompt")
+            path = output_dir / f"{base_filename}_final.mp4"
+            path.write_bytes(b"mp4")
+            return path
+        finally:
+            with self.lock:
+                self.active_renders -= 1
+
+
+def _pipeline(stages, session_factory, renders=2):
+    return BatchVideoPipeline(
+        generate_script=stages.generate_script,
+        prepare_segments=lambda content: [{"audio": "a", "visual": ""}, {"audio": "b", "visual": ""}],
+        render=stages.render,
+        slugify=lambda title: title.replace(" ", "_").replace("/", "_").lower(),
+        session_factory=session_factory,
+        script_concurrency=2,
+        render_concurrency=renders,
+    )
+
+
+async def test_batch_renders_overlap_and_records_videos(session_factory, tmp_path):
+    _seed(session_factory, 5, scripted=(1,))
+    with session_factory() as db:
+        manifest = BatchManifest.create(tmp_path, select_propositions(db, limit=5), {})
+
+    stages = FakeStages()
+    summary = await _pipeline(stages, session_factory).run(manifest)
+
+    assert summary == {COMPLETED: 5}
+    assert len(stages.scripts) == 4  # proposition 1 already had a script
+    assert stages.max_active_renders == 2
+    assert stages.script_during_render  # scripts are written while earlier videos render
+    with session_factory() as db:
+        assert db.query(DBVideo).filter(DBVideo.status == "completed").count() == 5
+        # Rendered propositions are left out of the next selection
+        assert select_propositions(db, limit=5) == []
+    assert BatchManifest.load(tmp_path).summary() == {COMPLETED: 5}
+
+
+async def test_interrupted_batch_resumes_from_the_manifest(session_factory, tmp_path):
+    _seed(session_factory, 3, scripted=(1, 2, 3))
+    with session_factory() as db:
+        manifest = BatchManifest.create(tmp_path, select_propositions(db, limit=3), {})
+
+    first = FakeStages(fail_title="2_")
+    summary = await _pipeline(first, session_factory).run(manifest)
+    assert summary == {COMPLETED: 2, FAILED: 1}
+    assert BatchManifest.load(tmp_path).items["2"]["error"] == "Sora recusou o prompt"
+
+    # Second run only retries the failed item, reusing its script
+    second = FakeStages()
+    summary = await _pipeline(second, session_factory).run(BatchManifest.load(tmp_path / "manifest.json"))
+    assert summary == {COMPLETED: 3}
+    assert second.renders == ["2_pl_2_2025"]
+    assert second.scripts == []
+    with session_factory() as db:
+        # The retried item's failed row became its completed row
+        assert db.query(DBVideo).count() == 3
+        assert db.query(DBVideo).filter(DBVideo.status == "completed").count() == 3
+
+
+async def test_rendered_item_is_not_rendered_again(session_factory, tmp_path):
+    _seed(session_factory, 1, scripted=(1,))
+    with session_factory() as db:
+        manifest = BatchManifest.create(tmp_path, select_propositions(db, limit=1), {})
+    video = tmp_path / "1_final.mp4"
+    video.write_bytes(b"mp4")
+    # Killed after the render finished but before the record was written
+    manifest.update(1, stage="rendered", script_id=1, video_path=str(video))
+
+    stages = FakeStages()
+    assert await _pipeline(stages, session_factory).run(BatchManifest.load(tmp_path)) == {COMPLETED: 1}
+    assert stages.renders == []
+
+
+async def test_resume_after_recording_does_not_duplicate_the_video(session_factory, tmp_path):
+    _seed(session_factory, 1, scripted=(1,))
+    with session_factory() as db:
+        manifest = BatchManifest.create(tmp_path, select_propositions(db, limit=1), {})
+    stages = FakeStages()
+    await _pipeline(stages, session_factory).run(manifest)
+
+    # Killed after the video row was marked completed but before the manifest said so
+    manifest = BatchManifest.load(tmp_path)
+    manifest.update(1, stage="rendered")
+    assert await _pipeline(stages, session_factory).run(BatchManifest.load(tmp_path)) == {COMPLETED: 1}
+    with session_factory() as db:
+        assert [video.status for video in db.query(DBVideo)] == ["completed"]
+
+
+async def test_interrupted_batch_stops_its_renders(session_factory, tmp_path):
+    _seed(session_factory, 2, scripted=(1, 2))
+    with session_factory() as db:
+        manifest = BatchManifest.create(tmp_path, select_propositions(db, limit=2), {})
+    stages = FakeStages(render_seconds=30)
+
+    batch = asyncio.ensure_future(_pipeline(stages, session_factory).run(manifest))
+    while stages.active_renders < 2:
+        await asyncio.sleep(0.01)
+    batch.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await batch
+
+    # The run returned only after both render threads had stopped; the items stay resumable
+    assert stages.active_renders == 0
+    assert BatchManifest.load(tmp_path).unfinished()
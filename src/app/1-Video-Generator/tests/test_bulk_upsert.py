@@ -0,0 +1,65 @@
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.core.database import Base
+from src.models.db_models import DBProposition
+from src.models.schemas import Proposition
+from src.services.collector_service import CollectorService
+from src.utils.normalize import normalize_link, normalize_title
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    return engine
+
+
+def _prop(title, link):
+    return Proposition(
+        title=title, description="", content="", link=link,
+        source="camara_deputados", level="federal", collection_type="api",
+    )
+
+
+def test_normalized_keys_ignore_cosmetic_differences():
+    assert normalize_link("HTTPS://www.Camara.leg.br/proposicoes/1/?utm_source=x#top") == \
+        normalize_link("https://camara.leg.br/proposicoes/1")
+    assert normalize_link("https://g1.globo.com/a?id=2") != normalize_link("https://g1.globo.com/a?id=3")
+    assert normalize_title("  Reforma  da Previdência ") == normalize_title("reforma da previdencia")
+    assert normalize_link(None) is None and normalize_title("  ") is None
+
+
+def test_save_skips_stored_and_in_batch_duplicates_with_few_statements(engine):
+    db = sessionmaker(bind=engine)()
+    service = CollectorService()
+    assert service._save_to_db(db, [_prop("PL 1/2025", "https://camara.leg.br/proposicoes/1")]) == 1
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    inserted = service._save_to_db(db, [
+        _prop("PL 1/2025 (atualizado)", "https://www.camara.leg.br/proposicoes/1/"),  # stored link
+        _prop("pl 1/2025", "https://camara.leg.br/proposicoes/99"),  # stored title
+        _prop("PL 2/2025", "https://camara.leg.br/proposicoes/2"),
+        _prop("PL 2/2025", "https://camara.leg.br/proposicoes/2?utm_medium=feed"),  # repeated in batch
+        _prop("PL 3/2025", None),
+    ])
+
+    assert inserted == 2
+    assert sorted(p.title for p in db.query(DBProposition).all()) == ["PL 1/2025", "PL 2/2025", "PL 3/2025"]
+    # One INSERT for the batch, not one query per item
+    assert sum(1 for sql in statements if sql.lstrip().upper().startswith("INSERT INTO PROPOSITIONS")) == 1
+    db.close()
+
+
+def test_orm_inserts_fill_keys_from_defaults(engine):
+    db = sessionmaker(bind=engine)()
+    db.add(DBProposition(title="Auxílio  Gás", link="https://www.senado.leg.br/x/"))
+    db.commit()
+
+    prop = db.query(DBProposition).one()
+    assert prop.title_key == "auxilio gas"
+    assert prop.link_key == "https://senado.leg.br/x"
+    db.close()
@@ -0,0 +1,139 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.collectors.base import BaseCollector, IncompleteCollection, Watermark
+from src.core.database import Base, SessionLocal
+from src.models.db_models import DBCollectionItem, DBCollectionState, DBJob
+from src.models.records import PropositionRecord
+from src.models.schemas import Proposition
+from src.services.collector_service import CollectorService
+
+
+class FakeCollector(BaseCollector):
+    def __init__(self, items):
+        super().__init__()
+        self.items = items
+        self.watermarks = []
+
+    def collect(self, days_back, limit):
+        return self.items
+
+    async def acollect(self, days_back, limit, watermark=None):
+        self.watermarks.append(watermark)
+        return self.items
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def _prop(title, date):
+    return PropositionRecord(
+        title=title, description="imposto", link=f"https://example.com/{title}", date=date,
+        source="fake", level="federal", collection_type="api",
+    )
+
+
+@pytest.mark.asyncio
+async def test_watermarks_are_persisted_and_passed_to_next_run(db):
+    collector = FakeCollector([_prop("a", "2025-01-01"), _prop("b", "2025-01-03")])
+    empty = FakeCollector([])
+    service = CollectorService()
+    service.collectors = {"fake": collector, "empty": empty}
+
+    await service.run_collection(days_back=30, limit=10, db=db)
+    await service.run_collection(days_back=30, limit=10, db=db)
+
+    assert collector.watermarks[0] is None
+    assert collector.watermarks[1].last_date == "2025-01-03"
+    # Empty runs never create or advance a watermark
+    assert db.get(DBCollectionState, "empty") is None
+    assert empty.watermarks == [None, None]
+
+
+class PartialCollector(FakeCollector):
+    async def acollect(self, days_back, limit, watermark=None):
+        self.watermarks.append(watermark)
+        raise IncompleteCollection(self.items, "1 failed queries")
+
+
+@pytest.mark.asyncio
+async def test_incomplete_runs_keep_items_but_not_the_watermark(db):
+    partial = PartialCollector([_prop("a", "2025-01-01")])
+    service = CollectorService()
+    service.collectors = {"partial": partial}
+
+    first = await service.run_collection(days_back=30, limit=10, db=db)
+    await service.run_collection(days_back=30, limit=10, db=db)
+
+    assert first.sources_summary == {"partial": 1}
+    assert db.get(DBCollectionState, "partial") is None
+    assert partial.watermarks == [None, None]
+
+
+def test_effective_days_back_narrows_to_time_since_last_run():
+    recent = Watermark(updated_at=datetime.utcnow() - timedelta(hours=3))
+    old = Watermark(updated_at=datetime.utcnow() - timedelta(days=90))
+
+    assert BaseCollector.effective_days_back(30, None) == 30
+    assert BaseCollector.effective_days_back(30, recent) == 1
+    assert BaseCollector.effective_days_back(30, old) == 30
+
+
+@pytest.mark.asyncio
+async def test_summary_only_run_logs_items_for_pagination(db):
+    service = CollectorService()
+    service.collectors = {"fake": FakeCollector([_prop("a", "2025-01-01"), _prop("b", "2025-01-03")])}
+
+    first = await service.run_collection(days_back=30, limit=10, db=db, run_id=1, details=False)
+    # Second run finds the same items, now already stored
+    second = await service.run_collection(days_back=30, limit=10, db=db, run_id=2)
+
+    assert first.details is None and first.sources_summary == {"fake": 2}
+    assert isinstance(second.details["fake"][0], Proposition)
+    for run_id in (1, 2):
+        items = db.query(DBCollectionItem).filter(DBCollectionItem.job_id == run_id).all()
+        assert {item.title for item in items} == {"a", "b"}
+        assert all(item.proposition_id for item in items)
+
+
+def test_record_is_slotted_and_round_trips():
+    record = _prop("a", "2025-01-01")
+    assert not hasattr(record, "__dict__")
+    assert PropositionRecord.from_schema(record.to_schema()) == record
+
+
+@pytest.mark.asyncio
+async def test_collected_items_endpoint_pages_in_collection_order(client):
+    db = SessionLocal()
+    job = DBJob(kind="collect", status="completed", payload="{}")
+    other = DBJob(kind="tiktok", status="completed", payload="{}")
+    db.add_all([job, other])
+    db.commit()
+    service = CollectorService()
+    service.collectors = {"fake": FakeCollector([
+        _prop(f"paginada {i}", f"2025-02-0{i}") for i in range(1, 4)
+    ])}
+    await service.run_collection(days_back=30, limit=10, db=db, run_id=job.id, details=False)
+    job_id, other_id = job.id, other.id
+    db.close()
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2, "collector": "fake", **({"cursor": cursor} if cursor else {})}
+        page = (await client.get(f"/collect/{job_id}/items", params=params)).json()
+        seen.extend(item["title"] for item in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert len(seen) == 3 and set(seen) == {f"paginada {i}" for i in range(1, 4)}
+    assert (await client.get(f"/collect/{other_id}/items")).status_code == 404
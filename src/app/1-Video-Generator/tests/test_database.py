@@ -0,0 +1,62 @@
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+import pytest
+
+from src.core.config import settings
+from src.core.database import build_engine, database_path
+
+
+def test_database_path_is_absolute(monkeypatch):
+    monkeypatch.setattr(settings, "DATABASE_PATH", "relative/montoya.db")
+    assert database_path().is_absolute()
+
+
+def test_connections_use_wal_and_tuning_pragmas(tmp_path):
+    engine = build_engine(tmp_path / "tuned.db")
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() == settings.SQLITE_BUSY_TIMEOUT_MS
+        assert conn.execute(text("PRAGMA cache_size")).scalar() == -settings.SQLITE_CACHE_SIZE_MB * 1024
+    engine.dispose()
+
+
+def test_read_only_engine_rejects_writes_but_sees_committed_data(tmp_path):
+    path = tmp_path / "shared.db"
+    writer, reader = build_engine(path), build_engine(path, read_only=True)
+    with writer.begin() as conn:
+        conn.execute(text("CREATE TABLE t (x INTEGER)"))
+        conn.execute(text("INSERT INTO t VALUES (1)"))
+
+    # A reader keeps its snapshot open while the writer commits (WAL)
+    with reader.connect() as read_conn:
+        read_conn.execute(text("BEGIN"))
+        assert read_conn.execute(text("SELECT count(*) FROM t")).scalar() == 1
+        with writer.begin() as conn:
+            conn.execute(text("INSERT INTO t VALUES (2)"))
+        read_conn.execute(text("COMMIT"))
+        assert read_conn.execute(text("SELECT count(*) FROM t")).scalar() == 2
+        with pytest.raises(OperationalError):
+            read_conn.execute(text("INSERT INTO t VALUES (3)"))
+
+    writer.dispose()
+    reader.dispose()
+
+
+def test_default_database_starts_from_the_seed(tmp_path, monkeypatch):
+    from src.core import database
+
+    seed = tmp_path / "seed.db"
+    seed.write_bytes(b"SQLite format 3\x00demo")
+    target = tmp_path / "data" / "montoya.db"
+    monkeypatch.setattr(settings, "DATABASE_PATH", None)
+    monkeypatch.setattr(database, "SEED_DATABASE_PATH", seed)
+    monkeypatch.setattr(database, "DATABASE_PATH", target)
+
+    database._seed_database()
+    assert target.read_bytes() == seed.read_bytes()
+    # An existing database is never overwritten
+    target.write_bytes(b"")
+    database._seed_database()
+    assert target.read_bytes() == b""
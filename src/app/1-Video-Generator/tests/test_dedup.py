@@ -0,0 +1,77 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.core.database import Base
+from src.models.db_models import DBProposition
+from src.models.schemas import Proposition
+from src.services.collector_service import CollectorService
+from src.services.dedup_service import NearDuplicateService
+from src.utils.fingerprint import bands, hamming, simhash
+
+STORY = (
+    "A Câmara Municipal de Pindamonhangaba aprovou nesta terça-feira o projeto que prevê "
+    "o aumento do valor do IPTU para imóveis residenciais e comerciais a partir do próximo ano, "
+    "segundo a prefeitura a mudança atualiza a planta genérica de valores do município"
+)
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def _prop(title, content, link):
+    return Proposition(
+        title=title, description="", content=content, link=link,
+        source="municipal", level="municipal", collection_type="google_search",
+    )
+
+
+def test_simhash_is_close_for_near_duplicates_and_far_otherwise():
+    rewritten = STORY.replace("nesta terça-feira", "na terça").replace("segundo a prefeitura", "de acordo com a prefeitura")
+    unrelated = (
+        "O Senado Federal aprovou a proposta que cria um programa nacional de incentivo à leitura "
+        "em escolas públicas com distribuição de livros e formação de professores em todo o país"
+    )
+
+    assert hamming(simhash(STORY), simhash(rewritten)) <= 12
+    assert hamming(simhash(STORY), simhash(unrelated)) > 12
+    assert simhash("texto curto") is None
+
+
+def test_bands_share_a_value_within_distance():
+    a = simhash(STORY)
+    b = a ^ 0b1011  # three bits apart
+    assert set(bands(a)) & set(bands(b))
+
+
+def test_save_clusters_same_story_from_other_outlet(db):
+    service = CollectorService()
+    service._save_to_db(db, [
+        _prop("Pinda aprova aumento do IPTU", STORY, "https://g1.globo.com/sp/iptu"),
+        _prop("Câmara de Pinda aprova IPTU mais caro", STORY + " .", "https://folha.uol.com.br/iptu"),
+        _prop("Outra notícia", "Vereadores discutem reforma do transporte público municipal com novas linhas e tarifas", "https://uol.com.br/x"),
+    ])
+
+    first, second, third = db.query(DBProposition).order_by(DBProposition.id).all()
+    assert first.duplicate_of_id is None
+    assert second.duplicate_of_id == first.id
+    assert third.duplicate_of_id is None
+
+
+def test_rebuild_indexes_existing_rows(db):
+    db.add_all([
+        DBProposition(title="IPTU em Pinda", content=STORY, source="municipal", level="municipal"),
+        DBProposition(title="IPTU: em Pinda", content=STORY, source="municipal", level="municipal"),
+    ])
+    db.commit()
+
+    assert NearDuplicateService().rebuild(db) == 2
+    first, second = db.query(DBProposition).order_by(DBProposition.id).all()
+    assert second.duplicate_of_id == first.id
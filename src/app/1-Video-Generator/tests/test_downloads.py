@@ -0,0 +1,82 @@
+import base64
+import hashlib
+import os
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import pytest
+
+from src.utils.files import DownloadError, download_resumable, link_or_copy
+
+PAYLOAD = os.urandom(300_000)
+
+
+class FlakyServer:
+    """Serves PAYLOAD with Range support; the first response dies after `fail_after` bytes."""
+
+    def __init__(self, fail_after=None, honor_range=True, md5=None):
+        self.fail_after = fail_after
+        self.honor_range = honor_range
+        self.md5 = md5
+        self.offsets = []
+
+    @contextmanager
+    def open(self, offset):
+        self.offsets.append(offset)
+        start = offset if self.honor_range else 0
+        body = PAYLOAD[start:]
+        headers = {"content-length": str(len(body))}
+        if start:
+            headers["content-range"] = f"bytes {start}-{len(PAYLOAD) - 1}/{len(PAYLOAD)}"
+        if self.md5 is not None:
+            headers["content-md5"] = self.md5
+        fail_after, self.fail_after = self.fail_after, None
+
+        def iter_bytes(chunk_size):
+            sent = 0
+            for i in range(0, len(body), chunk_size):
+                if fail_after is not None and sent >= fail_after:
+                    raise ConnectionError("connection reset")
+                chunk = body[i:i + chunk_size]
+                sent += len(chunk)
+                yield chunk
+
+        yield SimpleNamespace(status_code=206 if start else 200, headers=headers, iter_bytes=iter_bytes)
+
+
+def test_interrupted_download_resumes_from_saved_bytes(tmp_path):
+    server = FlakyServer(fail_after=100_000)
+    out = tmp_path / "video.mp4"
+    digest = download_resumable(server.open, out, chunk_size=50_000, retry_delay=0)
+
+    assert out.read_bytes() == PAYLOAD
+    assert digest == hashlib.sha256(PAYLOAD).hexdigest()
+    assert server.offsets == [0, 100_000]
+    assert not list(tmp_path.glob("*.part"))
+
+
+def test_server_ignoring_range_restarts_the_file(tmp_path):
+    server = FlakyServer(fail_after=100_000, honor_range=False)
+    out = tmp_path / "video.mp4"
+    download_resumable(server.open, out, chunk_size=50_000, retry_delay=0)
+    assert out.read_bytes() == PAYLOAD
+
+
+def test_checksum_mismatch_is_rejected(tmp_path):
+    server = FlakyServer(md5=base64.b64encode(hashlib.md5(b"other").digest()).decode())
+    out = tmp_path / "video.mp4"
+    with pytest.raises(DownloadError):
+        download_resumable(server.open, out, attempts=2, retry_delay=0)
+    assert not out.exists()
+
+    good = FlakyServer(md5=base64.b64encode(hashlib.md5(PAYLOAD).digest()).decode())
+    download_resumable(good.open, out, retry_delay=0)
+    assert out.read_bytes() == PAYLOAD
+
+
+def test_link_or_copy_shares_the_file(tmp_path):
+    source = tmp_path / "segment.mp4"
+    source.write_bytes(b"mp4")
+    final = link_or_copy(source, tmp_path / "final.mp4")
+    assert final.read_bytes() == b"mp4"
+    assert os.path.samefile(source, final)
@@ -4,8 +4,8 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
 from src.collectors.camara import CamaraCollector
-from src.services.tiktok_service import tiktok_service
-from src.services.sora_service import sora_video_service
+from src.services.tiktok_service import get_tiktok_service
+from src.services.sora_service import get_sora_service
 from src.core.config import settings, BASE_DIR
 from src.core.database import Base
 from src.models.db_models import DBProposition
@@ -59,10 +59,11 @@ async def test_full_production_flow_with_sora(db_session):
     db_session.commit()
     
     print("\n[2] Generating TikTok Script...")
-    script = tiktok_service.generate_script(proposition, style="viral", db=db_session)
+    script = get_tiktok_service().generate_script(proposition, style="viral", db=db_session)
     assert script, "Script generation failed"
     print("    Script generated successfully.")
     
+    sora_video_service = get_sora_service()
     if sora_video_service is None or not settings.AZURE_OPENAI_VIDEOS_API_KEY:
         pytest.skip("Sora não configurado para testes.")
 
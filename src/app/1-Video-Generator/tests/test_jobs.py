@@ -0,0 +1,172 @@
+import asyncio
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.core.database import Base
+from src.models.db_models import DBJob
+from src.services.job_service import JobCancelled, JobQueue
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'jobs.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+def _queue(session_factory, **kwargs):
+    options = dict(workers=2, poll_interval=0.05, heartbeat_seconds=0.05, stale_seconds=60)
+    options.update(kwargs)
+    return JobQueue(session_factory=session_factory, **options)
+
+
+async def _wait(session_factory, job_id, statuses=("completed", "failed", "cancelled"), timeout=5.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while asyncio.get_running_loop().time() < deadline:
+        with session_factory() as db:
+            job = db.get(DBJob, job_id)
+            if job.status in statuses:
+                return job
+        await asyncio.sleep(0.02)
+    raise AssertionError(f"job {job_id} did not reach {statuses}")
+
+
+async def test_enqueued_jobs_run_in_the_background_and_report_progress(session_factory):
+    queue = _queue(session_factory)
+    release = asyncio.Event()
+
+    @queue.handler("echo")
+    async def echo(ctx):
+        await ctx.aprogress(0.5, "halfway")
+        await release.wait()
+        return {"echo": ctx.payload["value"]}
+
+    @queue.handler("boom")
+    async def boom(ctx):
+        raise RuntimeError("kaput")
+
+    with session_factory() as db:
+        job_id = queue.enqueue(db, "echo", {"value": 42}).id
+        failing_id = queue.enqueue(db, "boom", {}).id
+
+    running = await _wait(session_factory, job_id, statuses=("running",))
+    await asyncio.sleep(0.05)
+    with session_factory() as db:
+        assert db.get(DBJob, job_id).progress_message == "halfway"
+    assert running.attempts == 1
+
+    release.set()
+    done = await _wait(session_factory, job_id)
+    assert done.status == "completed" and done.result == '{"echo": 42}' and done.progress == 1.0
+    failed = await _wait(session_factory, failing_id)
+    assert failed.status == "failed" and failed.error_message == "kaput"
+    await queue.shutdown()
+
+
+async def test_cancel_queued_and_running_jobs(session_factory):
+    queue = _queue(session_factory, workers=1)
+    started = threading.Event()
+    stopped = threading.Event()
+
+    @queue.handler("block")
+    async def block(ctx):
+        def work():
+            started.set()
+            # A blocking job stops at its next progress checkpoint
+            try:
+                while True:
+                    ctx.progress(0.1)
+                    threading.Event().wait(0.3)
+            finally:
+                stopped.set()
+        return await ctx.run_in_thread(work)
+
+    with session_factory() as db:
+        running_id = queue.enqueue(db, "block", {}).id
+        queued_id = queue.enqueue(db, "block", {}).id
+
+    await asyncio.to_thread(started.wait, 5)
+    with session_factory() as db:
+        assert queue.cancel(db, queued_id).status == "cancelled"
+        assert queue.cancel(db, running_id).cancel_requested
+
+    assert (await _wait(session_factory, running_id)).status == "cancelled"
+    # ...and the job is marked cancelled only once its thread has returned
+    assert stopped.is_set()
+    with session_factory() as db:
+        assert db.get(DBJob, queued_id).started_at is None
+    await queue.shutdown()
+
+
+async def test_jobs_of_a_dead_worker_are_requeued(session_factory):
+    queue = _queue(session_factory, stale_seconds=1)
+    stale = datetime.utcnow() - timedelta(minutes=5)
+    with session_factory() as db:
+        db.add_all([
+            DBJob(kind="echo", status="running", payload="{}", attempts=1, heartbeat_at=stale),
+            DBJob(kind="echo", status="running", payload="{}", attempts=3, heartbeat_at=stale),
+            DBJob(kind="echo", status="running", payload="{}", attempts=1, heartbeat_at=stale, cancel_requested=True),
+        ])
+        db.commit()
+
+    @queue.handler("echo")
+    async def echo(ctx):
+        return "again"
+
+    queue.ensure_workers()
+    recovered = await _wait(session_factory, 1)
+    assert recovered.status == "completed" and recovered.attempts == 2
+    abandoned = await _wait(session_factory, 2)
+    assert abandoned.status == "failed"
+    # A cancel requested before the worker died still ends as a cancel
+    assert (await _wait(session_factory, 3)).status == "cancelled"
+    await queue.shutdown()
+
+
+async def test_shutdown_requeues_interrupted_jobs(session_factory):
+    queue = _queue(session_factory)
+
+    @queue.handler("forever")
+    async def forever(ctx):
+        await asyncio.Event().wait()
+
+    with session_factory() as db:
+        job_id = queue.enqueue(db, "forever", {}).id
+    await _wait(session_factory, job_id, statuses=("running",))
+    await queue.shutdown()
+
+    with session_factory() as db:
+        assert db.get(DBJob, job_id).status == "queued"
+    with pytest.raises(ValueError):
+        with session_factory() as db:
+            queue.enqueue(db, "unknown", {})
+
+
+async def test_shutdown_during_a_claim_requeues_the_claimed_job(session_factory, monkeypatch):
+    queue = _queue(session_factory, workers=1)
+    claim = queue._claim
+
+    def slow_claim():
+        claimed = claim()
+        if claimed is not None:
+            threading.Event().wait(0.3)
+        return claimed
+
+    monkeypatch.setattr(queue, "_claim", slow_claim)
+
+    @queue.handler("echo")
+    async def echo(ctx):
+        return "done"
+
+    with session_factory() as db:
+        job_id = queue.enqueue(db, "echo", {}).id
+    await _wait(session_factory, job_id, statuses=("running",))
+    await queue.shutdown()
+
+    with session_factory() as db:
+        assert db.get(DBJob, job_id).status == "queued"
@@ -0,0 +1,84 @@
+import json
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.core.database import Base, SessionLocal
+from src.models.db_models import DBProposition, DBScript, DBVideo
+from src.services.query_service import RecordQueryService
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    session.add_all(
+        DBProposition(title=f"PL {i}", level="federal" if i % 2 else "municipal", source="camara_deputados",
+                      date=f"2025-01-{i:02d}")
+        for i in range(1, 8)
+    )
+    session.add(DBScript(proposition_id=1, content="roteiro", style="informative"))
+    session.add(DBVideo(script_id=1, status="failed", created_at=datetime(2025, 3, 1)))
+    session.add(DBVideo(script_id=1, status="completed", created_at=datetime(2025, 3, 2)))
+    session.commit()
+    yield session
+    session.close()
+
+
+def test_keyset_pages_cover_every_row_once(db):
+    service = RecordQueryService()
+    seen, cursor = [], None
+    while True:
+        page = service.page(db, "propositions", fields="title", cursor=cursor, limit=3)
+        seen.extend(item["title"] for item in page["items"])
+        assert set(page["items"][0]) == {"id", "title"}
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == [f"PL {i}" for i in range(7, 0, -1)]
+
+
+def test_filters_date_range_and_validation(db):
+    service = RecordQueryService()
+    page = service.page(db, "propositions", filters={"level": "federal"}, date_from="2025-01-02", date_to="2025-01-05")
+    assert [item["title"] for item in page["items"]] == ["PL 5", "PL 3"]
+
+    videos = service.page(db, "videos", filters={"status": "completed"}, date_from="2025-03-02")
+    assert [item["status"] for item in videos["items"]] == ["completed"]
+    assert videos["items"][0]["created_at"].startswith("2025-03-02")
+
+    with pytest.raises(ValueError):
+        service.page(db, "propositions", fields="title,simhash")
+    with pytest.raises(ValueError):
+        service.page(db, "scripts", filters={"status": "x"})
+
+
+def test_export_iterates_past_one_batch(db):
+    service = RecordQueryService()
+    service.EXPORT_BATCH = 2
+    assert [r["id"] for r in service.iter_records(db, "propositions", fields="id")] == list(range(7, 0, -1))
+    assert len(list(service.iter_records(db, "propositions", limit=3))) == 3
+
+
+@pytest.mark.asyncio
+async def test_list_endpoints_json_and_ndjson(client):
+    db = SessionLocal()
+    db.add(DBProposition(title="Listagem NDJSON", level="estadual", source="alesp_export"))
+    db.commit()
+    db.close()
+
+    response = await client.get("/propositions", params={"source": "alesp_export", "fields": "title,level"})
+    assert response.status_code == 200
+    assert response.json()["items"] == [{"id": response.json()["items"][0]["id"], "title": "Listagem NDJSON", "level": "estadual"}]
+
+    response = await client.get("/propositions", params={"source": "alesp_export", "format": "ndjson"})
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["title"] for line in lines] == ["Listagem NDJSON"]
+
+    assert (await client.get("/videos", params={"fields": "nope"})).status_code == 400
+    assert (await client.get("/scripts", params={"format": "ndjson", "date_from": "ontem"})).status_code == 400
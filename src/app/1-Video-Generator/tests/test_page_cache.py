@@ -0,0 +1,91 @@
+import random
+import threading
+
+import httpx
+import pytest
+
+from src.utils import scraper as scraper_module
+from src.utils.http import AsyncHttpPool
+from src.utils.page_cache import PageCache
+
+
+def test_put_get_roundtrip(tmp_path):
+    cache = PageCache(tmp_path / "pages.db", ttl_seconds=60, max_bytes=1024 * 1024)
+    cache.put("https://g1.globo.com/a", "texto da matéria", etag='"v1"', last_modified="Mon, 01 Jan 2024 00:00:00 GMT")
+
+    entry = cache.get("https://g1.globo.com/a")
+    assert entry.text == "texto da matéria"
+    assert entry.is_fresh(cache.ttl_seconds)
+    assert entry.validators() == {
+        "If-None-Match": '"v1"',
+        "If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT",
+    }
+    assert cache.get("https://g1.globo.com/missing") is None
+
+
+def test_lru_eviction_respects_size_bound(tmp_path):
+    # Random-looking payloads so compression can't shrink them below the quota
+    payloads = {f"https://site/{i}": random.Random(i).randbytes(500).hex() for i in range(3)}
+    cache = PageCache(tmp_path / "pages.db", ttl_seconds=60, max_bytes=1200)
+
+    cache.put("https://site/0", payloads["https://site/0"])
+    cache.put("https://site/1", payloads["https://site/1"])
+    cache.get("https://site/0")  # 0 is now more recently used than 1
+    cache.put("https://site/2", payloads["https://site/2"])
+
+    assert cache.get("https://site/1") is None
+    assert cache.get("https://site/2") is not None
+
+
+@pytest.mark.asyncio
+async def test_stale_entry_is_revalidated_with_conditional_get(tmp_path, monkeypatch):
+    requests_seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests_seen.append(request)
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, text="<article>Texto novo</article>", headers={"ETag": '"v1"'})
+
+    pool = AsyncHttpPool(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(scraper_module, "http_pool", pool)
+
+    google = scraper_module.GoogleScraper()
+    google.page_cache = PageCache(tmp_path / "pages.db", ttl_seconds=0, max_bytes=1024 * 1024)
+
+    first = await google._aextract_content("https://g1.globo.com/a")
+    second = await google._aextract_content("https://g1.globo.com/a")
+    google.page_cache.ttl_seconds = 3600
+    third = await google._aextract_content("https://g1.globo.com/a")
+    await pool.aclose()
+
+    assert first == second == third == "Texto novo"
+    # Second call revalidated (304), third was served from the fresh cache
+    assert len(requests_seen) == 2
+    assert requests_seen[1].headers["If-None-Match"] == '"v1"'
+
+
+@pytest.mark.asyncio
+async def test_async_extraction_reads_and_writes_the_cache_off_the_loop(tmp_path, monkeypatch):
+    pool = AsyncHttpPool(transport=httpx.MockTransport(
+        lambda request: httpx.Response(200, text="<article>Texto</article>", headers={"ETag": '"v1"'})
+    ))
+    monkeypatch.setattr(scraper_module, "http_pool", pool)
+
+    class RecordingCache(PageCache):
+        def get(self, url):
+            calls.append(("get", threading.current_thread()))
+            return super().get(url)
+
+        def put(self, *args, **kwargs):
+            calls.append(("put", threading.current_thread()))
+            return super().put(*args, **kwargs)
+
+    calls = []
+    google = scraper_module.GoogleScraper()
+    google.page_cache = RecordingCache(tmp_path / "pages.db", ttl_seconds=3600, max_bytes=1024 * 1024)
+    assert await google._aextract_content("https://g1.globo.com/a") == "Texto"
+    await pool.aclose()
+
+    assert [name for name, _ in calls] == ["get", "put"]
+    assert threading.main_thread() not in {thread for _, thread in calls}
@@ -0,0 +1,58 @@
+from src.collectors.camara import CamaraCollector
+from src.models.schemas import Proposition
+from src.utils.relevance import RelevanceScorer, fold
+
+
+def _prop(title, description="", content=None):
+    return Proposition(
+        title=title, description=description, content=content,
+        source="test", level="federal", collection_type="api",
+    )
+
+
+def test_fold_strips_accents_and_case():
+    assert fold("Redução do SALÁRIO mínimo") == "reducao do salario minimo"
+
+
+def test_score_weights_fields_and_folds_accents():
+    scorer = RelevanceScorer(["redução", "imposto"])
+
+    title_hit = scorer.score(_prop("Reducao de impostos"))
+    description_hit = scorer.score(_prop("Projeto", description="Prevê redução do IMPOSTO"))
+    content_hit = scorer.score(_prop("Projeto", content="texto sobre imposto"))
+
+    assert title_hit == 6  # two keywords x title weight 3
+    assert description_hit == 4  # two keywords x description weight 2
+    assert content_hit == 1
+    assert scorer.score(_prop("Projeto sobre cultura")) == 0
+
+
+def test_score_requires_word_start_and_caps_repeated_hits():
+    scorer = RelevanceScorer(["taxa"], max_hits_per_keyword=2)
+
+    assert scorer.score(_prop("sintaxa")) == 0
+    assert scorer.score(_prop("x", content="taxa taxas taxa taxa")) == 2
+
+
+def test_batch_scores_match_individual_scores():
+    scorer = RelevanceScorer()
+    items = [
+        _prop("PL sobre transporte", "auxílio para estudantes"),
+        _prop("Homenagem a atleta"),
+        _prop("Aumento do ICMS", content="O imposto sobe; a taxa também."),
+    ]
+
+    assert scorer.score_batch(items) == [scorer.score(item) for item in items]
+
+
+def test_filter_relevant_ranks_by_score():
+    items = [
+        _prop("Homenagem a atleta"),
+        _prop("Projeto", content="saúde"),
+        _prop("Imposto e taxa", "aumento do tributo"),
+    ]
+
+    relevant = CamaraCollector().filter_relevant(items)
+
+    assert [item.title for item in relevant] == ["Imposto e taxa", "Projeto"]
+    assert relevant[0].relevance_score > relevant[1].relevance_score > 0
@@ -0,0 +1,205 @@
+import json
+
+import httpx
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from src.core.database import Base, build_engine
+from src.models.db_models import DBProposition, DBScript, DBScriptCache
+from src.models.schemas import Proposition
+from src.services.openai_batch import BatchFailed, OpenAIBatchTransport, decode_jsonl, encode_jsonl
+from src.services import tiktok_service
+from src.services.tiktok_service import TikTokService
+from src.utils.rate_limit import RateLimiter
+
+
+class BatchStub:
+    """
+    Mimics the Batch API endpoints (files, batches, file content) in memory.
+
+    The batch stays `in_progress` for `polls_until_done` retrievals; requests
+    whose prompt contains `fail_title` come back in the error file.
+    """
+
+    def __init__(self, polls_until_done=2, fail_title=None, final_status="completed"):
+        self.polls_until_done = polls_until_done
+        self.fail_title = fail_title
+        self.final_status = final_status
+        self.files = {}
+        self.batches = {}
+        self.requests = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append((request.method, request.url.path))
+        path = request.url.path.removeprefix("/v1/")
+        if request.method == "POST" and path == "files":
+            content = request.read()
+            start = content.index(b"\r\n\r\n", content.index(b'filename="')) + 4
+            body = content[start:content.index(b"\r\n--", start)]
+            file_id = f"file-{len(self.files) + 1}"
+            self.files[file_id] = body
+            return httpx.Response(200, json={"id": file_id, "purpose": "batch"})
+        if request.method == "POST" and path == "batches":
+            payload = json.loads(request.read())
+            batch_id = f"batch-{len(self.batches) + 1}"
+            self.batches[batch_id] = {"id": batch_id, "status": "validating", "polls": 0, **payload}
+            return httpx.Response(200, json=self.batches[batch_id])
+        if request.method == "GET" and path.startswith("batches/"):
+            batch = self.batches[path.split("/")[1]]
+            batch["polls"] += 1
+            if batch["polls"] > self.polls_until_done:
+                self._finish(batch)
+            else:
+                batch["status"] = "in_progress"
+            return httpx.Response(200, json=batch)
+        if request.method == "GET" and path.endswith("/content"):
+            return httpx.Response(200, content=self.files[path.split("/")[1]])
+        return httpx.Response(404, json={"error": "not found"})
+
+    def _finish(self, batch):
+        batch["status"] = self.final_status
+        if self.final_status != "completed":
+            return
+        outputs, errors = [], []
+        for row in decode_jsonl(self.files[batch["input_file_id"]]):
+            prompt = row["body"]["messages"][1]["content"]
+            if self.fail_title and self.fail_title in prompt:
+                errors.append({"custom_id": row["custom_id"], "response": None,
+                               "error": {"code": "server_error", "message": "boom"}})
+                continue
+            title = prompt.split("TITLE: ", 1)[1].split("\n", 1)[0]
+            outputs.append({"custom_id": row["custom_id"], "error": None, "response": {
+                "status_code": 200,
+                "body": {"choices": [{"message": {"role": "assistant", "content": f"[AUDIO] lote {title}"}}]},
+            }})
+        batch["output_file_id"] = self._store(outputs)
+        batch["error_file_id"] = self._store(errors) if errors else None
+        batch["request_counts"] = {"total": len(outputs) + len(errors), "completed": len(outputs), "failed": len(errors)}
+
+    def _store(self, rows):
+        file_id = f"file-{len(self.files) + 1}"
+        self.files[file_id] = encode_jsonl(rows)
+        return file_id
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = build_engine(tmp_path / "batch.db")
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+def _service():
+    service = TikTokService.__new__(TikTokService)
+    service.client = service.async_client = None
+    service.limiter = RateLimiter(1000, 1000)
+    return service
+
+
+def _prop(i):
+    return Proposition(
+        title=f"PL {i}/2025", description="", content="", link=f"https://camara.leg.br/proposicoes/{i}",
+        source="camara_deputados", level="federal", collection_type="api",
+    )
+
+
+def test_batch_round_trip_stores_scripts_and_fills_the_cache(session_factory, tmp_path):
+    stub = BatchStub(fail_title="PL 2/2025")
+    transport = OpenAIBatchTransport(api_key="test", base_url="https://stub/v1", transport=httpx.MockTransport(stub))
+    props = [_prop(i) for i in range(4)]
+
+    results = _service().generate_scripts_batch(
+        props, transport=transport, session_factory=session_factory, state_dir=tmp_path, poll_interval=0,
+    )
+
+    assert sorted(r.proposition.title for r in results if r.error) == ["PL 2/2025"]
+    assert {r.script for r in results if not r.error} == {"[AUDIO] lote PL 0/2025", "[AUDIO] lote PL 1/2025",
+                                                          "[AUDIO] lote PL 3/2025"}
+    # One upload, one create, polls until done, two downloads (output + errors)
+    assert [m for m, _ in stub.requests].count("POST") == 2
+    with session_factory() as db:
+        assert db.query(DBScript).count() == 3
+        assert db.query(DBScriptCache).count() == 3
+
+    # Next night only the failed proposition is sent again
+    again = BatchStub(polls_until_done=0)
+    transport = OpenAIBatchTransport(api_key="test", base_url="https://stub/v1", transport=httpx.MockTransport(again))
+    results = _service().generate_scripts_batch(
+        props, transport=transport, session_factory=session_factory, state_dir=tmp_path,
+        poll_interval=0, replace_existing=True,
+    )
+    assert sum(r.cached for r in results) == 3
+    assert len(list(decode_jsonl(again.files["file-1"]))) == 1
+    with session_factory() as db:
+        assert db.query(DBScript).count() == 4
+
+
+def test_ingest_can_resume_in_another_process(session_factory, tmp_path):
+    stub = BatchStub(polls_until_done=1)
+    transport = OpenAIBatchTransport(api_key="test", base_url="https://stub/v1", transport=httpx.MockTransport(stub))
+    batch_id, cached = _service().submit_script_batch(
+        [_prop(1)], transport=transport, session_factory=session_factory, state_dir=tmp_path,
+    )
+    assert batch_id == "batch-1" and cached == []
+
+    results = _service().ingest_script_batch(
+        batch_id, transport=transport, session_factory=session_factory, state_dir=tmp_path, poll_interval=0,
+    )
+    assert [r.script for r in results] == ["[AUDIO] lote PL 1/2025"]
+
+
+def test_ingest_stores_nothing_when_one_script_fails(session_factory, tmp_path, monkeypatch):
+    stub = BatchStub(polls_until_done=0)
+    transport = OpenAIBatchTransport(api_key="test", base_url="https://stub/v1", transport=httpx.MockTransport(stub))
+    service = _service()
+    batch_id, _ = service.submit_script_batch(
+        [_prop(i) for i in range(3)], transport=transport, session_factory=session_factory, state_dir=tmp_path,
+    )
+
+    cache_script = service._cache_script
+    calls = []
+
+    def fail_on_third(*args, **kwargs):
+        calls.append(1)
+        if len(calls) == 3:
+            raise RuntimeError("disk full")
+        cache_script(*args, **kwargs)
+
+    monkeypatch.setattr(service, "_cache_script", fail_on_third)
+    with pytest.raises(RuntimeError):
+        service.ingest_script_batch(
+            batch_id, transport=transport, session_factory=session_factory, state_dir=tmp_path, poll_interval=0,
+        )
+    # The propositions created along the way are rolled back with the scripts
+    with session_factory() as db:
+        assert db.query(DBProposition).count() == 0
+        assert db.query(DBScript).count() == 0
+        assert db.query(DBScriptCache).count() == 0
+
+
+def test_default_transport_is_closed(session_factory, tmp_path, monkeypatch):
+    created = []
+
+    def default_transport():
+        created.append(OpenAIBatchTransport(api_key="test", base_url="https://stub/v1",
+                                            transport=httpx.MockTransport(BatchStub(polls_until_done=0))))
+        return created[-1]
+
+    monkeypatch.setattr(tiktok_service, "OpenAIBatchTransport", default_transport)
+    results = _service().generate_scripts_batch(
+        [_prop(1)], session_factory=session_factory, state_dir=tmp_path, poll_interval=0,
+    )
+    assert [r.script for r in results] == ["[AUDIO] lote PL 1/2025"]
+    assert len(created) == 1 and created[0].client.is_closed
+
+
+def test_expired_batch_raises(session_factory, tmp_path):
+    stub = BatchStub(polls_until_done=0, final_status="expired")
+    transport = OpenAIBatchTransport(api_key="test", base_url="https://stub/v1", transport=httpx.MockTransport(stub))
+    with pytest.raises(BatchFailed):
+        _service().generate_scripts_batch(
+            [_prop(1)], transport=transport, session_factory=session_factory, state_dir=tmp_path, poll_interval=0,
+        )
+    with session_factory() as db:
+        assert db.query(DBScript).count() == 0
@@ -0,0 +1,175 @@
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from src.core.database import Base, build_engine
+from src.models.db_models import DBProposition, DBScript, DBScriptCache
+from src.models.schemas import Proposition
+from src.services.tiktok_service import TikTokService
+from src.utils.rate_limit import RateLimiter, TokenBucket
+
+
+class FakeCompletions:
+    """Stand-in for `AsyncOpenAI().chat.completions` that tracks requests in flight."""
+
+    def __init__(self, delay=0.05, fail_title=None):
+        self.delay = delay
+        self.fail_title = fail_title
+        self.active = 0
+        self.max_active = 0
+        self.calls = 0
+
+    async def create(self, model, messages, temperature, max_tokens):
+        self.calls += 1
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+            prompt = messages[1]["content"]
+            if self.fail_title and self.fail_title in prompt:
+                raise RuntimeError("rate limited")
+            title = prompt.split("TITLE: ", 1)[1].split("\n", 1)[0]
+            return SimpleNamespace(
+                choices=[SimpleNamespace(message=SimpleNamespace(content=f"[AUDIO] roteiro de {title}"))],
+                usage=SimpleNamespace(total_tokens=300),
+            )
+        finally:
+            self.active -= 1
+
+
+def _service(completions, rpm=10_000, tpm=10_000_000):
+    service = TikTokService.__new__(TikTokService)
+    service.client = None
+    service.async_client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    service.limiter = RateLimiter(rpm, tpm)
+    return service
+
+
+def _prop(i):
+    return Proposition(
+        title=f"PL {i}/2025", description="", content="", link=f"https://camara.leg.br/proposicoes/{i}",
+        source="camara_deputados", level="federal", collection_type="api",
+    )
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = build_engine(tmp_path / "scripts.db")
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+async def test_bulk_generation_is_concurrent_and_stores_each_script(session_factory):
+    completions = FakeCompletions(delay=0.05)
+    seen = []
+    start = time.monotonic()
+    results = await _service(completions).generate_scripts_bulk(
+        [_prop(i) for i in range(20)], concurrency=5, session_factory=session_factory, on_result=seen.append,
+    )
+    elapsed = time.monotonic() - start
+
+    assert completions.max_active == 5
+    assert elapsed < 0.5  # 20 sequential completions take >= 1 s
+    assert len(results) == len(seen) == 20 and not any(r.error for r in results)
+    with session_factory() as db:
+        assert db.query(DBScript).count() == 20
+        assert db.query(DBProposition).count() == 20
+
+
+async def test_concurrent_scripts_for_a_new_proposition_share_it(session_factory, monkeypatch):
+    service = _service(FakeCompletions(delay=0))
+    find = service._find_proposition
+    both_looked_up = threading.Barrier(2, timeout=5)
+    calls = []
+
+    def racing_lookup(db, link_key, title_key):
+        # Both threads miss the proposition before either inserts it
+        found = find(db, link_key, title_key)
+        calls.append(1)
+        if len(calls) <= 2:
+            both_looked_up.wait()
+        return found
+
+    monkeypatch.setattr(service, "_find_proposition", racing_lookup)
+    results = await service.generate_scripts_bulk([_prop(1), _prop(1)], session_factory=session_factory, force=True)
+
+    assert not any(r.error for r in results)
+    with session_factory() as db:
+        assert db.query(DBProposition).count() == 1
+        assert {script.proposition_id for script in db.query(DBScript)} == {db.query(DBProposition).one().id}
+
+
+async def test_failures_are_reported_and_replace_keeps_one_script(session_factory):
+    props = [_prop(i) for i in range(3)]
+    await _service(FakeCompletions(delay=0)).generate_scripts_bulk(props, session_factory=session_factory)
+
+    results = await _service(FakeCompletions(delay=0, fail_title="PL 1/2025")).generate_scripts_bulk(
+        props, session_factory=session_factory, replace_existing=True, force=True,
+    )
+    assert [r.proposition.title for r in results if r.error] == ["PL 1/2025"]
+    with session_factory() as db:
+        # One fresh script per proposition; the failed one kept its previous script
+        assert db.query(DBScript).count() == 3
+
+
+async def test_token_bucket_paces_requests():
+    bucket = TokenBucket(rate_per_minute=600, capacity=2)  # 10 per second after a burst of 2
+    start = time.monotonic()
+    for _ in range(5):
+        await bucket.acquire()
+    assert 0.25 <= time.monotonic() - start < 0.6
+
+
+async def test_limiter_refunds_overestimated_tokens():
+    limiter = RateLimiter(rpm=1000, tpm=1000)
+    await limiter.acquire(900)
+    limiter.settle(900, used_tokens=100)
+    start = time.monotonic()
+    await limiter.acquire(800)  # fits only because 800 tokens came back
+    assert time.monotonic() - start < 0.1
+
+
+async def test_unchanged_propositions_are_served_from_the_cache(session_factory, monkeypatch):
+    props = [_prop(i) for i in range(4)]
+    first = FakeCompletions(delay=0)
+    await _service(first).generate_scripts_bulk(props, session_factory=session_factory, replace_existing=True)
+    with session_factory() as db:
+        ids_before = sorted(id_ for (id_,) in db.query(DBScript.id))
+
+    # Nothing changed: no request, and the stored scripts are left alone
+    second = FakeCompletions(delay=0)
+    results = await _service(second).generate_scripts_bulk(props, session_factory=session_factory, replace_existing=True)
+    assert second.calls == 0 and all(r.cached for r in results)
+    with session_factory() as db:
+        assert sorted(id_ for (id_,) in db.query(DBScript.id)) == ids_before
+
+    # Only the edited proposition goes back to the model
+    props[2] = props[2].model_copy(update={"content": "texto novo"})
+    third = FakeCompletions(delay=0)
+    await _service(third).generate_scripts_bulk(props, session_factory=session_factory, replace_existing=True)
+    assert third.calls == 1
+
+    forced = FakeCompletions(delay=0)
+    await _service(forced).generate_scripts_bulk(props, session_factory=session_factory, force=True)
+    assert forced.calls == 4
+
+
+async def test_prompt_version_bump_invalidates_the_cache(session_factory, monkeypatch):
+    import src.services.tiktok_service as tiktok_module
+
+    props = [_prop(i) for i in range(2)]
+    await _service(FakeCompletions(delay=0)).generate_scripts_bulk(props, session_factory=session_factory)
+
+    monkeypatch.setattr(tiktok_module, "PROMPT_VERSION", tiktok_module.PROMPT_VERSION + 1)
+    completions = FakeCompletions(delay=0)
+    service = _service(completions)
+    await service.generate_scripts_bulk(props, session_factory=session_factory)
+    assert completions.calls == 2
+    with session_factory() as db:
+        assert service.invalidate_cache(db) == 2
+        assert db.query(DBScriptCache).count() == 2
@@ -0,0 +1,71 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.core.database import Base, SessionLocal
+from src.models.db_models import DBProposition
+from src.services.search_service import PropositionSearchService
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    session.add_all([
+        DBProposition(title="PL 10/2025", description="Redução do IPVA para motocicletas", level="estadual", source="alesp"),
+        DBProposition(title="Reforma tributária", description="Unifica tributos sobre consumo", level="federal", source="camara_deputados"),
+        DBProposition(title="PL 11/2025", description="Cria programa de saúde", content="Prevê redução de filas", level="federal", source="camara_deputados"),
+    ])
+    session.commit()
+    yield session
+    session.close()
+
+
+def test_search_is_accent_insensitive_and_ranks_title_hits_first(db):
+    service = PropositionSearchService()
+    page = service.search(db, "reducao")
+    assert [hit.title for hit in page.items] == ["PL 10/2025", "PL 11/2025"]
+    assert page.total == 2
+    assert "[Redução]" in page.items[0].snippet
+
+    assert [hit.title for hit in service.search(db, "tribut").items] == ["Reforma tributária"]
+
+
+def test_search_filters_paginates_and_ignores_operators(db):
+    service = PropositionSearchService()
+    assert [hit.title for hit in service.search(db, "redução", level="federal").items] == ["PL 11/2025"]
+
+    second = service.search(db, "redução", limit=1, offset=1)
+    assert second.total == 2 and len(second.items) == 1
+
+    assert service.search(db, 'reforma" OR NEAR(').total == 0
+    assert service.search(db, "   ").items == []
+
+
+def test_index_follows_updates_and_deletes(db):
+    service = PropositionSearchService()
+    prop = db.query(DBProposition).filter_by(title="Reforma tributária").one()
+    prop.description = "Muda a previdência"
+    db.commit()
+    assert service.search(db, "consumo").total == 0
+    assert service.search(db, "previdencia").total == 1
+
+    db.delete(prop)
+    db.commit()
+    assert service.search(db, "previdencia").total == 0
+
+
+@pytest.mark.asyncio
+async def test_search_endpoint(client):
+    db = SessionLocal()
+    db.add(DBProposition(title="Tarifa zero no ônibus", description="Transporte gratuito", level="municipal", source="municipal"))
+    db.commit()
+    db.close()
+
+    response = await client.get("/propositions/search", params={"q": "onibus"})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] >= 1
+    assert data["items"][0]["title"] == "Tarifa zero no ônibus"
@@ -0,0 +1,132 @@
+import asyncio
+
+import httpx
+import pytest
+
+from src.utils import scraper as scraper_module
+from src.utils.http import AsyncHttpPool
+from src.utils.search_cache import SearchCache, SearchUsage, search_usage_var
+
+
+def _scraper(tmp_path, ttl_seconds=3600):
+    google = scraper_module.GoogleScraper()
+    google.api_key, google.engine_id = "key", "cx"
+    google.page_cache = None
+    google.search_cache = SearchCache(tmp_path / "searches.db", ttl_seconds=ttl_seconds)
+    return google
+
+
+@pytest.fixture
+def cse_pool(monkeypatch):
+    calls = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.params["q"])
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, json={
+            "items": [{"title": "Notícia", "link": "https://g1.globo.com/sp/a", "snippet": "resumo"}]
+        })
+
+    pool = AsyncHttpPool(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(scraper_module, "http_pool", pool)
+    yield calls
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_queries_share_one_api_call(tmp_path, cse_pool):
+    google = _scraper(tmp_path)
+    usage = SearchUsage()
+    token = search_usage_var.set(usage)
+    try:
+        results = await asyncio.gather(*(
+            google.asearch("senado", days_back=5, limit=5, extract_content=False) for _ in range(3)
+        ))
+    finally:
+        search_usage_var.reset(token)
+
+    assert cse_pool == ["senado"]
+    assert results[0] == results[1] == results[2]
+    assert usage.as_dict() == {"api_calls": 1, "cache_hits": 0, "coalesced": 2}
+
+
+@pytest.mark.asyncio
+async def test_fresh_results_are_served_from_cache(tmp_path, cse_pool):
+    google = _scraper(tmp_path)
+    await google.asearch("alesp", days_back=5, limit=5, extract_content=False)
+
+    usage = SearchUsage()
+    token = search_usage_var.set(usage)
+    try:
+        again = await google.asearch("alesp", days_back=5, limit=5, extract_content=False)
+        other_window = await google.asearch("alesp", days_back=30, limit=5, extract_content=False)
+    finally:
+        search_usage_var.reset(token)
+
+    assert again == other_window
+    assert cse_pool == ["alesp", "alesp"]
+    assert usage.as_dict() == {"api_calls": 1, "cache_hits": 1, "coalesced": 0}
+
+
+@pytest.mark.asyncio
+async def test_expired_results_hit_the_api_again(tmp_path, cse_pool):
+    google = _scraper(tmp_path, ttl_seconds=0)
+    await google.asearch("municipal", days_back=5, limit=5, extract_content=False)
+    await google.asearch("municipal", days_back=5, limit=5, extract_content=False)
+
+    assert cse_pool == ["municipal", "municipal"]
+    assert google.api_calls_total == 2
+
+
+def test_blocking_search_reuses_one_session(tmp_path):
+    class FakeResponse:
+        status_code = 200
+
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            return {"items": [{"title": "Notícia", "link": "https://g1.globo.com/sp/a", "snippet": "resumo"}]}
+
+    class FakeSession:
+        def __init__(self):
+            self.calls = []
+
+        def get(self, url, **kwargs):
+            self.calls.append(kwargs["params"]["q"])
+            return FakeResponse()
+
+    google = _scraper(tmp_path)
+    google._session = FakeSession()
+
+    google.search("senado", days_back=5, limit=5, extract_content=False)
+    google.search("alesp", days_back=5, limit=5, extract_content=False)
+
+    assert google.session.calls == ["senado", "alesp"]
+
+
+@pytest.mark.asyncio
+async def test_coalesced_search_is_billed_to_the_run_that_issued_it(tmp_path, cse_pool):
+    google = _scraper(tmp_path)
+
+    async def run(usage):
+        search_usage_var.set(usage)
+        return await google.asearch("camara", days_back=5, limit=5, extract_content=False)
+
+    first, second = SearchUsage(), SearchUsage()
+    await asyncio.gather(run(first), run(second))
+
+    assert cse_pool == ["camara"]
+    assert first.as_dict() == {"api_calls": 1, "cache_hits": 0, "coalesced": 0}
+    assert second.as_dict() == {"api_calls": 0, "cache_hits": 0, "coalesced": 1}
+
+
+def test_writes_drop_expired_searches(tmp_path):
+    cache = SearchCache(tmp_path / "searches.db", ttl_seconds=60)
+    cache.put(("old", 5, 5), [{"title": "a"}])
+    cache._connection().execute("UPDATE searches SET fetched_at = fetched_at - 120")
+    cache.put(("new", 5, 5), [{"title": "b"}])
+
+    rows = cache._connection().execute("SELECT query FROM searches").fetchall()
+    assert rows == [("new",)]
+    assert cache.get(("new", 5, 5)) == [{"title": "b"}]
+    cache.close()
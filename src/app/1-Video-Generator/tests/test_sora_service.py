@@ -0,0 +1,203 @@
+import threading
+import time
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import pytest
+
+from src.services.job_service import JobCancelled
+from src.services.sora_service import SoraVideoService
+from src.services.video_poller import VideoStatusPoller
+from src.utils.segment_cache import SegmentCache, segment_key
+
+
+class FakeVideos:
+    """Stand-in for `client.videos`: each render takes `render_seconds` of polling."""
+
+    def __init__(self, render_seconds=0.2, fail_prompt=None):
+        self.render_seconds = render_seconds
+        self.fail_prompt = fail_prompt
+        self.created = {}
+        self.lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+
+    def create(self, model, prompt, seconds, size):
+        with self.lock:
+            video_id = f"video_{len(self.created) + 1}"
+            self.created[video_id] = (time.monotonic(), prompt)
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        return SimpleNamespace(id=video_id, status="queued")
+
+    def retrieve(self, video_id):
+        started, prompt = self.created[video_id]
+        if self.fail_prompt and self.fail_prompt in prompt:
+            status = "failed"
+        else:
+            status = "completed" if time.monotonic() - started >= self.render_seconds else "in_progress"
+        progress = min(100, int((time.monotonic() - started) / self.render_seconds * 100))
+        if status != "in_progress":
+            with self.lock:
+                self.active -= 1
+        return SimpleNamespace(id=video_id, status=status, progress=progress)
+
+    @property
+    def with_streaming_response(self):
+        return SimpleNamespace(download_content=self.download_content)
+
+    @contextmanager
+    def download_content(self, video_id, variant, extra_headers=None):
+        body = video_id.encode()
+        yield SimpleNamespace(
+            status_code=200,
+            headers={"content-length": str(len(body))},
+            iter_bytes=lambda chunk_size: iter([body]),
+        )
+
+
+def _service(videos, max_concurrent=2, segment_cache=None):
+    service = SoraVideoService.__new__(SoraVideoService)
+    service.segment_cache = segment_cache
+    service.model, service.size = "sora-2", "720x1280"
+    service.max_concurrent_segments = max_concurrent
+    service.client = SimpleNamespace(videos=videos)
+    service.poller = VideoStatusPoller(videos.retrieve, min_interval=0.01, max_interval=0.02, deadline=5)
+    service._concat_videos = lambda files, out, steps=None: out.write_bytes(b"+".join(f.read_bytes() for f in files)) or True
+    return service
+
+
+SEGMENTS = [{"audio": "primeira parte", "visual": ""}, {"audio": "segunda parte", "visual": ""},
+            {"audio": "terceira parte", "visual": ""}]
+
+
+def test_segments_render_concurrently_and_concat_in_order(tmp_path):
+    videos = FakeVideos(render_seconds=0.2)
+    service = _service(videos, max_concurrent=3)
+
+    start = time.monotonic()
+    final = service.generate_video_from_script(SEGMENTS, "teste", tmp_path, max_segments=3, segment_duration=4)
+    elapsed = time.monotonic() - start
+
+    assert videos.max_active == 3
+    assert elapsed < 0.5  # three sequential renders would take >= 0.6 s
+    # Segment files keep script order whatever order the renders finished in
+    assert [p.name for p in sorted(tmp_path.glob("teste_s*.mp4"))] == ["teste_s01.mp4", "teste_s02.mp4", "teste_s03.mp4"]
+    assert final.read_bytes().count(b"+") == 2
+
+
+def test_concurrency_cap_is_respected(tmp_path):
+    videos = FakeVideos(render_seconds=0.05)
+    _service(videos, max_concurrent=1).generate_video_from_script(SEGMENTS, "cap", tmp_path, max_segments=3, segment_duration=4)
+    assert videos.max_active == 1
+
+
+def test_failed_segment_fails_the_video(tmp_path):
+    videos = FakeVideos(render_seconds=0.05, fail_prompt="segunda parte")
+    with pytest.raises(RuntimeError):
+        _service(videos).generate_video_from_script(SEGMENTS, "erro", tmp_path, max_segments=3, segment_duration=4)
+    assert not (tmp_path / "erro_final.mp4").exists()
+
+
+def test_progress_is_reported_and_can_cancel_the_render(tmp_path):
+    videos = FakeVideos(render_seconds=0.1)
+    reported = []
+    _service(videos).generate_video_from_script(
+        SEGMENTS[:2], "prog", tmp_path, segment_duration=4,
+        progress_callback=lambda fraction, message: reported.append(fraction),
+    )
+    assert all(0.0 <= fraction <= 1.0 for fraction in reported)
+    assert 0.9 <= max(reported) <= 1.0
+
+    def cancel(fraction, message):
+        raise JobCancelled("stop")
+
+    with pytest.raises(JobCancelled):
+        _service(FakeVideos(render_seconds=0.1)).generate_video_from_script(
+            SEGMENTS[:2], "cancel", tmp_path, segment_duration=4, progress_callback=cancel,
+        )
+
+
+def test_progress_is_reported_from_the_render_thread_between_status_changes(tmp_path):
+    videos = FakeVideos(render_seconds=30)
+    service = _service(videos)
+    # The poller stays silent: progress and cancellation must not wait for a status change
+    service.poller = VideoStatusPoller(videos.retrieve, min_interval=30, max_interval=30, deadline=60)
+    service.progress_interval = 0.02
+    threads, started = set(), time.monotonic()
+
+    def cancel_later(fraction, message):
+        threads.add(threading.current_thread())
+        if time.monotonic() - started > 0.1:
+            raise JobCancelled("stop")
+
+    with pytest.raises(JobCancelled):
+        service.generate_video_from_script(
+            SEGMENTS[:2], "tick", tmp_path, segment_duration=4, progress_callback=cancel_later,
+        )
+    assert time.monotonic() - started < 1
+    assert threads == {threading.current_thread()}
+
+
+def test_poller_backs_off_and_enforces_the_deadline():
+    calls = []
+
+    def never_done(video_id):
+        calls.append(time.monotonic())
+        return SimpleNamespace(id=video_id, status="in_progress", progress=None)
+
+    poller = VideoStatusPoller(never_done, min_interval=0.02, max_interval=0.2, backoff=2.0, deadline=0.5)
+    with pytest.raises(TimeoutError):
+        poller.submit("slow").result(timeout=5)
+    gaps = [b - a for a, b in zip(calls, calls[1:])]
+    assert gaps[-1] > gaps[0] * 2
+    assert poller.outstanding == 0
+
+
+def test_poller_checks_near_the_estimated_finish():
+    started = time.monotonic()
+
+    def steady(video_id):
+        progress = min(100, int((time.monotonic() - started) / 0.3 * 100))
+        return SimpleNamespace(id=video_id, status="completed" if progress >= 100 else "in_progress", progress=progress)
+
+    # A plain 1 s backoff would notice completion late; the progress rate brings the check forward
+    poller = VideoStatusPoller(steady, min_interval=0.05, max_interval=1.0, backoff=4.0, deadline=5)
+    video = poller.submit("steady").result(timeout=5)
+    assert video.status == "completed"
+    assert time.monotonic() - started < 0.9
+
+
+def test_cached_segments_skip_the_api(tmp_path):
+    cache = SegmentCache(tmp_path / "cache", max_bytes=10_000)
+    first = FakeVideos(render_seconds=0.02)
+    _service(first, segment_cache=cache).generate_video_from_script(SEGMENTS[:2], "a", tmp_path / "run1", segment_duration=4)
+    assert len(first.created) == 2
+
+    # Same script rendered again (e.g. after an ffmpeg failure): no new render
+    second = FakeVideos(render_seconds=0.02)
+    final = _service(second, segment_cache=cache).generate_video_from_script(
+        SEGMENTS[:2], "b", tmp_path / "run2", segment_duration=4
+    )
+    assert second.created == {}
+    assert final.read_bytes() == b"video_1+video_2"
+
+    # A different duration is a different render
+    third = FakeVideos(render_seconds=0.02)
+    _service(third, segment_cache=cache).generate_video_from_script(SEGMENTS[:2], "c", tmp_path / "run3", segment_duration=8)
+    assert len(third.created) == 2
+
+
+def test_segment_cache_evicts_least_recently_used(tmp_path):
+    cache = SegmentCache(tmp_path / "cache", max_bytes=250)
+    for name in ("a", "b", "c"):
+        source = tmp_path / f"{name}.mp4"
+        source.write_bytes(name.encode() * 100)
+        cache.put(segment_key("sora-2", "720x1280", 4, name), f"video_{name}", source)
+        if name == "b":
+            cache.get(segment_key("sora-2", "720x1280", 4, "a"))  # "a" becomes more recent than "b"
+
+    assert cache.get(segment_key("sora-2", "720x1280", 4, "b")) is None
+    assert cache.get(segment_key("sora-2", "720x1280", 4, "a")).video_id == "video_a"
+    assert cache.get(segment_key("sora-2", "720x1280", 4, "c")) is not None
+    assert len(list((tmp_path / "cache").glob("*.mp4"))) == 2
@@ -0,0 +1,88 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+from src.core.registry import ServiceRegistry
+from src.main import app
+from src.services.sora_service import get_sora_service
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Imported only when the client or parser that needs them is built
+DEFERRED = ("openai", "bs4")
+
+
+def _cold_import(code, tmp_path):
+    """Run `code` in a fresh interpreter with -X importtime; return its stdout and imported modules."""
+    env = dict(os.environ, DATABASE_PATH=str(tmp_path / "startup.db"))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+    timings = {}
+    for line in proc.stderr.splitlines():
+        if line.startswith("import time:") and "cumulative" not in line:
+            _, cumulative_us, name = line.removeprefix("import time:").split("|")
+            timings[name.strip()] = int(cumulative_us)
+    return proc.stdout, timings
+
+
+def test_api_import_defers_heavy_dependencies_and_services(tmp_path):
+    out, timings = _cold_import(
+        "import src.main; from src.core.registry import services; "
+        "print(sorted(n for n in ('collector', 'scraper', 'tiktok', 'sora') if services.created(n)))",
+        tmp_path,
+    )
+    assert out.strip() == "[]"
+    assert not [name for name in timings if name.split(".")[0] in DEFERRED]
+    print(f"import src.main: {timings['src.main'] / 1000:.0f} ms")
+
+
+def test_cli_import_defers_heavy_dependencies(tmp_path):
+    _, timings = _cold_import("import src.cli.manager", tmp_path)
+    assert not [name for name in timings if name.split(".")[0] in DEFERRED]
+
+
+def test_registry_builds_each_service_once():
+    built = []
+
+    def factory():
+        time.sleep(0.05)
+        built.append(1)
+        return object()
+
+    registry = ServiceRegistry()
+    registry.register("slow", factory)
+    assert not registry.created("slow")
+
+    instances = []
+    threads = [threading.Thread(target=lambda: instances.append(registry.get("slow"))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(built) == 1 and len({id(i) for i in instances}) == 1
+
+    registry.override("slow", "stub")
+    assert registry.get("slow") == "stub"
+    registry.reset("slow")
+    assert registry.get("slow") is not instances[0] and len(built) == 2
+
+
+async def test_video_endpoint_resolves_sora_through_a_dependency(client):
+    app.dependency_overrides[get_sora_service] = lambda: None
+    try:
+        response = await client.post("/generate/video", json={
+            "proposition": {
+                "title": "PL 1/2025", "description": "", "link": "https://camara.leg.br/proposicoes/1",
+                "source": "camara_deputados", "level": "federal", "collection_type": "api",
+            },
+            "script": "[AUDIO] texto [VISUAL] imagem",
+        })
+    finally:
+        app.dependency_overrides.clear()
+    assert response.status_code == 500
+    assert "Sora" in response.json()["detail"]
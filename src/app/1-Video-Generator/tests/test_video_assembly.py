@@ -0,0 +1,148 @@
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from src.services.video_assembly import (
+    AssemblyError,
+    AssemblyStep,
+    BurnSubtitles,
+    Overlay,
+    VideoAssembler,
+    resolve_ffmpeg,
+)
+
+FFMPEG = resolve_ffmpeg()
+
+
+def _ffmpeg_available() -> bool:
+    try:
+        return subprocess.run([FFMPEG, "-version"], capture_output=True).returncode == 0
+    except OSError:
+        return False
+
+
+needs_ffmpeg = pytest.mark.skipif(not _ffmpeg_available(), reason="ffmpeg not available")
+
+PROBE_OUTPUT = """
+Input #0, mov,mp4,m4a,3gp,3g2,mj2, from 'seg.mp4':
+  Duration: 00:00:04.02, start: 0.000000, bitrate: 152 kb/s
+  Stream #0:0[0x1](und): Video: h264 (High) (avc1 / 0x31637661), yuv420p(tv, bt709, progressive), 720x1280 [SAR 1:1 DAR 9:16], 60 kb/s, 30 fps, 30 tbr, 15360 tbn (default)
+  Stream #0:1[0x2](und): Audio: aac (LC) (mp4a / 0x6134706D), 44100 Hz, stereo, fltp, 70 kb/s (default)
+"""
+
+
+def _clip(path: Path, size="64x112", rate=24, audio_rate=48000, audio=True, codec="libx264", extra=()) -> Path:
+    cmd = [FFMPEG, "-hide_banner", "-y", "-f", "lavfi", "-i", f"testsrc=size={size}:rate={rate}:duration=1"]
+    if audio:
+        cmd += ["-f", "lavfi", "-i", f"sine=frequency=440:duration=1:sample_rate={audio_rate}", "-ac", "2", "-c:a", "aac"]
+    cmd += ["-c:v", codec, *extra, "-pix_fmt", "yuv420p", "-shortest", str(path)]
+    subprocess.run(cmd, capture_output=True, check=True)
+    return path
+
+
+def test_parse_probe_reads_codec_parameters():
+    info = VideoAssembler.parse_probe(Path("seg.mp4"), PROBE_OUTPUT)
+    assert (info.video_codec, info.width, info.height, info.fps, info.pix_fmt) == ("h264", 720, 1280, 30.0, "yuv420p")
+    assert (info.audio_codec, info.sample_rate, info.channels) == ("aac", 44100, "stereo")
+    assert (info.codec_profile, info.time_base) == ("High", "15360")
+    assert info.duration == pytest.approx(4.02)
+
+    with pytest.raises(AssemblyError):
+        VideoAssembler.parse_probe(Path("broken.mp4"), "broken.mp4: Invalid data found when processing input")
+
+
+@needs_ffmpeg
+def test_matching_segments_are_stream_copied(tmp_path, monkeypatch):
+    clips = [_clip(tmp_path / f"s{i}.mp4") for i in range(2)]
+    assembler = VideoAssembler(binary=FFMPEG)
+    normalized = []
+    monkeypatch.setattr(assembler, "_normalize", lambda *args: normalized.append(args))
+
+    final = assembler.assemble(clips, tmp_path / "final.mp4")
+    info = assembler.probe(final)
+    assert normalized == []
+    assert info.duration == pytest.approx(2.0, abs=0.2)
+    assert not list(tmp_path.glob("*_list.txt"))
+
+
+@needs_ffmpeg
+def test_mismatched_segments_are_normalized_once(tmp_path):
+    clips = [
+        _clip(tmp_path / "a.mp4"),
+        _clip(tmp_path / "b.mp4", size="96x160", rate=30, audio_rate=44100),
+        _clip(tmp_path / "c.mp4", audio=False),
+    ]
+    assembler = VideoAssembler(binary=FFMPEG, workers=2)
+    final = assembler.assemble(clips, tmp_path / "final.mp4")
+
+    info = assembler.probe(final)
+    assert (info.width, info.height) == (64, 112)
+    assert info.fps == pytest.approx(24.0, abs=0.5)
+    assert (info.audio_codec, info.sample_rate) == ("aac", 48000)
+    assert info.duration == pytest.approx(3.0, abs=0.3)
+    assert not (tmp_path / ".final_parts").exists()
+
+
+@needs_ffmpeg
+def test_steps_run_in_a_single_pass(tmp_path):
+    clips = [_clip(tmp_path / "a.mp4"), _clip(tmp_path / "b.mp4", rate=30)]
+    logo = _clip(tmp_path / "logo.mp4", size="16x16", audio=False)
+    subtitles = tmp_path / "legenda.srt"
+    subtitles.write_text("1\n00:00:00,000 --> 00:00:01,500\nOlá\n", encoding="utf-8")
+
+    assembler = VideoAssembler(binary=FFMPEG)
+    final = assembler.assemble(clips, tmp_path / "final.mp4", steps=[Overlay(logo), BurnSubtitles(subtitles)])
+    info = assembler.probe(final)
+    assert (info.width, info.height) == (64, 112)
+    assert info.duration == pytest.approx(2.0, abs=0.3)
+
+
+@needs_ffmpeg
+def test_one_odd_picture_reencodes_every_segment(tmp_path, monkeypatch):
+    clips = [_clip(tmp_path / "a.mp4"), _clip(tmp_path / "b.mp4"), _clip(tmp_path / "c.mp4", rate=30)]
+    assembler = VideoAssembler(binary=FFMPEG)
+    calls = []
+    normalize = assembler._normalize
+    monkeypatch.setattr(assembler, "_normalize", lambda info, *args: calls.append((info.path, args[-1])) or normalize(info, *args))
+
+    assembler.assemble(clips, tmp_path / "final.mp4")
+    assert sorted(path.name for path, _ in calls) == ["a.mp4", "b.mp4", "c.mp4"]
+    assert all(reencode for _, reencode in calls)
+
+
+@needs_ffmpeg
+def test_audio_only_mismatch_keeps_the_video_stream(tmp_path, monkeypatch):
+    clips = [_clip(tmp_path / "a.mp4"), _clip(tmp_path / "b.mp4", audio_rate=44100)]
+    assembler = VideoAssembler(binary=FFMPEG)
+    calls = []
+    normalize = assembler._normalize
+    monkeypatch.setattr(assembler, "_normalize", lambda info, *args: calls.append((info.path, args[-1])) or normalize(info, *args))
+
+    final = assembler.assemble(clips, tmp_path / "final.mp4")
+    assert calls == [(clips[1], False)]
+    assert assembler.probe(final).duration == pytest.approx(2.0, abs=0.3)
+
+
+@needs_ffmpeg
+def test_same_size_different_h264_profile_is_not_stream_copied(tmp_path):
+    clips = [_clip(tmp_path / "a.mp4"), _clip(tmp_path / "b.mp4", extra=("-profile:v", "baseline"))]
+    assembler = VideoAssembler(binary=FFMPEG)
+    infos = [assembler.probe(clip) for clip in clips]
+    assert infos[0].codec_profile != infos[1].codec_profile
+    assert infos[0].codec_config and infos[0].codec_config != infos[1].codec_config
+
+    profile = assembler.profile_for(infos)
+    assert not any(profile.video_matches(info) for info in infos)
+
+
+def test_assembly_step_is_abstract():
+    with pytest.raises(TypeError):
+        AssemblyStep()
+
+
+def test_single_segment_without_steps_is_linked(tmp_path):
+    segment = tmp_path / "s01.mp4"
+    segment.write_bytes(b"mp4")
+    final = VideoAssembler(binary="missing-ffmpeg").assemble([segment], tmp_path / "final.mp4")
+    assert final.read_bytes() == b"mp4"